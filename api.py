@@ -0,0 +1,356 @@
+"""Módulo da API HTTP
+
+Serviço ASGI para outros sistemas e jobs em lote usarem o agente sem a
+interface do Streamlit: ingestão de relatórios, busca no vector store,
+perguntas (agente ou resposta direta, com streaming), resumos, TTS e os PDFs
+processados (com Range e ETag, lidos do disco em blocos). Usa os
+mesmos serviços compartilhados do app (vector store, clientes HTTP com pool
+de conexões e caches), e cada tipo de requisição tem um limite de
+concorrência: acima dele a requisição espera uma vaga por até
+API_QUEUE_TIMEOUT_SECONDS e depois recebe 503. Para rodar:
+
+    uvicorn api:app --host 0.0.0.0 --port 8000
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Literal, Optional
+
+import anyio.to_thread
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from langchain_core.messages import AIMessage, HumanMessage
+from pydantic import BaseModel, Field
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
+
+import conversation_memory
+import file_handler
+import ingestion
+import insights_materializer
+import memory
+import question_router
+import result_store
+import services
+import telemetry
+import tts_pipeline
+from config import (
+    LLM_MODEL_NAME,
+    AVAILABLE_LLM_MODELS,
+    SUMMARY_LENGTHS,
+    REPORTS_NEW_DIR,
+    REPORTS_PROCESSED_DIR,
+    API_CONCURRENCY,
+    API_QUEUE_TIMEOUT_SECONDS,
+    API_THREADPOOL_SIZE,
+    API_MAX_UPLOAD_BYTES,
+    API_TTS_MAX_CHARS,
+    ensure_directories_exist,
+)
+
+
+class ConcurrencyLimiter:
+    def __init__(self, limits=API_CONCURRENCY, queue_timeout=API_QUEUE_TIMEOUT_SECONDS):
+        """Limites de requisições simultâneas por tipo de operação."""
+        self.queue_timeout = queue_timeout
+        self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in limits.items()}
+
+    async def acquire(self, name):
+        """Espera uma vaga; sem vaga dentro do prazo, responde 503."""
+        try:
+            await asyncio.wait_for(self._semaphores[name].acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(503, f"Muitas requisições de '{name}' em andamento", headers={"Retry-After": "5"})
+
+    def release(self, name):
+        self._semaphores[name].release()
+
+    @asynccontextmanager
+    async def slot(self, name):
+        await self.acquire(name)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    ensure_directories_exist()
+    # Chamadas ao LLM e ao ChromaDB são bloqueantes e rodam no pool de threads do anyio
+    anyio.to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+    app.state.limiter = ConcurrencyLimiter()
+    services.start_warm_up()
+    yield
+
+
+app = FastAPI(title="RAG Investor Agent API", lifespan=lifespan)
+
+
+class SearchRequest(BaseModel):
+    query: str = Field(min_length=1)
+    k: int = Field(4, ge=1, le=50)
+
+
+class AskRequest(BaseModel):
+    question: str = Field(min_length=1)
+    route: Literal["auto", "reports", "agent"] = "auto"
+    model: Optional[str] = None
+    session_id: Optional[str] = None  # Histórico persistido no Redis, compartilhado com o app
+    stream: bool = False
+
+
+class SummaryRequest(BaseModel):
+    file_name: str
+    length: Optional[str] = None
+    model: Optional[str] = None
+    stream: bool = False
+
+
+class TTSRequest(BaseModel):
+    text: str = Field(min_length=1, max_length=API_TTS_MAX_CHARS)
+
+
+def _model_name(model):
+    if model is None:
+        return LLM_MODEL_NAME
+    if model not in AVAILABLE_LLM_MODELS:
+        raise HTTPException(400, f"Modelo desconhecido: {model}")
+    return model
+
+
+def _processed_report_path(file_name):
+    if file_name not in file_handler.get_all_processed_reports():
+        raise HTTPException(404, f"Relatório não encontrado: {file_name}")
+    return os.path.join(REPORTS_PROCESSED_DIR, file_name)
+
+
+def _session_memory(session_id):
+    """Memória da conversa restaurada do histórico da sessão, e o histórico (ou None sem Redis)."""
+    history = memory.get_session_history(session_id) if session_id else None
+    if history is None:
+        return None, None
+    session_memory = conversation_memory.ConversationMemory()
+    try:
+        session_memory.restore(memory.to_turns(history.messages))
+    except Exception as e:
+        print(f"⚠️ Erro ao carregar o histórico da sessão: {e}")
+    return session_memory, history
+
+
+def _save_turn(history, question, answer):
+    if history is None:
+        return
+    try:
+        history.add_messages([HumanMessage(content=question), AIMessage(content=answer)])
+    except Exception as e:
+        print(f"⚠️ Erro ao salvar o histórico da sessão: {e}")
+
+
+class SlotStreamingResponse(StreamingResponse):
+    def __init__(self, content, release, **kwargs):
+        """Streaming que devolve a vaga do limitador ao terminar o envio, mesmo que o corpo nunca seja iterado."""
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope, receive, send):
+        # O finally do gerador não roda se o cliente desconectar antes do primeiro trecho,
+        # e a background task é pulada quando o envio falha; aqui a vaga volta em qualquer caso
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+def _streaming_text(iterator, release):
+    """Resposta em streaming de um gerador síncrono; a vaga é liberada quando a resposta termina."""
+    async def body():
+        try:
+            async for delta in iterate_in_threadpool(iterator):
+                yield delta
+        except Exception as e:
+            print(f"❌ Erro durante o streaming: {e}")
+            yield f"\nErro: {e}"
+
+    return SlotStreamingResponse(body(), release, media_type="text/plain; charset=utf-8")
+
+
+@app.get("/health")
+async def health():
+    """Saúde dos serviços compartilhados e número de chunks indexados."""
+    report = await run_in_threadpool(services.get_registry().health)
+    return {
+        "ok": all(entry["ok"] for entry in report.values()),
+        "documents": await run_in_threadpool(services.document_count),
+        "services": report,
+    }
+
+
+def _materialize_insights(vector_manager, model_name):
+    try:
+        with telemetry.feature("insights"):
+            insights_materializer.materialize(vector_manager, model_name=model_name)
+    except Exception as e:
+        print(f"⚠️ Insights do dashboard não foram atualizados: {e}")
+
+
+@app.post("/documents")
+async def ingest_document(request: Request, file_name: str, background_tasks: BackgroundTasks, model: Optional[str] = None):
+    """Recebe um PDF no corpo da requisição e o indexa (duplicatas são ignoradas)."""
+    model_name = _model_name(model)
+    if os.path.basename(file_name) != file_name or not file_name.endswith(".pdf"):
+        raise HTTPException(400, "file_name deve ser o nome de um arquivo .pdf")
+
+    report_path = os.path.join(REPORTS_NEW_DIR, file_name)
+    partial_path = f"{report_path}.part"
+    size = 0
+    try:
+        with open(partial_path, "wb") as f:
+            async for block in request.stream():
+                size += len(block)
+                if size > API_MAX_UPLOAD_BYTES:
+                    raise HTTPException(413, f"Arquivo maior que {API_MAX_UPLOAD_BYTES} bytes")
+                f.write(block)
+        if size == 0:
+            raise HTTPException(400, "Corpo da requisição vazio")
+        os.replace(partial_path, report_path)
+    finally:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+
+    async with request.app.state.limiter.slot("ingest"):
+        vector_manager = await run_in_threadpool(services.get_vector_manager)
+
+        def ingest():
+            with telemetry.feature("ingest"):
+                return ingestion.ingest_report(vector_manager, report_path, model_name=model_name)
+
+        chunks_added = await run_in_threadpool(ingest)
+    if chunks_added > 0:
+        services.documents_changed()
+        background_tasks.add_task(_materialize_insights, vector_manager, model_name)
+    return {"file_name": file_name, "chunks_added": chunks_added, "duplicate": chunks_added == 0}
+
+
+@app.api_route("/documents/{file_name}", methods=["GET", "HEAD"])
+async def get_document(request: Request, file_name: str, download: bool = False):
+    """PDF processado, lido do disco em blocos, com suporte a Range (páginas sob demanda) e ETag."""
+    report_path = _processed_report_path(file_name)
+    response = FileResponse(
+        report_path,
+        media_type="application/pdf",
+        filename=file_name,
+        stat_result=await run_in_threadpool(os.stat, report_path),
+        content_disposition_type="attachment" if download else "inline",
+        # O mesmo nome pode receber outra versão: o navegador revalida com o ETag
+        headers={"Cache-Control": "no-cache"},
+    )
+    if request.headers.get("if-none-match") == response.headers["etag"]:
+        return Response(status_code=304, headers={"ETag": response.headers["etag"], "Cache-Control": "no-cache"})
+    return response
+
+
+@app.post("/search")
+async def search(body: SearchRequest, request: Request):
+    """Chunks mais similares à consulta, com a distância retornada pelo ChromaDB."""
+    async with request.app.state.limiter.slot("search"):
+        vector_manager = await run_in_threadpool(services.get_vector_manager)
+        results = await run_in_threadpool(vector_manager.search_similarity, body.query, body.k)
+    return {
+        "results": [
+            {"content": doc.page_content, "metadata": doc.metadata, "score": float(score)}
+            for doc, score in results
+        ]
+    }
+
+
+@app.post("/ask")
+async def ask(body: AskRequest, request: Request):
+    """Responde uma pergunta; com stream=true o texto é enviado à medida que é gerado."""
+    model_name = _model_name(body.model)
+    limiter = request.app.state.limiter
+    vector_manager = await run_in_threadpool(services.get_vector_manager)
+
+    await limiter.acquire("ask")
+    streaming = False
+    try:
+        session_memory, history = await run_in_threadpool(_session_memory, body.session_id)
+        route = body.route
+        if route == "auto":
+            route = await run_in_threadpool(question_router.classify_question, body.question, vector_manager)
+
+        if body.stream:
+            def deltas():
+                parts = []
+                for delta in question_router.stream_answer(
+                    body.question, vector_manager, route, model_name=model_name, memory=session_memory
+                ):
+                    parts.append(delta)
+                    yield delta
+                _save_turn(history, body.question, "".join(parts))
+
+            # A vaga fica com o streaming e é liberada quando ele terminar
+            response = _streaming_text(deltas(), lambda: limiter.release("ask"))
+            response.headers["X-Route"] = route
+            streaming = True
+            return response
+
+        def answer():
+            with telemetry.feature("chat"):
+                return question_router.answer_question(
+                    body.question, vector_manager, model_name=model_name, memory=session_memory, route=route
+                )[0]
+
+        text = await run_in_threadpool(answer)
+        await run_in_threadpool(_save_turn, history, body.question, text)
+        return {"answer": text, "route": route}
+    finally:
+        if not streaming:
+            limiter.release("ask")
+
+
+@app.post("/summaries")
+async def summarize(body: SummaryRequest, request: Request):
+    """Resumo de um relatório processado (reaproveitado do armazenamento de resultados)."""
+    model_name = _model_name(body.model)
+    if body.length is not None and body.length not in SUMMARY_LENGTHS:
+        raise HTTPException(400, f"Tamanho desconhecido: {body.length}")
+    file_path = _processed_report_path(body.file_name)
+    limiter = request.app.state.limiter
+
+    if body.stream:
+        await limiter.acquire("summarize")
+        try:
+            deltas = telemetry.iter_with_feature(
+                "summary",
+                result_store.stream_cached_report_summary(file_path, model_name=model_name, length=body.length),
+            )
+            return _streaming_text(deltas, lambda: limiter.release("summarize"))
+        except BaseException:
+            limiter.release("summarize")
+            raise
+
+    def summary():
+        with telemetry.feature("summary"):
+            return result_store.cached_report_summary(file_path, model_name=model_name, length=body.length)
+
+    async with limiter.slot("summarize"):
+        text = await run_in_threadpool(summary)
+    return {"file_name": body.file_name, "summary": text}
+
+
+@app.post("/tts")
+async def text_to_speech(body: TTSRequest, request: Request):
+    """Áudio MP3 do texto (textos longos são sintetizados em partes paralelas e concatenados)."""
+    def synthesize():
+        with telemetry.feature("tts"):
+            return tts_pipeline.synthesize_text(body.text)
+
+    async with request.app.state.limiter.slot("tts"):
+        audio, parts, failed = await run_in_threadpool(synthesize)
+    if not audio:
+        raise HTTPException(502, "Falha ao gerar o áudio")
+    return Response(
+        audio,
+        media_type="audio/mpeg",
+        headers={"X-TTS-Parts": str(parts), "X-TTS-Failed-Parts": ",".join(map(str, failed))},
+    )
@@ -0,0 +1,148 @@
+"""Módulo de Cache de Áudio
+
+Cache em disco, endereçado por conteúdo, para os MP3s gerados pelo TTS. A
+chave é o hash do texto, da voz e do modelo de TTS, então o mesmo resumo ou
+relatório é sintetizado uma única vez para todos os usuários e sobrevive a
+recarregamentos e reinícios. Guarda tanto os trechos quanto os áudios
+completos já montados, com remoção LRU quando o tamanho total passa do limite.
+"""
+import hashlib
+import json
+import os
+import threading
+
+from llm_cache import LLMCacheStats
+from local_storage import atomic_write
+from config import (
+    AUDIO_CACHE_DIR,
+    AUDIO_CACHE_MAX_BYTES,
+    TTS_VOICE,
+    TTS_MODEL_NAME,
+)
+
+# Ao passar do limite, remove os arquivos menos usados até este percentual dele
+EVICTION_TARGET_RATIO = 0.9
+
+
+def audio_key(text, voice=None, model=None, kind="chunk"):
+    """Chave do áudio: hash do texto, da voz, do modelo e do tipo (trecho ou completo)."""
+    payload = json.dumps(
+        [kind, voice or TTS_VOICE, model or TTS_MODEL_NAME, text], ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    def __init__(self, directory=AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES):
+        """Cache de MP3s em disco com limite de tamanho total."""
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = LLMCacheStats()
+        self._lock = threading.Lock()
+        self._total_bytes = None  # calculado na primeira escrita
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.mp3")
+
+    def get(self, key):
+        """Retorna o áudio armazenado (e o marca como usado) ou None."""
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # o mtime registra o último uso para a remoção LRU
+        except FileNotFoundError:
+            self.stats.record(False)
+            return None
+        self.stats.record(True)
+        return data
+
+    def put(self, key, data):
+        """Armazena o áudio de forma atômica e aplica o limite de tamanho."""
+        if not data:
+            return
+        path = self._path(key)
+        with atomic_write(path) as f:
+            f.write(data)
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += len(data) - previous_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """Lista (mtime, tamanho, caminho) dos arquivos do cache."""
+        entries = []
+        if not os.path.isdir(self.directory):
+            return entries
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".mp3"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def _scan_total(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        # Relê o diretório: outras réplicas podem compartilhar o mesmo volume
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICTION_TARGET_RATIO
+        removed = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        self.stats.record_evictions(removed)
+
+    def size_bytes(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            return self._total_bytes
+
+    def clear(self):
+        with self._lock:
+            for _, _, path in self._entries():
+                os.remove(path)
+            self._total_bytes = 0
+
+
+_audio_cache = None
+_audio_cache_lock = threading.Lock()
+
+
+def get_audio_cache():
+    """Retorna o cache de áudio do processo, ou None se desativado (AUDIO_CACHE_MAX_BYTES=0)."""
+    global _audio_cache
+    with _audio_cache_lock:
+        if _audio_cache is None and AUDIO_CACHE_MAX_BYTES > 0:
+            _audio_cache = AudioCache()
+    return _audio_cache
+
+
+def get_cache_stats():
+    """Retorna os contadores do cache de áudio (vazio se desativado)."""
+    cache = get_audio_cache()
+    if cache is None:
+        return {}
+    stats = cache.stats.as_dict()
+    stats["size_bytes"] = cache.size_bytes()
+    stats["max_bytes"] = cache.max_bytes
+    return stats
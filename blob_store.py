@@ -0,0 +1,163 @@
+"""Módulo de Armazenamento de Blobs
+
+Guarda em disco as mídias geradas para cada sessão (áudios do resumo e do
+relatório completo). A sessão do Streamlit mantém apenas o identificador do
+blob, e o conteúdo é lido do arquivo na hora de exibir ou baixar. Cada sessão
+tem uma cota de espaço (os blobs mais antigos saem primeiro) e blobs sem uso
+há mais de BLOB_TTL_SECONDS são removidos periodicamente.
+"""
+import hashlib
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from local_storage import atomic_write
+from config import (
+    BLOB_STORE_DIR,
+    BLOB_TTL_SECONDS,
+    BLOB_SESSION_QUOTA_BYTES,
+    BLOB_GC_INTERVAL_SECONDS,
+)
+
+
+class BlobStore:
+    def __init__(self, directory=BLOB_STORE_DIR, ttl_seconds=BLOB_TTL_SECONDS,
+                 session_quota_bytes=BLOB_SESSION_QUOTA_BYTES,
+                 gc_interval_seconds=BLOB_GC_INTERVAL_SECONDS, clock=time.time):
+        """Armazenamento de blobs por sessão em disco."""
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.session_quota_bytes = session_quota_bytes
+        self.gc_interval_seconds = gc_interval_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_gc = None
+
+    def _session_dir(self, session_id):
+        # O id da sessão vem do cookie, que o navegador pode alterar: o hash evita caminhos arbitrários no disco
+        digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.directory, digest)
+
+    def _blob_path(self, session_id, handle):
+        if not handle or not handle.replace("-", "").replace(".", "").isalnum():
+            return None
+        return os.path.join(self._session_dir(session_id), handle)
+
+    def put(self, session_id, data, suffix=".mp3"):
+        """Grava o blob da sessão e retorna o seu identificador."""
+        self.maybe_collect_garbage()
+        handle = f"{uuid.uuid4().hex}{suffix}"
+        session_dir = self._session_dir(session_id)
+        path = os.path.join(session_dir, handle)
+        with atomic_write(path) as f:
+            f.write(data)
+        os.utime(path, (self._clock(), self._clock()))
+        self._enforce_quota(session_dir, keep=handle)
+        return handle
+
+    def path(self, session_id, handle):
+        """Caminho do arquivo do blob (e o marca como usado), ou None se não existir mais."""
+        path = self._blob_path(session_id, handle)
+        if path is None:
+            return None
+        try:
+            os.utime(path, (self._clock(), self._clock()))
+        except FileNotFoundError:
+            return None
+        return path
+
+    def open(self, session_id, handle):
+        """Abre o blob para leitura em modo binário, ou retorna None se não existir mais."""
+        path = self.path(session_id, handle)
+        return open(path, "rb") if path else None
+
+    def delete(self, session_id, handle):
+        path = self._blob_path(session_id, handle)
+        if path is not None and os.path.exists(path):
+            os.remove(path)
+
+    def _blobs(self, session_dir):
+        """Lista (mtime, tamanho, caminho) dos blobs de uma sessão."""
+        blobs = []
+        for entry in os.scandir(session_dir):
+            if entry.name.endswith(".tmp"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            blobs.append((stat.st_mtime, stat.st_size, entry.path))
+        return blobs
+
+    def session_usage(self, session_id):
+        """Espaço em bytes ocupado pelos blobs da sessão."""
+        session_dir = self._session_dir(session_id)
+        if not os.path.isdir(session_dir):
+            return 0
+        return sum(size for _, size, _ in self._blobs(session_dir))
+
+    def _enforce_quota(self, session_dir, keep):
+        """Remove os blobs menos usados da sessão até caber na cota (o recém-gravado fica)."""
+        blobs = sorted(self._blobs(session_dir))
+        total = sum(size for _, size, _ in blobs)
+        for _, size, path in blobs:
+            if total <= self.session_quota_bytes:
+                break
+            if os.path.basename(path) == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # já removido pela coleta de lixo (ou outro processo)
+            total -= size
+
+    def collect_garbage(self):
+        """Remove blobs expirados e diretórios de sessão vazios. Retorna quantos blobs saíram."""
+        if not os.path.isdir(self.directory):
+            return 0
+        deadline = self._clock() - self.ttl_seconds
+        removed = 0
+        for session in os.scandir(self.directory):
+            if not session.is_dir():
+                continue
+            for mtime, _, path in self._blobs(session.path):
+                if mtime < deadline:
+                    try:
+                        os.remove(path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+            try:
+                os.rmdir(session.path)  # só remove se tiver ficado vazio
+            except OSError:
+                pass
+        return removed
+
+    def maybe_collect_garbage(self):
+        """Executa a coleta se o intervalo desde a última tiver passado."""
+        with self._lock:
+            now = self._clock()
+            if self._last_gc is not None and now - self._last_gc < self.gc_interval_seconds:
+                return
+            self._last_gc = now
+        removed = self.collect_garbage()
+        if removed:
+            print(f"🧹 {removed} blob(s) expirado(s) removido(s)")
+
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+_blob_store = None
+_blob_store_lock = threading.Lock()
+
+
+def get_blob_store():
+    """Retorna a instância compartilhada do armazenamento de blobs."""
+    global _blob_store
+    with _blob_store_lock:
+        if _blob_store is None:
+            _blob_store = BlobStore()
+    return _blob_store
@@ -9,10 +9,14 @@ import os
 REPORTS_NEW_DIR = "reports_new"
 REPORTS_PROCESSED_DIR = "reports_processed"
 VECTOR_STORE_DIR = "vector_store_chroma"
+APP_DATA_DIR = "app_data"  # Caches e bancos locais da aplicação
 
 # --- Modelos de IA ---
 LLM_MODEL_NAME = "gpt-4o-mini"  # Modelo padrão
 EMBEDDING_MODEL_NAME = "text-embedding-3-small"
+# Endpoint da API compatível com a OpenAI (None = api.openai.com). Para rodar
+# offline contra o servidor simulado: OPENAI_BASE_URL=http://127.0.0.1:8787/v1
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
 
 # --- Opções de Modelos LLM Disponíveis ---
 AVAILABLE_LLM_MODELS = {
@@ -26,9 +30,157 @@ AVAILABLE_LLM_MODELS = {
 
 # --- Configurações de Áudio ---
 TTS_VOICE = "onyx"  # Voz masculina aveludada da OpenAI
+TTS_MODEL_NAME = "tts-1"
+TTS_CHUNK_CHARS = 4000  # Limite de entrada da API de TTS: 4096 caracteres
+TTS_MAX_WORKERS = 6  # Trechos sintetizados em paralelo (áudio do relatório completo)
+TTS_CHUNK_RETRIES = 2  # Retentativas por trecho que falhar
+TTS_STREAM_FIRST_SEGMENT_CHARS = 200  # Primeiro segmento curto: o áudio começa em poucos segundos
+TTS_STREAM_SEGMENT_CHARS = 1000  # Segmentos seguintes (resumo sintetizado durante a geração)
+SUMMARY_AUDIO_PIPELINED = os.getenv("SUMMARY_AUDIO_PIPELINED", "true").lower() == "true"
+AUDIO_CACHE_DIR = os.path.join(APP_DATA_DIR, "audio_cache")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))  # 0 desativa o cache
+
+# --- Mídias Geradas por Sessão (fora do st.session_state) ---
+BLOB_STORE_DIR = os.path.join(APP_DATA_DIR, "blobs")
+BLOB_TTL_SECONDS = 24 * 60 * 60  # Blobs sem uso por um dia são removidos
+BLOB_SESSION_QUOTA_BYTES = 200 * 1024 ** 2  # Acima disso, os blobs mais antigos da sessão saem
+BLOB_GC_INTERVAL_SECONDS = 600
+
+# --- Configurações de Resumo (Map-Reduce) ---
+SUMMARY_CACHE_DIR = os.path.join(APP_DATA_DIR, "summary_cache")
+SUMMARY_MAP_MODEL_NAME = LLM_MODEL_NAME  # Modelo fixo das seções, para que o cache sirva a qualquer modelo final
+SUMMARY_DIRECT_MAX_TOKENS = 12000  # Textos até este tamanho são resumidos em uma única chamada
+SUMMARY_SECTION_TOKENS = 6000
+SUMMARY_SECTION_OVERLAP_TOKENS = 200
+SUMMARY_REDUCE_MAX_TOKENS = 8000  # Tamanho máximo da entrada de cada etapa de reduce
+SUMMARY_MAX_WORKERS = 4
+SUMMARY_LENGTHS = {
+    "curto": "em no máximo 150 palavras",
+    "médio": "em cerca de 400 palavras",
+    "longo": "em cerca de 900 palavras, detalhando cada seção relevante",
+}
+SUMMARY_DEFAULT_LENGTH = "médio"
+
+# --- Armazenamento de Resultados (resumos, métricas e insights) ---
+RESULT_STORE_PATH = os.path.join(APP_DATA_DIR, "results.sqlite3")
+RESULT_STORE_COMPRESSION_LEVEL = 10  # Nível do zstd
+
+# --- Cache de Respostas do LLM ---
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")  # "memory", "sqlite" ou "none"
+LLM_CACHE_PATH = os.path.join(APP_DATA_DIR, "llm_cache.sqlite3")
+LLM_CACHE_MAX_ENTRIES = 2000
+LLM_CACHE_NONZERO_TEMPERATURE = False  # Por padrão, só chamadas com temperature=0 são determinísticas
+
+# --- Tabela de Métricas Estruturadas (extraídas na ingestão) ---
+METRICS_TABLE_PATH = os.path.join(APP_DATA_DIR, "metrics.parquet")
+METRICS_PAGES_PER_BATCH = 4  # Páginas enviadas por chamada de extração
+METRICS_MAX_WORKERS = 4
+
+# --- Insights Materializados do Dashboard ---
+MATERIALIZE_RETRIEVER_K = 6  # Chunks de cada documento usados nos insights parciais
+MATERIALIZE_MERGE_BATCH = 5  # Documentos incorporados por chamada de consolidação
+
+# --- Clientes da OpenAI (pool de conexões, retentativas e circuit breaker) ---
+OPENAI_REQUEST_TIMEOUT_SECONDS = 120
+OPENAI_MAX_CONNECTIONS = 50
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 20
+OPENAI_MAX_RETRIES = 3
+OPENAI_BACKOFF_BASE_SECONDS = 0.5  # Backoff exponencial com jitter: até base * 2^tentativa
+OPENAI_BACKOFF_MAX_SECONDS = 20
+# Requisições simultâneas por endpoint no processo
+OPENAI_ENDPOINT_CONCURRENCY = {"chat": 16, "embeddings": 8, "tts": 6}
+OPENAI_QUEUE_TIMEOUT_SECONDS = 60  # Espera máxima por uma vaga antes de falhar com 503
+CIRCUIT_WINDOW_SIZE = 20  # Últimas chamadas avaliadas por endpoint
+CIRCUIT_MIN_CALLS = 10
+CIRCUIT_FAILURE_RATIO = 0.5
+CIRCUIT_LATENCY_SECONDS = 60  # Latência mediana que abre o circuito
+CIRCUIT_COOLDOWN_SECONDS = 30
+
+# --- Roteador de Perguntas do Chat ---
+# Perguntas só sobre os relatórios são respondidas com uma única chamada
+# (recuperação + resposta); web e múltiplas etapas seguem para o agente ReAct.
+ROUTER_ENABLED = True
+ROUTER_MIN_SIMILARITY = 0.30  # Similaridade mínima com os exemplos de perguntas de relatório
+ROUTER_MARGIN = 0.02  # Vantagem mínima dos exemplos de relatório sobre os do agente
+ROUTER_RETRIEVER_K = 6
+
+# --- Memória do Chat ---
+CHAT_MEMORY_RECENT_TURNS = 6  # Turnos mantidos na íntegra
+CHAT_MEMORY_RECENT_MAX_TOKENS = 3000  # Orçamento dos turnos na íntegra
+CHAT_MEMORY_SUMMARY_MAX_TOKENS = 600  # Orçamento do resumo dos turnos antigos
+CHAT_MEMORY_MAX_PENDING_TURNS = 20  # Turnos aguardando o resumo; se ele seguir falhando, os mais antigos são descartados
+CHAT_PAGE_SIZE = 20  # Mensagens exibidas por página no chat
+
+# --- Histórico de Sessão (Redis) ---
+# Com REDIS_URL definido, o histórico do chat é compartilhado entre réplicas do app
+REDIS_URL = os.getenv("REDIS_URL") or None
+CHAT_HISTORY_TTL_SECONDS = 7 * 24 * 3600  # Sessões ociosas expiram após 7 dias
+CHAT_HISTORY_MAX_MESSAGES = 500  # Mensagens mantidas por sessão
+CHAT_HISTORY_KEY_PREFIX = "chat_history:"
+# Identificador da sessão do navegador: aleatório e guardado em cookie, fora da URL compartilhável
+SESSION_COOKIE_NAME = "agente_session"
+SESSION_COOKIE_MAX_AGE_SECONDS = CHAT_HISTORY_TTL_SECONDS
+
+# --- Busca na Web do Agente ---
+WEB_SEARCH_CACHE_TTL_SECONDS = 900  # Resultados reaproveitados por 15 minutos
+WEB_SEARCH_CACHE_MAX_ENTRIES = 512
+WEB_SEARCH_TIMEOUT_SECONDS = 8  # Tempo máximo de espera por uma busca
+WEB_SEARCH_MAX_CONCURRENCY = 4  # Buscas simultâneas no processo
+
+# --- Telemetria (tokens, custo e latência) ---
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "rag-investor-agent")
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")  # Sem endpoint, só o agregado local é mantido
+TELEMETRY_WINDOW_SECONDS = 3600  # Janela do agregado exibido na página Sistema
+# Preços em US$ por 1 milhão de tokens (entrada, saída); TTS é cobrado por milhão de caracteres
+MODEL_PRICES_PER_MILLION = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4": (30.00, 60.00),
+    "gpt-5": (1.25, 10.00),
+    "text-embedding-3-small": (0.02, 0.0),
+    "tts-1": (15.00, 0.0),
+}
+
+# --- Serviços Compartilhados (criados uma vez por processo) ---
+SERVICES_WARMUP_QUERY = os.getenv("SERVICES_WARMUP_QUERY", "dividend yield")  # Vazio desativa a consulta de teste
+# Versão dos documentos compartilhada entre os processos (app e API): uma
+# ingestão em qualquer um deles expira os valores derivados de todos
+SERVICES_STATE_PATH = os.path.join(APP_DATA_DIR, "services.sqlite3")
+
+# --- Índice de Páginas dos Relatórios (visualizador de texto e busca textual) ---
+PAGE_STORE_PATH = os.path.join(APP_DATA_DIR, "pages.sqlite3")
+PAGE_EXPORT_DIR = os.path.join(APP_DATA_DIR, "text_exports")  # Textos completos para download
+VIEWER_PAGES_PER_SCREEN = 5  # Páginas exibidas por vez no visualizador
+VIEWER_SEARCH_MAX_MATCHES = 20  # Páginas exibidas na busca no texto
+TEXT_SEARCH_SNIPPET_TOKENS = 16  # Palavras no trecho de cada página encontrada
+
+# --- Tarefas em Segundo Plano (resumos, áudios, insights e ingestão) ---
+JOBS_DB_PATH = os.path.join(APP_DATA_DIR, "jobs.sqlite3")
+JOBS_MAX_WORKERS = 4  # Tarefas executadas ao mesmo tempo no processo
+JOBS_RETENTION_SECONDS = 7 * 24 * 3600  # Tarefas concluídas ficam consultáveis por 7 dias
+JOBS_POLL_INTERVAL_SECONDS = 2  # Intervalo de atualização do andamento na interface
+JOBS_PUBLISH_INTERVAL_SECONDS = 0.5  # Frequência máxima de gravação de resultados parciais
+JOBS_HEARTBEAT_INTERVAL_SECONDS = 5  # Cada processo renova a posse das tarefas que executa
+JOBS_LEASE_SECONDS = 30  # Sem renovação por esse tempo, a tarefa é de um processo que parou e volta para a fila
+
+# --- API HTTP (uvicorn api:app) ---
+API_CONCURRENCY = {"ask": 32, "search": 64, "summarize": 8, "tts": 8, "ingest": 2}  # Requisições simultâneas por tipo, por processo
+API_QUEUE_TIMEOUT_SECONDS = 30  # Espera máxima por uma vaga antes de responder 503
+API_THREADPOOL_SIZE = 64  # Threads para as chamadas bloqueantes (LLM, ChromaDB, SQLite)
+API_MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+API_TTS_MAX_CHARS = 50000
+# Endereço da API visto pelo navegador (ex.: http://localhost:8000). Com ele, o
+# visualizador abre e baixa os PDFs pela rota /documents; vazio, o arquivo é
+# enviado pelo próprio Streamlit
+PDF_PUBLIC_URL = os.getenv("PDF_PUBLIC_URL", "").rstrip("/")
 
 # --- Nomes de Coleção do ChromaDB ---
 CHROMA_COLLECTION_NAME = "investment_reports"
+# Catálogo com as estatísticas por documento, junto dos dados do ChromaDB
+DOCUMENT_CATALOG_PATH = os.path.join(VECTOR_STORE_DIR, "document_catalog.sqlite3")
+CATALOG_REBUILD_BATCH_SIZE = 5000  # Chunks lidos por vez ao reconstruir o catálogo
 
 # --- Prompts do Sistema ---
 AI_SYSTEM_PROMPT = """Você é um assistente especializado em análise de investimentos e relatórios financeiros.
@@ -59,6 +211,6 @@ AI_CONTEXTUALIZE_PROMPT = """Dado um histórico de chat e a pergunta mais recent
 # --- Funções de Inicialização ---
 def ensure_directories_exist():
     """Garante que todos os diretórios necessários existam ao iniciar a aplicação."""
-    for dir_path in [REPORTS_NEW_DIR, REPORTS_PROCESSED_DIR, VECTOR_STORE_DIR]:
+    for dir_path in [REPORTS_NEW_DIR, REPORTS_PROCESSED_DIR, VECTOR_STORE_DIR, APP_DATA_DIR, SUMMARY_CACHE_DIR]:
         if not os.path.exists(dir_path):
             os.makedirs(dir_path)
\ No newline at end of file
@@ -0,0 +1,172 @@
+"""Módulo de Memória da Conversa
+
+Memória limitada para o chat: os últimos turnos ficam na íntegra e os mais
+antigos são condensados em um resumo contínuo, atualizado em segundo plano e
+limitado por um orçamento de tokens. O tamanho do histórico enviado ao LLM a
+cada pergunta fica estável mesmo em sessões longas. Se o resumo falhar
+repetidamente, os turnos que aguardam por ele ficam limitados e os mais
+antigos são descartados.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from langchain_core.memory import BaseMemory
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+import llm_services
+import telemetry
+from summarizer import count_tokens
+from config import (
+    LLM_MODEL_NAME,
+    CHAT_MEMORY_RECENT_TURNS,
+    CHAT_MEMORY_RECENT_MAX_TOKENS,
+    CHAT_MEMORY_SUMMARY_MAX_TOKENS,
+    CHAT_MEMORY_MAX_PENDING_TURNS,
+)
+
+SUMMARY_PREFIX = "Resumo da conversa até aqui:"
+
+# Executor compartilhado pelas sessões para atualizar os resumos em segundo plano
+_summary_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-memory")
+
+
+def _turn_tokens(turn):
+    return count_tokens(turn[0]) + count_tokens(turn[1])
+
+
+class ConversationMemory:
+    def __init__(self, max_turns=CHAT_MEMORY_RECENT_TURNS, recent_max_tokens=CHAT_MEMORY_RECENT_MAX_TOKENS,
+                 summary_max_tokens=CHAT_MEMORY_SUMMARY_MAX_TOKENS, max_pending_turns=CHAT_MEMORY_MAX_PENDING_TURNS,
+                 model_name=None):
+        """Cria a memória de uma sessão de chat."""
+        self.max_turns = max_turns
+        self.recent_max_tokens = recent_max_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.max_pending_turns = max_pending_turns
+        self.model_name = model_name or LLM_MODEL_NAME
+        self.summary = ""
+        self._recent = []  # (pergunta, resposta) mantidos na íntegra
+        self._pending = []  # turnos que saíram da janela e aguardam o resumo
+        self._dropped = 0  # turnos pendentes descartados por exceder max_pending_turns
+        self._epoch = 0  # muda a cada clear()/restore(): resumos da conversa anterior são descartados
+        self._summarizing = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self._lock = threading.Lock()
+
+    def add_turn(self, question, answer):
+        """Registra um turno e agenda o resumo dos turnos que excederem os limites."""
+        with self._lock:
+            self._recent.append((question, answer))
+            while len(self._recent) > 1 and (
+                len(self._recent) > self.max_turns
+                or sum(_turn_tokens(t) for t in self._recent) > self.recent_max_tokens
+            ):
+                self._pending.append(self._recent.pop(0))
+            overflow = len(self._pending) - self.max_pending_turns
+            if overflow > 0:
+                # O resumo vem falhando (ou está lento demais): os turnos mais antigos saem do histórico
+                del self._pending[:overflow]
+                self._dropped += overflow
+                print(f"⚠️ {overflow} turno(s) antigo(s) da conversa descartado(s) sem resumo")
+            should_schedule = bool(self._pending) and not self._summarizing
+            if should_schedule:
+                self._summarizing = True
+                self._idle.clear()
+        if should_schedule:
+            _summary_executor.submit(telemetry.bind_feature(self._summarize_pending))
+
+    def _summarize_pending(self):
+        """Incorpora os turnos pendentes ao resumo até não restar nenhum."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._summarizing = False
+                    self._idle.set()
+                    return
+                batch = list(self._pending)
+                dropped_before = self._dropped
+                epoch = self._epoch
+                current_summary = self.summary
+            try:
+                new_summary = llm_services.summarize_conversation(
+                    current_summary, batch, self.summary_max_tokens, model_name=self.model_name
+                )
+            except Exception as e:
+                # Os turnos continuam pendentes (e no histórico, na íntegra) até a próxima tentativa
+                print(f"⚠️ Erro ao resumir a conversa: {e}")
+                with self._lock:
+                    self._summarizing = False
+                    self._idle.set()
+                return
+            with self._lock:
+                if epoch != self._epoch:
+                    # A conversa foi limpa ou recarregada durante a chamada: o resumo é da anterior
+                    continue
+                self.summary = new_summary
+                # Turnos do lote descartados durante a chamada já saíram da lista
+                del self._pending[:max(0, len(batch) - (self._dropped - dropped_before))]
+
+    def wait_until_idle(self, timeout=None):
+        """Aguarda o término do resumo em segundo plano."""
+        return self._idle.wait(timeout)
+
+    def messages(self):
+        """Histórico para o LLM: resumo, turnos ainda não resumidos e turnos recentes."""
+        with self._lock:
+            summary = self.summary
+            turns = self._pending + self._recent
+        history = [SystemMessage(content=f"{SUMMARY_PREFIX}\n{summary}")] if summary else []
+        for question, answer in turns:
+            history.extend([HumanMessage(content=question), AIMessage(content=answer)])
+        return history
+
+    def format_history(self):
+        """Histórico em texto, para prompts sem suporte a mensagens."""
+        lines = []
+        for message in self.messages():
+            if isinstance(message, SystemMessage):
+                lines.append(message.content)
+            else:
+                role = "Usuário" if isinstance(message, HumanMessage) else "Assistente"
+                lines.append(f"{role}: {message.content}")
+        return "\n".join(lines)
+
+    def restore(self, turns):
+        """Recarrega turnos de um histórico persistido (só os mais recentes, sem resumir)."""
+        with self._lock:
+            self._recent = list(turns)[-self.max_turns:]
+            self._pending = []
+            self._epoch += 1
+
+    def clear(self):
+        with self._lock:
+            self.summary = ""
+            self._recent = []
+            self._pending = []
+            self._epoch += 1
+
+    def as_agent_memory(self):
+        """Adaptador para a memória do agente do LangChain (chave chat_history)."""
+        return AgentMemoryAdapter(conversation=self)
+
+
+class AgentMemoryAdapter(BaseMemory):
+    """Expõe ConversationMemory para o agente, com as mensagens em chat_history."""
+
+    conversation: Any
+    memory_key: str = "chat_history"
+
+    @property
+    def memory_variables(self):
+        return [self.memory_key]
+
+    def load_memory_variables(self, inputs):
+        return {self.memory_key: self.conversation.messages()}
+
+    def save_context(self, inputs, outputs):
+        self.conversation.add_turn(inputs["input"], outputs["output"])
+
+    def clear(self):
+        self.conversation.clear()
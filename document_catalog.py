@@ -0,0 +1,81 @@
+"""Módulo do Catálogo de Documentos
+
+Estatísticas de cada documento do vector store (chunks, páginas, tamanho do
+arquivo, modelo de embeddings e data da ingestão), mantidas em SQLite a cada
+ingestão. O painel Sistema e as contagens de chunks leem o catálogo
+em vez de percorrer a coleção do ChromaDB, de modo que o custo não cresce com
+o número de chunks.
+"""
+import time
+
+from local_storage import SQLiteStore
+from config import DOCUMENT_CATALOG_PATH
+
+COLUMNS = ("source_file", "chunk_count", "page_count", "size_bytes", "embedding_model", "ingested_at")
+
+
+class DocumentCatalog(SQLiteStore):
+    def __init__(self, db_path=DOCUMENT_CATALOG_PATH):
+        """Abre (ou cria) o banco SQLite do catálogo."""
+        super().__init__(db_path)
+
+        conn = self._get_connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                source_file TEXT PRIMARY KEY,
+                chunk_count INTEGER NOT NULL,
+                page_count INTEGER,
+                size_bytes INTEGER,
+                embedding_model TEXT,
+                ingested_at REAL NOT NULL
+            )
+            """
+        )
+        conn.commit()
+
+    def _row(self, source_file, chunk_count, page_count=None, size_bytes=None, embedding_model=None, ingested_at=None):
+        return (source_file, chunk_count, page_count, size_bytes, embedding_model, ingested_at or time.time())
+
+    def record(self, source_file, chunk_count, page_count=None, size_bytes=None, embedding_model=None, ingested_at=None):
+        """Registra (ou substitui) as estatísticas de um documento ingerido."""
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                self._row(source_file, chunk_count, page_count, size_bytes, embedding_model, ingested_at),
+            )
+
+    def replace_all(self, entries):
+        """Substitui o catálogo inteiro (usado ao reconstruí-lo a partir da coleção).
+
+        entries é uma lista de dicts com as chaves de record().
+        """
+        conn = self._get_connection()
+        with conn:
+            conn.execute("DELETE FROM documents")
+            conn.executemany(
+                "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                [self._row(**entry) for entry in entries],
+            )
+
+    def get(self, source_file):
+        """Estatísticas do documento, ou None se ele não estiver no catálogo."""
+        row = self._get_connection().execute(
+            "SELECT * FROM documents WHERE source_file = ?", (source_file,)
+        ).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def documents(self):
+        """{documento: estatísticas}, em ordem alfabética."""
+        rows = self._get_connection().execute("SELECT * FROM documents ORDER BY source_file").fetchall()
+        info = {}
+        for row in rows:
+            entry = dict(zip(COLUMNS[1:], row[1:]))
+            entry["total_chunks"] = entry["chunk_count"]
+            info[row[0]] = entry
+        return info
+
+    def total_chunks(self):
+        """Soma dos chunks de todos os documentos."""
+        return self._get_connection().execute("SELECT COALESCE(SUM(chunk_count), 0) FROM documents").fetchone()[0]
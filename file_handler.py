@@ -2,11 +2,14 @@
 
 Responsável por salvar, mover e ler arquivos PDF.
 """
+import hashlib
 import os
 import shutil
-from langchain_community.document_loaders import PyPDFLoader
 from config import REPORTS_NEW_DIR, REPORTS_PROCESSED_DIR
 
+# Cache de hashes por (caminho, tamanho, mtime) para não reler arquivos a cada rerun
+_file_hash_cache = {}
+
 def save_uploaded_files(uploaded_files):
     """Salva os arquivos enviados na pasta de novos relatórios."""
     for uploaded_file in uploaded_files:
@@ -31,10 +34,36 @@ def get_all_processed_reports():
     # CORREÇÃO: Usar os.listdir diretamente
     return sorted([f for f in os.listdir(REPORTS_PROCESSED_DIR) if f.endswith('.pdf')])
 
+def get_file_hash(file_path):
+    """Retorna o SHA-256 do conteúdo de um arquivo, reaproveitando o valor enquanto ele não mudar."""
+    stat = os.stat(file_path)
+    cache_key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if cache_key not in _file_hash_cache:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        _file_hash_cache[cache_key] = digest.hexdigest()
+    return _file_hash_cache[cache_key]
+
+def get_corpus_version():
+    """Retorna uma versão do conjunto de relatórios processados (muda quando qualquer arquivo muda)."""
+    digest = hashlib.sha256()
+    for file_name in get_all_processed_reports():
+        file_hash = get_file_hash(os.path.join(REPORTS_PROCESSED_DIR, file_name))
+        digest.update(f"{file_name}:{file_hash}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+def get_pdf_pages(file_path):
+    """Extrai o texto de cada página de um PDF, na ordem do documento."""
+    from langchain_community.document_loaders import PyPDFLoader  # carregado só ao ler um PDF
+
+    loader = PyPDFLoader(file_path)
+    return [doc.page_content for doc in loader.load()]
+
 def get_full_pdf_text(file_path):
     """Extrai e retorna todo o texto de um único arquivo PDF."""
-    loader = PyPDFLoader(file_path)
-    return "\n".join([doc.page_content for doc in loader.load()])
+    return "\n".join(get_pdf_pages(file_path))
 
 def clean_redundant_directories():
     """Remove duplicatas e organiza arquivos corretamente."""
@@ -0,0 +1,177 @@
+"""Módulo de Benchmark de Importação
+
+Mede o tempo de importação de módulos da aplicação com `python -X importtime`
+em um processo novo (sem nada em cache) e verifica os orçamentos de tempo e a
+ausência de dependências pesadas na inicialização. Mede também a primeira
+execução de main() com uma aba aberta (o que o usuário espera até ver a
+página), sem contar o aquecimento dos serviços, que roda em outra thread. Uso:
+
+    python import_benchmark.py app ui.viewer --top 15 --tabs viewer
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Orçamento de importação (cumulativo, em segundos) de cada ponto de entrada
+IMPORT_BUDGETS_SECONDS = {
+    "app": 1.0,
+    "ui.viewer": 1.0,
+}
+
+# Orçamento da primeira execução de main() (em segundos) com cada aba aberta
+FIRST_RUN_BUDGETS_SECONDS = {
+    "viewer": 1.0,
+}
+
+# Dependências que não podem ser carregadas antes de uma página precisar delas
+HEAVY_MODULES = (
+    "langchain.agents",
+    "langchain.chains",
+    "langchain_community",
+    "langchain_chroma",
+    "langchain_openai",
+    "chromadb",
+    "pyarrow",
+)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure_imports(module, python=None):
+    """Importa o módulo em um processo novo e retorna {módulo: (próprio, cumulativo)} em segundos."""
+    result = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao importar {module}:\n{result.stderr[-2000:]}")
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        timings[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return timings
+
+
+# Executa app.py uma vez com o AppTest do Streamlit, com a aba informada, sem a thread de aquecimento
+# e com o banco de tarefas num diretório temporário (as tarefas reais não são tocadas nem recuperadas)
+_FIRST_RUN_SCRIPT = """
+import json, os, sys, tempfile, time
+sys.path.insert(0, ".")
+from streamlit.testing.v1 import AppTest
+import jobs
+import ui
+jobs.JOBS_DB_PATH = os.path.join(tempfile.mkdtemp(), "jobs.sqlite3")
+warm_ups = []
+ui.start_services_warm_up = lambda: warm_ups.append(True)
+before = set(sys.modules)
+app = AppTest.from_file("app.py", default_timeout=60)
+app.session_state["active_tab"] = sys.argv[1]
+started = time.perf_counter()
+app.run()
+print(json.dumps({
+    "seconds": time.perf_counter() - started,
+    "modules": sorted(set(sys.modules) - before),
+    "warm_up_started": bool(warm_ups),
+    "job_runner_created": jobs._job_runner is not None,
+    "errors": [str(error.message) for error in app.exception],
+}))
+"""
+
+
+def measure_first_run(tab, python=None):
+    """Executa main() uma vez com a aba aberta em um processo novo.
+
+    Retorna o tempo da execução, os módulos importados por ela e se o
+    aquecimento dos serviços foi disparado.
+    """
+    result = subprocess.run(
+        [python or sys.executable, "-c", _FIRST_RUN_SCRIPT, tab],
+        cwd=PROJECT_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Falha ao executar a aba {tab}:\n{result.stderr[-2000:]}")
+    run = json.loads(result.stdout.strip().splitlines()[-1])
+    if run["errors"]:
+        raise RuntimeError(f"Erro na aba {tab}: {run['errors'][0]}")
+    return run
+
+
+def heavy_modules_loaded(timings):
+    """Dependências pesadas (ou submódulos delas) presentes na importação."""
+    return sorted(
+        name for name in timings
+        if any(name == heavy or name.startswith(f"{heavy}.") for heavy in HEAVY_MODULES)
+    )
+
+
+def report(module, top=10):
+    """Resumo da importação: tempo cumulativo, orçamento, pesados carregados e maiores custos."""
+    timings = measure_imports(module)
+    cumulative = timings[module][1]
+    budget = IMPORT_BUDGETS_SECONDS.get(module)
+    lines = [f"{module}: {cumulative:.2f}s" + (f" (orçamento {budget:.2f}s)" if budget else "")]
+    heavy = heavy_modules_loaded(timings)
+    if heavy:
+        lines.append(f"  dependências pesadas carregadas: {', '.join(heavy[:10])}")
+    top_level = sorted(
+        ((name, values[1]) for name, values in timings.items() if "." not in name and name != module),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    for name, seconds in top_level[:top]:
+        lines.append(f"  {seconds:6.2f}s  {name}")
+    return "\n".join(lines), cumulative, budget, heavy
+
+
+def report_first_run(tab):
+    """Resumo da primeira execução de main() com a aba aberta."""
+    run = measure_first_run(tab)
+    budget = FIRST_RUN_BUDGETS_SECONDS.get(tab)
+    lines = [f"main() com a aba {tab}: {run['seconds']:.2f}s" + (f" (orçamento {budget:.2f}s)" if budget else "")]
+    heavy = heavy_modules_loaded(run["modules"])
+    if heavy:
+        lines.append(f"  dependências pesadas carregadas: {', '.join(heavy[:10])}")
+    if "services" in run["modules"]:
+        lines.append("  services importado na thread do script")
+    if not run["warm_up_started"]:
+        lines.append("  aquecimento dos serviços não foi disparado")
+    if run["job_runner_created"]:
+        lines.append("  executor de tarefas criado na thread do script")
+    ok = not heavy and "services" not in run["modules"] and run["warm_up_started"] and not run["job_runner_created"]
+    return "\n".join(lines), run["seconds"], budget, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de importação dos módulos da aplicação")
+    parser.add_argument("modules", nargs="*", default=list(IMPORT_BUDGETS_SECONDS))
+    parser.add_argument("--top", type=int, default=10, help="Quantos módulos mais caros listar")
+    parser.add_argument("--tabs", nargs="*", default=list(FIRST_RUN_BUDGETS_SECONDS),
+                        help="Abas cuja primeira execução de main() é medida")
+    args = parser.parse_args()
+
+    failed = False
+    for module in args.modules:
+        text, cumulative, budget, heavy = report(module, top=args.top)
+        print(text)
+        if budget is not None:
+            failed |= bool(heavy) or cumulative > budget
+    for tab in args.tabs:
+        text, seconds, budget, ok = report_first_run(tab)
+        print(text)
+        if budget is not None:
+            failed |= not ok or seconds > budget
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
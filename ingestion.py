@@ -0,0 +1,64 @@
+"""Módulo de Ingestão
+
+Orquestra o processamento de um relatório novo: indexação no vector store,
+índice de páginas do visualizador, extração das métricas estruturadas e
+movimentação para a pasta de processados.
+"""
+import os
+
+import file_handler
+import metrics_store
+import page_store
+
+
+def ingest_report(vector_manager, report_path, model_name=None):
+    """Processa um relatório de reports_new e retorna o número de chunks adicionados.
+
+    Duplicatas não são reindexadas, mas também são movidas para a pasta de
+    processados. Falhas no índice de páginas e na extração de métricas não
+    interrompem a ingestão.
+    """
+    chunks_added = vector_manager.add_documents_from_file(report_path)
+
+    if chunks_added > 0:
+        try:
+            page_store.get_page_store().index(report_path)
+        except Exception as e:
+            print(f"⚠️ Erro ao indexar as páginas de {os.path.basename(report_path)}: {e}")
+        try:
+            metrics_store.index_document_metrics(report_path, model_name=model_name)
+        except Exception as e:
+            print(f"⚠️ Erro ao extrair métricas de {os.path.basename(report_path)}: {e}")
+
+    file_handler.move_processed_file(report_path)
+    return chunks_added
+
+
+def backfill_metrics(model_name=None):
+    """Extrai métricas dos relatórios processados que ainda não estão na tabela."""
+    store = metrics_store.get_metrics_store()
+    indexed = store.documents()
+    missing = [f for f in file_handler.get_all_processed_reports() if f not in indexed]
+    for file_name in missing:
+        try:
+            metrics_store.index_document_metrics(
+                os.path.join(file_handler.REPORTS_PROCESSED_DIR, file_name),
+                model_name=model_name,
+                store=store,
+            )
+        except Exception as e:
+            print(f"⚠️ Erro ao extrair métricas de {file_name}: {e}")
+    return len(missing)
+
+
+def backfill_pages():
+    """Indexa o texto dos relatórios processados que ainda não estão no índice de páginas."""
+    store = page_store.get_page_store()
+    indexed = store.documents()
+    missing = [f for f in file_handler.get_all_processed_reports() if f not in indexed]
+    for file_name in missing:
+        try:
+            store.index(os.path.join(file_handler.REPORTS_PROCESSED_DIR, file_name))
+        except Exception as e:
+            print(f"⚠️ Erro ao indexar as páginas de {file_name}: {e}")
+    return len(missing)
@@ -0,0 +1,165 @@
+"""Módulo de Materialização de Insights
+
+Pré-calcula o Resumo Executivo e a Análise Detalhada do Dashboard após cada
+lote de ingestão. Cada relatório novo gera insights parciais (restritos aos
+seus próprios chunks), que são incorporados à visão consolidada do acervo já
+existente. O custo de atualização cresce com o número de documentos novos, não
+com o tamanho do acervo.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import file_handler
+import llm_services
+import result_store
+import telemetry
+from config import (
+    LLM_MODEL_NAME,
+    MATERIALIZE_RETRIEVER_K,
+    MATERIALIZE_MERGE_BATCH,
+)
+
+PARTIAL_OPERATION = "partial_insights"
+VIEW_OPERATION = "materialized_insights"
+VIEW_KEY = "corpus"
+
+MARKET_SUMMARY_TOPIC = "resumo executivo do mercado"
+
+
+def _partial_prompt_version():
+    return f"{llm_services.PROMPT_VERSIONS['market_summary']}.{llm_services.PROMPT_VERSIONS['insights']}"
+
+
+def _view_prompt_version():
+    return f"{_partial_prompt_version()}.{llm_services.PROMPT_VERSIONS['merge_insights']}"
+
+
+def _empty_view():
+    return {"documents": {}, "market_summary": "", "insights": {}}
+
+
+def _is_valid_partial(partial):
+    texts = [partial["market_summary"], *partial["insights"].values()]
+    return bool(partial["insights"]) and all(text and not text.startswith("Erro") for text in texts)
+
+
+def compute_document_partials(vector_manager, file_name, model_name=None):
+    """Calcula (ou reaproveita) os insights parciais de um único relatório."""
+    model_name = model_name or LLM_MODEL_NAME
+    file_path = os.path.join(file_handler.REPORTS_PROCESSED_DIR, file_name)
+    retriever = vector_manager.get_retriever(k=MATERIALIZE_RETRIEVER_K, source_file=file_name)
+
+    def compute():
+        print(f"🧮 Calculando insights parciais: {file_name}")
+        return {
+            "market_summary": llm_services.generate_market_summary(retriever, model_name=model_name),
+            "insights": llm_services.generate_insights_from_documents(retriever, model_name=model_name),
+        }
+
+    return result_store.get_result_store().get_or_compute(
+        PARTIAL_OPERATION,
+        file_handler.get_file_hash(file_path),
+        model_name,
+        _partial_prompt_version(),
+        compute,
+        should_store=_is_valid_partial,
+    )
+
+
+def _merge_partials(view, partials, model_name):
+    """Incorpora insights parciais de novos documentos à visão consolidada."""
+    if not view["documents"] and len(partials) == 1:
+        # Primeiro documento do acervo: a visão consolidada é o próprio parcial
+        return {
+            "documents": view["documents"],
+            "market_summary": partials[0]["market_summary"],
+            "insights": dict(partials[0]["insights"]),
+        }
+
+    queries = list(partials[0]["insights"].keys())
+    for query in view["insights"]:
+        if query not in queries:
+            queries.append(query)
+
+    def merge_market_summary():
+        return llm_services.merge_insight_texts(
+            view["market_summary"],
+            [p["market_summary"] for p in partials],
+            MARKET_SUMMARY_TOPIC,
+            model_name=model_name,
+        )
+
+    def merge_query(query):
+        return llm_services.merge_insight_texts(
+            view["insights"].get(query, ""),
+            [p["insights"][query] for p in partials if query in p["insights"]],
+            query,
+            model_name=model_name,
+        )
+
+    with ThreadPoolExecutor(max_workers=len(queries) + 1) as executor:
+        market_future = executor.submit(telemetry.bind_feature(merge_market_summary))
+        insight_futures = {query: executor.submit(telemetry.bind_feature(merge_query), query) for query in queries}
+        return {
+            "documents": view["documents"],
+            "market_summary": market_future.result(),
+            "insights": {query: future.result() for query, future in insight_futures.items()},
+        }
+
+
+def get_materialized_view(model_name=None):
+    """Retorna a visão consolidada pré-calculada, ou None se ainda não existir."""
+    return result_store.get_result_store().get(
+        VIEW_OPERATION, VIEW_KEY, model_name or LLM_MODEL_NAME, _view_prompt_version()
+    )
+
+
+def pending_documents(model_name=None):
+    """Lista os relatórios processados que ainda não estão na visão consolidada."""
+    view = get_materialized_view(model_name) or _empty_view()
+    return [f for f in file_handler.get_all_processed_reports() if f not in view["documents"]]
+
+
+def materialize(vector_manager, model_name=None):
+    """Atualiza a visão consolidada com os relatórios ainda não incorporados.
+
+    Se algum relatório consolidado foi removido ou alterado, a visão é
+    reconstruída a partir dos parciais armazenados (sem recalculá-los).
+    """
+    model_name = model_name or LLM_MODEL_NAME
+    store = result_store.get_result_store()
+
+    current_documents = {
+        file_name: file_handler.get_file_hash(os.path.join(file_handler.REPORTS_PROCESSED_DIR, file_name))
+        for file_name in file_handler.get_all_processed_reports()
+    }
+
+    view = get_materialized_view(model_name) or _empty_view()
+    if any(current_documents.get(name) != file_hash for name, file_hash in view["documents"].items()):
+        print("♻️ Acervo alterado: reconstruindo insights consolidados a partir dos parciais")
+        view = _empty_view()
+
+    new_documents = [name for name in current_documents if name not in view["documents"]]
+    if not new_documents:
+        return view
+
+    for start in range(0, len(new_documents), MATERIALIZE_MERGE_BATCH):
+        batch = new_documents[start:start + MATERIALIZE_MERGE_BATCH]
+        partials = []
+        merged_names = []
+        for file_name in batch:
+            partial = compute_document_partials(vector_manager, file_name, model_name=model_name)
+            if _is_valid_partial(partial):
+                partials.append(partial)
+                merged_names.append(file_name)
+            else:
+                print(f"⚠️ Insights parciais inválidos para {file_name}; será tentado novamente")
+        if not partials:
+            continue
+
+        view = _merge_partials(view, partials, model_name)
+        view["documents"].update({name: current_documents[name] for name in merged_names})
+        store.put(VIEW_OPERATION, VIEW_KEY, model_name, _view_prompt_version(), view)
+        print(f"✅ Insights consolidados: {len(view['documents'])} documento(s)")
+
+    return view
@@ -0,0 +1,392 @@
+"""Módulo de Tarefas em Segundo Plano
+
+Executa as ações demoradas (resumos, áudios, insights e ingestão) fora do
+script do Streamlit. As tarefas ficam em uma tabela SQLite com estado,
+progresso, resultado (inclusive parcial) e erro, e rodam em um pool de threads
+do processo: a página só envia a tarefa e acompanha o andamento, e o trabalho
+continua se o usuário trocar de aba ou recarregar a página.
+
+Vários processos (o app e os workers da API) compartilham a tabela. Quem
+executa uma tarefa grava a sua identificação (host, pid e instância) e renova
+a posse a cada JOBS_HEARTBEAT_INTERVAL_SECONDS; só tarefas sem renovação há
+mais de JOBS_LEASE_SECONDS, de um processo que parou, voltam para a fila.
+"""
+import json
+import os
+import pathlib
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from local_storage import SQLiteStore
+from config import (
+    JOBS_DB_PATH,
+    JOBS_MAX_WORKERS,
+    JOBS_RETENTION_SECONDS,
+    JOBS_PUBLISH_INTERVAL_SECONDS,
+    JOBS_HEARTBEAT_INTERVAL_SECONDS,
+    JOBS_LEASE_SECONDS,
+)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Levantada dentro de uma tarefa cujo cancelamento foi solicitado."""
+
+
+class JobContext:
+    def __init__(self, runner, job_id, session_id):
+        """Canal entre a tarefa em execução e a tabela: progresso, parciais e cancelamento."""
+        self.runner = runner
+        self.job_id = job_id
+        self.session_id = session_id
+        self._last_publish = 0.0
+
+    @property
+    def cancelled(self):
+        return self.runner._cancel_requested(self.job_id)
+
+    def check_cancelled(self):
+        """Interrompe a tarefa (com JobCancelled) se o cancelamento foi solicitado."""
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, done, total, message=None):
+        """Registra o andamento (concluídos de total) e verifica o cancelamento."""
+        self.runner._update(self.job_id, progress=done / total if total else None, message=message)
+        self.check_cancelled()
+
+    def publish(self, partial_result, force=False):
+        """Grava um resultado parcial, no máximo a cada JOBS_PUBLISH_INTERVAL_SECONDS (salvo force)."""
+        now = time.time()
+        if force or now - self._last_publish >= JOBS_PUBLISH_INTERVAL_SECONDS:
+            self._last_publish = now
+            self.runner._update(self.job_id, result=partial_result)
+        self.check_cancelled()
+
+
+class JobRunner(SQLiteStore):
+    row_factory = sqlite3.Row
+
+    def __init__(self, db_path=JOBS_DB_PATH, max_workers=JOBS_MAX_WORKERS,
+                 retention_seconds=JOBS_RETENTION_SECONDS, handlers=None,
+                 heartbeat_interval=JOBS_HEARTBEAT_INTERVAL_SECONDS, lease_seconds=JOBS_LEASE_SECONDS):
+        """Abre (ou cria) a tabela de tarefas, o pool de threads que as executa e a renovação da posse."""
+        super().__init__(db_path)
+        self.retention_seconds = retention_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._handlers = dict(handlers or {})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jobs")
+        self._submit_lock = threading.Lock()
+
+        conn = self._get_connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                job_key TEXT NOT NULL,
+                session_id TEXT,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL,
+                message TEXT,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner TEXT,
+                heartbeat_at REAL
+            )
+            """
+        )
+        # Bancos criados antes da posse das tarefas
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_by_key ON jobs (session_id, job_key, created_at)")
+        conn.commit()
+
+        self._stop = threading.Event()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="jobs-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def register(self, kind, handler):
+        """Registra a função que executa as tarefas do tipo: handler(contexto, **parâmetros) -> resultado."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind, params=None, session_id=None, key=None):
+        """Enfileira uma tarefa e retorna o seu id.
+
+        Se já houver uma tarefa ativa com a mesma chave na sessão (por exemplo,
+        um clique repetido), o id dela é retornado em vez de criar outra.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"Tipo de tarefa desconhecido: {kind}")
+        key = key or kind
+        with self._submit_lock:
+            active = self.latest(session_id, key)
+            if active is not None and active["status"] in ACTIVE_STATUSES:
+                return active["id"]
+            job_id = uuid.uuid4().hex
+            conn = self._get_connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, job_key, session_id, params, status, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, kind, key, session_id, json.dumps(params or {}), QUEUED, time.time()),
+                )
+        self._executor.submit(self._run, job_id)
+        return job_id
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["key"] = job.pop("job_key")
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def get(self, job_id):
+        """Estado da tarefa (dict), ou None se ela não existir."""
+        row = self._get_connection().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row)
+
+    def latest(self, session_id, key):
+        """Tarefa mais recente da chave na sessão (None = tarefas sem sessão)."""
+        row = self._get_connection().execute(
+            "SELECT * FROM jobs WHERE session_id IS ? AND job_key = ? ORDER BY created_at DESC LIMIT 1",
+            (session_id, key),
+        ).fetchone()
+        return self._row_to_job(row)
+
+    def list(self, session_id=None, active_only=False, limit=20):
+        """Tarefas da sessão, das mais recentes para as mais antigas."""
+        query = "SELECT * FROM jobs WHERE session_id IS ?"
+        if active_only:
+            query += f" AND status IN {ACTIVE_STATUSES}"
+        rows = self._get_connection().execute(
+            query + " ORDER BY created_at DESC LIMIT ?", (session_id, limit)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def count_active(self):
+        """Número de tarefas na fila ou em execução (todas as sessões)."""
+        return self._get_connection().execute(
+            f"SELECT COUNT(*) FROM jobs WHERE status IN {ACTIVE_STATUSES}"
+        ).fetchone()[0]
+
+    def cancel(self, job_id):
+        """Cancela a tarefa: na fila, ela não chega a rodar; em execução, para no próximo ponto de verificação."""
+        conn = self._get_connection()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED),
+            )
+            if cursor.rowcount:
+                return True
+            cursor = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING)
+            )
+        return bool(cursor.rowcount)
+
+    def delete(self, job_id):
+        """Remove uma tarefa já encerrada."""
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                f"DELETE FROM jobs WHERE id = ? AND status NOT IN {ACTIVE_STATUSES}", (job_id,)
+            )
+
+    def wait(self, job_id, timeout=None, interval=0.05):
+        """Espera a tarefa terminar e retorna o seu estado final (ou o atual, se o prazo acabar)."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.time() >= deadline:
+                return job
+            time.sleep(interval)
+
+    def _cancel_requested(self, job_id):
+        row = self._get_connection().execute(
+            "SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        return bool(row and row[0])
+
+    def _update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._get_connection()
+        with conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _finish(self, job_id, **fields):
+        # Só o dono grava o desfecho: se a posse expirou e outro processo
+        # assumiu a tarefa, o resultado atrasado deste é descartado
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND owner = ?",
+                (*fields.values(), job_id, self.owner),
+            )
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                conn = self._get_connection()
+                with conn:
+                    conn.execute(
+                        "UPDATE jobs SET heartbeat_at = ? WHERE owner = ? AND status = ?",
+                        (time.time(), self.owner, RUNNING),
+                    )
+                self._requeue_expired()
+            except Exception as e:
+                print(f"⚠️ Erro ao renovar as tarefas em execução: {e}")
+
+    def _requeue_expired(self):
+        """Recoloca na fila (e envia ao pool) as tarefas cujo dono parou de renovar a posse; retorna os ids."""
+        expired_before = time.time() - self.lease_seconds
+        conn = self._get_connection()
+        expired = conn.execute(
+            "SELECT id FROM jobs WHERE status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+            (RUNNING, expired_before),
+        ).fetchall()
+        requeued = []
+        with conn:
+            for (job_id,) in expired:
+                # A condição é repetida: outro processo pode ter recolocado a tarefa antes
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = ?, progress = NULL, message = NULL, started_at = NULL, "
+                    "owner = NULL, heartbeat_at = NULL "
+                    "WHERE id = ? AND status = ? AND (heartbeat_at IS NULL OR heartbeat_at < ?)",
+                    (QUEUED, job_id, RUNNING, expired_before),
+                )
+                if cursor.rowcount:
+                    requeued.append(job_id)
+            conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE status = ? AND cancel_requested = 1",
+                (CANCELLED, time.time(), QUEUED),
+            )
+        for job_id in requeued:
+            self._executor.submit(self._run, job_id)
+        if requeued:
+            print(f"🔁 {len(requeued)} tarefa(s) de um processo encerrado recolocada(s) na fila")
+        return requeued
+
+    def _run(self, job_id):
+        conn = self._get_connection()
+        now = time.time()
+        with conn:
+            claimed = conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, now, self.owner, now, job_id, QUEUED),
+            ).rowcount
+        if not claimed:
+            return  # cancelada enquanto estava na fila
+        job = self.get(job_id)
+        started = time.time()
+        try:
+            handler = self._handlers.get(job["kind"])
+            if handler is None:
+                raise ValueError(f"Tipo de tarefa desconhecido: {job['kind']}")
+            result = handler(JobContext(self, job_id, job["session_id"]), **job["params"])
+            self._finish(job_id, status=SUCCEEDED, progress=1.0, result=result, finished_at=time.time())
+            print(f"✅ Tarefa {job['kind']} concluída em {time.time() - started:.1f}s")
+        except JobCancelled:
+            self._finish(job_id, status=CANCELLED, finished_at=time.time())
+            print(f"⏹️ Tarefa {job['kind']} cancelada")
+        except Exception as e:
+            self._finish(job_id, status=FAILED, error=str(e) or type(e).__name__, finished_at=time.time())
+            print(f"❌ Tarefa {job['kind']} falhou: {e}")
+
+    def recover(self):
+        """Apaga as tarefas encerradas há muito tempo, recoloca na fila as de processos que pararam
+        e envia ao pool as que estão na fila. Retorna quantas foram enviadas.
+
+        Tarefas em execução por outro processo vivo (posse renovada) não são tocadas.
+        """
+        conn = self._get_connection()
+        with conn:
+            conn.execute(
+                f"DELETE FROM jobs WHERE status NOT IN {ACTIVE_STATUSES} AND finished_at < ?",
+                (time.time() - self.retention_seconds,),
+            )
+        requeued = self._requeue_expired()
+        # Tarefas na fila também podem estar no pool de outro processo: a
+        # reserva em _run é atômica, e só um deles chega a executá-las
+        pending = [
+            job_id
+            for (job_id,) in conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (QUEUED,))
+            if job_id not in requeued
+        ]
+        for job_id in pending:
+            self._executor.submit(self._run, job_id)
+        return len(requeued) + len(pending)
+
+    def shutdown(self, wait=True):
+        self._stop.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Retorna o executor de tarefas do processo, com as tarefas da aplicação registradas."""
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            import report_jobs
+
+            _job_runner = JobRunner(db_path=JOBS_DB_PATH, handlers=report_jobs.HANDLERS)
+            _job_runner.recover()
+    return _job_runner
+
+
+def has_active_jobs(session_id):
+    """Se a sessão tem tarefas na fila ou em execução.
+
+    Não cria o executor (nem recupera tarefas) só para responder: sem ele, o
+    banco é lido em modo somente leitura. O executor é criado ao enviar ou
+    acompanhar uma tarefa, ou no aquecimento dos serviços.
+    """
+    if _job_runner is not None:
+        return bool(_job_runner.list(session_id, active_only=True, limit=1))
+    if not os.path.exists(JOBS_DB_PATH):
+        return False
+    try:
+        conn = sqlite3.connect(f"{pathlib.Path(JOBS_DB_PATH).resolve().as_uri()}?mode=ro", uri=True, timeout=30)
+        try:
+            row = conn.execute(
+                f"SELECT 1 FROM jobs WHERE session_id IS ? AND status IN {ACTIVE_STATUSES} LIMIT 1", (session_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError:
+        # Banco ainda sem a tabela de tarefas
+        return False
+    return row is not None
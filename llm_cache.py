@@ -0,0 +1,210 @@
+"""Módulo de Cache de Respostas do LLM
+
+Cache plugável para os ChatOpenAI criados em llm_services. A chave é o prompt
+exato mais o modelo e seus parâmetros (llm_string do LangChain). Há um backend
+LRU em memória e outro em SQLite, ambos com limite de entradas, e contadores
+de acertos para acompanhar a taxa de reaproveitamento. As gerações devolvidas
+pelo cache vêm marcadas com generation_info["cached"], para que a telemetria
+não conte de novo o custo da chamada original.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+from local_storage import SQLiteStore
+from config import (
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_PATH,
+    LLM_CACHE_MAX_ENTRIES,
+    LLM_CACHE_NONZERO_TEMPERATURE,
+)
+
+
+def _mark_cached(generations):
+    """Cópias das gerações marcadas como vindas do cache (as armazenadas não são alteradas)."""
+    return [
+        generation.model_copy(update={"generation_info": {**(generation.generation_info or {}), "cached": True}})
+        for generation in generations
+    ]
+
+
+class LLMCacheStats:
+    def __init__(self):
+        """Contadores de acertos, falhas e remoções do cache."""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def record_evictions(self, count):
+        with self._lock:
+            self.evictions += count
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class InMemoryLRUCache(BaseCache):
+    def __init__(self, max_entries=LLM_CACHE_MAX_ENTRIES):
+        """Cache LRU em memória, restrito ao processo atual."""
+        self.max_entries = max_entries
+        self.stats = LLMCacheStats()
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, prompt, llm_string):
+        key = (prompt, llm_string)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        self.stats.record(value is not None)
+        return _mark_cached(value) if value is not None else None
+
+    def update(self, prompt, llm_string, return_val):
+        key = (prompt, llm_string)
+        with self._lock:
+            self._entries[key] = return_val
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self.stats.record_evictions(evicted)
+
+    def clear(self, **kwargs):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self):
+        """Número de entradas armazenadas."""
+        return len(self._entries)
+
+
+class SQLiteLRUCache(SQLiteStore, BaseCache):
+    def __init__(self, db_path=LLM_CACHE_PATH, max_entries=LLM_CACHE_MAX_ENTRIES):
+        """Cache LRU persistente em SQLite, compartilhado entre processos e reinícios."""
+        super().__init__(db_path)
+        self.max_entries = max_entries
+        self.stats = LLMCacheStats()
+
+        conn = self._get_connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON llm_cache (last_access)")
+        conn.commit()
+
+    @staticmethod
+    def _make_key(prompt, llm_string):
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt, llm_string):
+        key = self._make_key(prompt, llm_string)
+        conn = self._get_connection()
+        row = conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        self.stats.record(row is not None)
+        if row is None:
+            return None
+        conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        conn.commit()
+        try:
+            return _mark_cached(loads(row[0]))
+        except Exception as e:
+            print(f"⚠️ Entrada inválida no cache do LLM: {e}")
+            return None
+
+    def update(self, prompt, llm_string, return_val):
+        key = self._make_key(prompt, llm_string)
+        conn = self._get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, last_access) VALUES (?, ?, ?)",
+            (key, dumps(return_val), time.time()),
+        )
+        cursor = conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        conn.commit()
+        if cursor.rowcount > 0:
+            self.stats.record_evictions(cursor.rowcount)
+
+    def clear(self, **kwargs):
+        conn = self._get_connection()
+        conn.execute("DELETE FROM llm_cache")
+        conn.commit()
+
+    def size(self):
+        """Número de entradas armazenadas."""
+        return self._get_connection().execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Retorna o cache do processo conforme LLM_CACHE_BACKEND, ou None se desativado."""
+    global _cache
+    with _cache_lock:
+        if _cache is None and LLM_CACHE_BACKEND != "none":
+            if LLM_CACHE_BACKEND == "sqlite":
+                _cache = SQLiteLRUCache()
+            else:
+                _cache = InMemoryLRUCache()
+    return _cache
+
+
+def get_llm_cache(temperature, allow_nonzero_temperature=None):
+    """Retorna o cache a usar em um ChatOpenAI com a temperatura informada.
+
+    Chamadas com temperatura diferente de zero não são determinísticas e ignoram
+    o cache, a menos que allow_nonzero_temperature (ou LLM_CACHE_NONZERO_TEMPERATURE)
+    esteja ativo. O retorno False desativa o cache no modelo.
+    """
+    if allow_nonzero_temperature is None:
+        allow_nonzero_temperature = LLM_CACHE_NONZERO_TEMPERATURE
+    if temperature != 0 and not allow_nonzero_temperature:
+        return False
+    cache = get_shared_cache()
+    return cache if cache is not None else False
+
+
+def get_cache_stats():
+    """Retorna os contadores do cache compartilhado (vazio se desativado)."""
+    cache = get_shared_cache()
+    if cache is None:
+        return {}
+    stats = cache.stats.as_dict()
+    stats["entries"] = cache.size()
+    stats["backend"] = LLM_CACHE_BACKEND
+    return stats
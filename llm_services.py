@@ -3,34 +3,107 @@
 
 Encapsula interações com a API da OpenAI: Agente, Resumo e TTS.
 """
+import json
 from io import BytesIO
-from openai import OpenAI
-from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
-from langchain.agents import Tool, initialize_agent, AgentType
-from langchain_community.tools import DuckDuckGoSearchRun
-from langchain.memory import ConversationBufferMemory
 
-from config import LLM_MODEL_NAME, TTS_VOICE
+import audio_cache
+import llm_cache
+import mp3_concat
+import openai_clients
+import telemetry
+
+from config import (
+    LLM_MODEL_NAME,
+    TTS_VOICE,
+    TTS_MODEL_NAME,
+    SUMMARY_MAP_MODEL_NAME,
+    SUMMARY_LENGTHS,
+    SUMMARY_DEFAULT_LENGTH,
+)
+
+# Versões dos prompts; incrementar ao alterar um prompt invalida os resultados armazenados
+PROMPT_VERSIONS = {
+    "summary": "1",
+    "section_summary": "1",
+    "market_summary": "1",
+    "key_metrics": "1",
+    "insights": "1",
+    "structured_metrics": "1",
+    "merge_insights": "1",
+}
+
+# Template específico para análise de investimentos (FIIs e Ações)
+REPORT_QA_TEMPLATE = """Use o contexto dos documentos financeiros para responder à pergunta do usuário de forma precisa e útil.
+
+Contexto dos relatórios financeiros (FIIs, Ações e outros investimentos):
+{context}
+
+Pergunta do usuário: {question}
+
+Instruções para sua resposta:
+1. **Identifique o tipo de investimento**: FII, ação, fundo, etc.
+2. **Analise o contexto**: Use todas as informações relevantes dos documentos
+3. **Seja específico**: Inclua valores exatos, percentuais, datas, períodos
+4. **Use terminologia adequada**:
+   - FIIs: Valor patrimonial, dividend yield, vacância, NOI
+   - Ações: P/L, P/VP, ROE, EBITDA, receita líquida, margem
+5. **Cite códigos/tickers** quando disponíveis (ex: KNRI11, PETR4)
+6. **Se não encontrar**: Informe claramente que a informação não está nos documentos processados
+
+Resposta detalhada e técnica:"""
 
-# Cliente OpenAI para TTS será inicializado quando necessário
-client = None
 
 def get_openai_client():
-    """Retorna cliente OpenAI inicializado."""
-    global client
-    if client is None:
-        client = OpenAI()
-    return client
+    """Retorna o cliente OpenAI compartilhado (pool de conexões, retentativas e limites)."""
+    return openai_clients.get_openai_client()
+
+def build_chat_model(model_name, temperature=0):
+    """Cria um ChatOpenAI ligado ao cache de respostas (apenas para chamadas determinísticas)."""
+    return ChatOpenAI(
+        model_name=model_name,
+        temperature=temperature,
+        cache=llm_cache.get_llm_cache(temperature),
+        callbacks=[telemetry.get_callback_handler()],
+        **openai_clients.client_kwargs(),
+    )
 
-def get_summarizer_chain(model_name=None):
+def get_summarizer_chain(model_name=None, length=None):
     """Cria e retorna uma cadeia para resumir textos."""
     if model_name is None:
         model_name = LLM_MODEL_NAME
-    llm = ChatOpenAI(model_name=model_name, temperature=0)
+    llm = build_chat_model(model_name, temperature=0)
+    length_instruction = f" {SUMMARY_LENGTHS[length]}" if length in SUMMARY_LENGTHS else ""
+    prompt = PromptTemplate.from_template(
+        f"Faça um resumo conciso e bem estruturado em português{length_instruction} do seguinte texto:"
+        "\n\n{text_to_summarize}\n\nRESUMO:"
+    )
+    return prompt | llm
+
+def get_section_summarizer_chain(model_name=None):
+    """Cria a cadeia de resumo de uma seção de relatório (etapa map)."""
+    if model_name is None:
+        model_name = SUMMARY_MAP_MODEL_NAME
+    llm = build_chat_model(model_name, temperature=0)
+    prompt = PromptTemplate.from_template(
+        "Você está resumindo uma seção de um relatório financeiro maior. "
+        "Resuma em português a seção abaixo preservando tickers, valores, percentuais, datas e períodos:\n\n"
+        "{text_to_summarize}\n\nRESUMO DA SEÇÃO:"
+    )
+    return prompt | llm
+
+def get_reduce_summarizer_chain(model_name=None, length=None):
+    """Cria a cadeia que combina resumos parciais em um único resumo (etapa reduce)."""
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    length_instruction = SUMMARY_LENGTHS.get(length or SUMMARY_DEFAULT_LENGTH, SUMMARY_LENGTHS[SUMMARY_DEFAULT_LENGTH])
+    llm = build_chat_model(model_name, temperature=0)
     prompt = PromptTemplate.from_template(
-        "Faça um resumo conciso e bem estruturado em português do seguinte texto:\n\n{text_to_summarize}\n\nRESUMO:"
+        "Os textos abaixo são resumos de seções consecutivas de um mesmo relatório financeiro. "
+        "Combine-os em um resumo único, conciso e bem estruturado em português, "
+        f"{length_instruction}, sem repetir informações:\n\n"
+        "{text_to_summarize}\n\nRESUMO:"
     )
     return prompt | llm
 
@@ -38,7 +111,7 @@ def generate_insights_from_documents(retriever, model_name=None):
     """Gera insights automáticos dos documentos usando RAG."""
     if model_name is None:
         model_name = LLM_MODEL_NAME
-    llm = ChatOpenAI(model_name=model_name, temperature=0.3)
+    llm = build_chat_model(model_name, temperature=0.3)
     
     # Queries para extrair insights específicos de FIIs e Ações
     insight_queries = [
@@ -84,7 +157,7 @@ def generate_market_summary(retriever, model_name=None):
     """Gera um resumo executivo do mercado baseado nos documentos."""
     if model_name is None:
         model_name = LLM_MODEL_NAME
-    llm = ChatOpenAI(model_name=model_name, temperature=0.2)
+    llm = build_chat_model(model_name, temperature=0.2)
     
     try:
         # Buscar documentos para análise geral de investimentos
@@ -130,7 +203,7 @@ def extract_key_metrics(retriever, model_name=None):
         
         if model_name is None:
             model_name = LLM_MODEL_NAME
-        llm = ChatOpenAI(model_name=model_name, temperature=0)
+        llm = build_chat_model(model_name, temperature=0)
         context = "\n\n".join([doc.page_content for doc in docs[:3]])
         
         prompt = f"""
@@ -165,30 +238,118 @@ def extract_key_metrics(retriever, model_name=None):
     except Exception as e:
         return {"error": f"Erro ao extrair métricas: {e}"}
 
+def merge_insight_texts(current_text, new_texts, topic, model_name=None):
+    """Atualiza uma análise consolidada do acervo com análises de novos relatórios."""
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    llm = build_chat_model(model_name, temperature=0)
+    new_analyses = "\n\n---\n\n".join(new_texts)
+
+    prompt = f"""
+    Você mantém uma análise consolidada ({topic}) de um acervo de relatórios financeiros.
+    Incorpore à análise atual as informações das análises de novos relatórios abaixo.
+
+    ANÁLISE CONSOLIDADA ATUAL:
+    {current_text or "(vazia - ainda não há relatórios consolidados)"}
+
+    ANÁLISES DOS NOVOS RELATÓRIOS:
+    {new_analyses}
+
+    Reescreva a análise consolidada completa mantendo a mesma estrutura, preservando as
+    informações atuais que continuam válidas, acrescentando os novos dados (tickers, valores,
+    percentuais, datas) e eliminando repetições:
+    """
+
+    response = llm.invoke(prompt)
+    return response.content
+
+def extract_structured_metrics(pages, metric_names, model_name=None):
+    """Extrai métricas numéricas estruturadas de um lote de páginas de um relatório.
+
+    pages é uma lista de (número_da_página, texto). Retorna uma lista de dicionários
+    com ticker, metric, value, unit, period e page.
+    """
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    llm = build_chat_model(model_name, temperature=0)
+    context = "\n\n".join(f"[PÁGINA {page_number}]\n{text}" for page_number, text in pages)
+
+    prompt = f"""
+    Extraia TODAS as métricas numéricas de ativos (FIIs, ações e outros) presentes no texto abaixo.
+
+    TEXTO:
+    {context}
+
+    Responda APENAS com um JSON no formato:
+    {{"metrics": [{{"ticker": "KNRI11", "metric": "dividend_yield", "value": 0.85, "unit": "%", "period": "06/2025", "page": 3}}]}}
+
+    Regras:
+    - "metric" deve ser um destes nomes: {", ".join(metric_names)}
+    - "value" deve ser um número (use ponto como separador decimal, sem separador de milhar)
+    - "unit" é a unidade do valor: "R$", "R$ mil", "R$ milhões", "%", "x" ou ""
+    - "period" é a data ou período de referência citado no texto ("" se não houver)
+    - "page" é o número da [PÁGINA] onde o valor aparece
+    - "ticker" é o código do ativo em maiúsculas ("" se a métrica não for de um ativo específico)
+    - Cite apenas valores explícitos no texto; não calcule nem invente valores
+    """
+
+    response = llm.invoke(prompt)
+    content = response.content.strip()
+    if content.startswith("```"):
+        content = content.strip("`")
+        content = content[content.find("{"):]
+    return json.loads(content).get("metrics", [])
+
 def text_to_speech(text):
-    """Converte texto para áudio usando a API da OpenAI."""
+    """Converte texto para áudio usando a API da OpenAI.
+
+    O áudio fica no cache em disco (por texto, voz e modelo), compartilhado
+    entre sessões e usuários.
+    """
+    cache = audio_cache.get_audio_cache()
+    key = audio_cache.audio_key(text)
+    if cache is not None:
+        cached_audio = cache.get(key)
+        if cached_audio:
+            return cached_audio
     try:
         client = get_openai_client()
         response = client.audio.speech.create(
-            model="tts-1",
+            model=TTS_MODEL_NAME,
             voice=TTS_VOICE,
             input=text
         )
         # Retorna os bytes diretamente para compatibilidade com st.audio
-        return response.content
+        audio_content = response.content
     except Exception as e:
         print(f"Erro na API de TTS: {e}")
         return None
+    if cache is not None:
+        try:
+            cache.put(key, audio_content)
+        except OSError as e:
+            print(f"⚠️ Erro ao gravar áudio no cache: {e}")
+    return audio_content
 
 def concatenate_audio_files(audio_contents_list):
-    """Concatena múltiplos arquivos de áudio usando pydub."""
+    """Concatena múltiplos arquivos de áudio MP3.
+
+    Copia os quadros MP3 diretamente (sem decodificar); usa pydub apenas quando
+    as partes têm codificações incompatíveis.
+    """
+    if not audio_contents_list:
+        return None
+    try:
+        return mp3_concat.concatenate_mp3_bytes(audio_contents_list)
+    except mp3_concat.Mp3FormatError as e:
+        print(f"⚠️ Concatenação por quadros indisponível ({e}); usando pydub")
+    return _concatenate_audio_with_pydub(audio_contents_list)
+
+def _concatenate_audio_with_pydub(audio_contents_list):
+    """Concatena decodificando e recodificando com pydub (requer ffmpeg)."""
     try:
         from pydub import AudioSegment
-        from io import BytesIO
-        
-        if not audio_contents_list:
-            return None
-            
+
         # Carregar o primeiro áudio
         combined = AudioSegment.from_file(BytesIO(audio_contents_list[0]), format="mp3")
         
@@ -204,39 +365,98 @@ def concatenate_audio_files(audio_contents_list):
         
     except ImportError:
         print("pydub não está disponível para concatenação de áudio")
-        return audio_contents_list[0] if audio_contents_list else None
+        return audio_contents_list[0]
     except Exception as e:
         print(f"Erro ao concatenar áudios: {e}")
-        return audio_contents_list[0] if audio_contents_list else None
+        return audio_contents_list[0]
 
-def setup_agent(retriever, model_name=None):
-    """Inicializa e retorna o agente com suas ferramentas e memória."""
+def summarize_conversation(current_summary, turns, max_tokens, model_name=None):
+    """Incorpora turnos antigos da conversa ao resumo contínuo, dentro de max_tokens."""
     if model_name is None:
         model_name = LLM_MODEL_NAME
-    llm = ChatOpenAI(model_name=model_name, temperature=0.1)
-    
-    # Template específico para análise de investimentos (FIIs e Ações)
-    template = """Use o contexto dos documentos financeiros para responder à pergunta do usuário de forma precisa e útil.
+    llm = build_chat_model(model_name, temperature=0)
+    dialogue = "\n".join(f"Usuário: {question}\nAssistente: {answer}" for question, answer in turns)
 
-Contexto dos relatórios financeiros (FIIs, Ações e outros investimentos):
-{context}
+    prompt = f"""
+    Você mantém o resumo de uma conversa entre um analista e um assistente de investimentos.
+    Atualize o resumo atual incorporando os novos trechos da conversa.
 
-Pergunta do usuário: {question}
+    RESUMO ATUAL:
+    {current_summary or "(vazio)"}
 
-Instruções para sua resposta:
-1. **Identifique o tipo de investimento**: FII, ação, fundo, etc.
-2. **Analise o contexto**: Use todas as informações relevantes dos documentos
-3. **Seja específico**: Inclua valores exatos, percentuais, datas, períodos
-4. **Use terminologia adequada**:
-   - FIIs: Valor patrimonial, dividend yield, vacância, NOI
-   - Ações: P/L, P/VP, ROE, EBITDA, receita líquida, margem
-5. **Cite códigos/tickers** quando disponíveis (ex: KNRI11, PETR4)
-6. **Se não encontrar**: Informe claramente que a informação não está nos documentos processados
+    NOVOS TRECHOS:
+    {dialogue}
 
-Resposta detalhada e técnica:"""
+    Regras:
+    - Preserve tickers, valores, datas, conclusões e preferências do analista
+    - Descarte cumprimentos e repetições
+    - Use no máximo {int(max_tokens * 0.75)} palavras
+
+    RESUMO ATUALIZADO:
+    """
+
+    return llm.invoke(prompt).content.strip()
+
+def _report_qa_prompt(question, retriever, metrics_context=None, history=None):
+    """Monta o prompt de resposta direta a partir dos chunks recuperados para a pergunta."""
+    documents = retriever.invoke(question)
+    context = "\n\n".join(doc.page_content for doc in documents)
+    if metrics_context:
+        context = f"Tabela de métricas extraídas dos relatórios:\n{metrics_context}\n\n{context}"
+    prompt = REPORT_QA_TEMPLATE.format(context=context, question=question)
+    if history:
+        prompt = f"Histórico da conversa:\n{history}\n\n{prompt}"
+    return prompt
+
+def answer_from_reports(question, retriever, model_name=None, metrics_context=None, history=None):
+    """Responde uma pergunta sobre os relatórios com uma única chamada ao LLM.
+
+    Caminho rápido do roteador de perguntas: recupera os chunks relevantes e
+    responde diretamente, sem o ciclo ReAct do agente. metrics_context, quando
+    informado, é anexado ao contexto (linhas da tabela de métricas); history é
+    o histórico da conversa em texto.
+    """
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    llm = build_chat_model(model_name, temperature=0.1)
+    try:
+        return llm.invoke(_report_qa_prompt(question, retriever, metrics_context, history)).content
+    except Exception as e:
+        print(f"❌ Erro ao acessar documentos: {str(e)}")
+        return f"Erro ao acessar os documentos: {str(e)}"
+
+def stream_answer_from_reports(question, retriever, model_name=None, metrics_context=None, history=None):
+    """Versão em streaming de answer_from_reports: gera as partes da resposta à medida que chegam."""
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    llm = build_chat_model(model_name, temperature=0.1)
+    try:
+        for chunk in llm.stream(_report_qa_prompt(question, retriever, metrics_context, history)):
+            if chunk.content:
+                yield chunk.content
+    except Exception as e:
+        print(f"❌ Erro ao acessar documentos: {str(e)}")
+        yield f"Erro ao acessar os documentos: {str(e)}"
+
+def setup_agent(retriever, model_name=None, memory=None):
+    """Inicializa e retorna o agente com suas ferramentas e memória.
+
+    memory permite reaproveitar a memória da sessão entre perguntas; sem ela,
+    o agente começa com um histórico vazio.
+    """
+    # Agentes, RetrievalQA e a busca na web só são carregados quando o chat usa o agente
+    from langchain.agents import Tool, initialize_agent, AgentType
+    from langchain.chains import RetrievalQA
+    from langchain.memory import ConversationBufferMemory
+    import web_search
+
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    llm = build_chat_model(model_name, temperature=0.1)
+    
 
     prompt = PromptTemplate(
-        template=template,
+        template=REPORT_QA_TEMPLATE,
         input_variables=["context", "question"]
     )
     
@@ -265,13 +485,26 @@ Resposta detalhada e técnica:"""
         description="""SEMPRE use esta ferramenta para perguntas sobre investimentos: FIIs (códigos, valores patrimoniais, rendimentos, dividend yield), Ações (tickers, balanço, DRE, indicadores como P/L, ROE, EBITDA), ou qualquer dado financeiro específico. Busca em todos os relatórios financeiros processados. Input: pergunta sobre investimentos."""
     )
     
-    # Ferramenta de busca na web para informações gerais
-    web_search_tool = DuckDuckGoSearchRun()
+    def lookup_numeric_metrics(question):
+        """Consulta a tabela de métricas extraídas na ingestão."""
+        import metrics_store
+        answer = metrics_store.answer_numeric_question(question)
+        return answer or "Nenhuma métrica correspondente na tabela. Use Consultar_Relatórios_Financeiros."
+
+    metrics_tool = Tool(
+        name="Consultar_Tabela_de_Métricas",
+        func=lookup_numeric_metrics,
+        description="""Use primeiro para perguntas NUMÉRICAS sobre tickers específicos (cotação, dividend yield, P/VP, P/L, ROE, vacância, receita, lucro, etc.). Consulta instantânea da tabela de métricas extraídas de todos os relatórios, com fonte e página. Input: pergunta citando o ticker e/ou a métrica."""
+    )
+
+    # Ferramenta de busca na web para informações gerais (com cache e limite de concorrência)
+    web_search_tool = web_search.get_web_search().as_tool()
     
-    tools = [report_analyzer_tool, web_search_tool]
+    tools = [metrics_tool, report_analyzer_tool, web_search_tool]
     
     # Configurar a memória para o agente
-    memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+    if memory is None:
+        memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
 
     # Inicializar agente com configuração padrão mas instruções específicas
     agent_executor = initialize_agent(
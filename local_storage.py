@@ -0,0 +1,53 @@
+"""Módulo de Armazenamento Local
+
+Peças comuns aos armazenamentos em disco da aplicação: a base dos bancos SQLite
+usados por várias threads (uma conexão por thread, em modo WAL) e a gravação
+atômica de arquivos (temporário na mesma pasta + os.replace).
+"""
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+
+class SQLiteStore:
+    # Subclasses podem trocar a fábrica de linhas (ex.: sqlite3.Row)
+    row_factory = None
+
+    def __init__(self, db_path):
+        """Cria a pasta do banco e liga o modo WAL; as tabelas ficam a cargo da subclasse."""
+        self.db_path = db_path
+        self._local = threading.local()
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._get_connection().execute("PRAGMA journal_mode=WAL")
+
+    def _get_connection(self):
+        """Retorna a conexão SQLite da thread atual."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            self._local.conn = conn
+        return conn
+
+
+@contextmanager
+def atomic_write(path, mode="wb", encoding=None):
+    """Abre um arquivo temporário ao lado de path; se o bloco terminar sem erro, ele substitui path."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
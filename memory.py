@@ -1,7 +1,116 @@
-from langchain_community.chat_message_histories import RedisChatMessageHistory
+"""Módulo de Histórico de Sessão
 
-from config import REDIS_URL
+Histórico do chat em Redis, compartilhado entre réplicas do Streamlit (sem
+sessões fixas no balanceador). Cada mensagem é gravada comprimida com zstd em
+uma lista por sessão; as escritas usam pipelining (uma ida ao Redis por turno),
+a lista é limitada a CHAT_HISTORY_MAX_MESSAGES e sessões ociosas expiram após
+CHAT_HISTORY_TTL_SECONDS.
+"""
+import json
+import threading
+
+import redis
+import zstandard
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.messages import message_to_dict, messages_from_dict
+
+from config import (
+    REDIS_URL,
+    CHAT_HISTORY_TTL_SECONDS,
+    CHAT_HISTORY_MAX_MESSAGES,
+    CHAT_HISTORY_KEY_PREFIX,
+)
+
+_compressor = zstandard.ZstdCompressor(level=3)
+_decompressor = zstandard.ZstdDecompressor()
+
+
+def _encode(message):
+    return _compressor.compress(json.dumps(message_to_dict(message), ensure_ascii=False).encode("utf-8"))
+
+
+def _decode(raw):
+    return json.loads(_decompressor.decompress(raw))
+
+
+class RedisSessionHistory(BaseChatMessageHistory):
+    def __init__(self, session_id, client, ttl=CHAT_HISTORY_TTL_SECONDS,
+                 max_messages=CHAT_HISTORY_MAX_MESSAGES, key_prefix=CHAT_HISTORY_KEY_PREFIX):
+        """Histórico de uma sessão de chat armazenado em uma lista do Redis."""
+        self.session_id = session_id
+        self.client = client
+        self.ttl = ttl
+        self.max_messages = max_messages
+        self.key = f"{key_prefix}{session_id}"
+
+    @property
+    def messages(self):
+        """Mensagens da sessão (a leitura também renova o TTL)."""
+        pipe = self.client.pipeline(transaction=False)
+        pipe.lrange(self.key, 0, -1)
+        pipe.expire(self.key, self.ttl)
+        raw_messages, _ = pipe.execute()
+        records = []
+        for raw in raw_messages:
+            try:
+                records.append(_decode(raw))
+            except (zstandard.ZstdError, ValueError) as e:
+                print(f"⚠️ Mensagem inválida no histórico {self.session_id}: {e}")
+        return messages_from_dict(records)
+
+    def add_messages(self, messages):
+        """Acrescenta as mensagens, limita o tamanho e renova o TTL em uma única ida ao Redis."""
+        if not messages:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        pipe.rpush(self.key, *[_encode(message) for message in messages])
+        pipe.ltrim(self.key, -self.max_messages, -1)
+        pipe.expire(self.key, self.ttl)
+        pipe.execute()
+
+    def clear(self):
+        self.client.delete(self.key)
+
+
+def to_chat_messages(messages):
+    """Converte mensagens do LangChain no formato de st.session_state.messages."""
+    return [
+        {"role": "user" if message.type == "human" else "assistant", "content": message.content}
+        for message in messages
+    ]
+
+
+def to_turns(messages):
+    """Agrupa mensagens alternadas (pergunta, resposta) em turnos."""
+    turns = []
+    pending_question = None
+    for message in messages:
+        if message.type == "human":
+            pending_question = message.content
+        elif pending_question is not None:
+            turns.append((pending_question, message.content))
+            pending_question = None
+    return turns
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_redis_client():
+    """Retorna o cliente Redis compartilhado (com pool de conexões), ou None sem REDIS_URL."""
+    global _client
+    if not REDIS_URL:
+        return None
+    with _client_lock:
+        if _client is None:
+            _client = redis.Redis.from_url(REDIS_URL, socket_timeout=5, health_check_interval=30)
+    return _client
 
 
 def get_session_history(session_id):
-    return RedisChatMessageHistory(session_id=session_id, url=REDIS_URL)
+    """Retorna o histórico da sessão no Redis, ou None se REDIS_URL não estiver definido."""
+    client = get_redis_client()
+    if client is None:
+        return None
+    return RedisSessionHistory(session_id, client)
@@ -0,0 +1,308 @@
+"""Módulo da Tabela de Métricas
+
+Mantém uma tabela colunar (Parquet) com as métricas numéricas extraídas de
+cada relatório na ingestão: ticker, métrica, valor, unidade, período e página.
+As visões de métricas chave e as perguntas numéricas são respondidas com
+consultas vetorizadas do pandas sobre todo o acervo, sem chamar o LLM.
+"""
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import file_handler
+import llm_services
+import telemetry
+from config import (
+    LLM_MODEL_NAME,
+    METRICS_TABLE_PATH,
+    METRICS_PAGES_PER_BATCH,
+    METRICS_MAX_WORKERS,
+)
+
+# Vocabulário de métricas: nome normalizado -> (rótulo, termos usados nas perguntas)
+METRIC_DEFINITIONS = {
+    "cotacao": ("Cotação", ["cotação", "cotacao", "preço", "preco", "valor de mercado da cota"]),
+    "dividend_yield": ("Dividend Yield", ["dividend yield", "dy", "yield"]),
+    "rendimento_por_cota": ("Rendimento por Cota", ["rendimento", "dividendo por cota", "provento"]),
+    "valor_patrimonial_cota": ("Valor Patrimonial por Cota", ["valor patrimonial", "vp por cota", "vpa"]),
+    "p_vp": ("P/VP", ["p/vp", "p/vpa", "pvp"]),
+    "p_l": ("P/L", ["p/l", "preço/lucro", "preco/lucro"]),
+    "roe": ("ROE", ["roe"]),
+    "roa": ("ROA", ["roa"]),
+    "ebitda": ("EBITDA", ["ebitda"]),
+    "receita_liquida": ("Receita Líquida", ["receita"]),
+    "lucro_liquido": ("Lucro Líquido", ["lucro"]),
+    "margem_liquida": ("Margem Líquida", ["margem"]),
+    "vacancia": ("Vacância", ["vacância", "vacancia"]),
+    "patrimonio_liquido": ("Patrimônio Líquido", ["patrimônio líquido", "patrimonio liquido", "pl do fundo"]),
+    "rentabilidade": ("Rentabilidade", ["rentabilidade", "retorno", "valorização", "valorizacao"]),
+    "outra": ("Outra", []),
+}
+
+SCHEMA = pa.schema([
+    ("source_file", pa.string()),
+    ("ticker", pa.string()),
+    ("metric", pa.string()),
+    ("value", pa.float64()),
+    ("unit", pa.string()),
+    ("period", pa.string()),
+    ("period_key", pa.int32()),
+    ("page", pa.int32()),
+])
+
+TICKER_PATTERN = re.compile(r"\b[A-Z]{4}\d{1,2}\b")
+
+MONTHS = {
+    "janeiro": 1, "fevereiro": 2, "março": 3, "marco": 3, "abril": 4, "maio": 5, "junho": 6,
+    "julho": 7, "agosto": 8, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+    "jan": 1, "fev": 2, "mar": 3, "abr": 4, "mai": 5, "jun": 6,
+    "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12,
+}
+
+# Formatos de período -> função (match -> (ano, mês)); trimestres e semestres contam pelo último mês
+PERIOD_PATTERNS = [
+    (re.compile(r"(\d{4})\s*[-/ ]?\s*[tq]([1-4])\b"), lambda m: (m[1], int(m[2]) * 3)),
+    (re.compile(r"\b([1-4])\s*[tq]\s*(\d{2,4})\b"), lambda m: (m[2], int(m[1]) * 3)),
+    (re.compile(r"\b[tq]([1-4])\s*[-/ ]?\s*(\d{2,4})\b"), lambda m: (m[2], int(m[1]) * 3)),
+    (re.compile(r"\b([12])\s*s\s*(\d{2,4})\b"), lambda m: (m[2], int(m[1]) * 6)),
+    (re.compile(r"\b([1-4])\s*[º°o]?\s*tri(?:mestre)?\.?\s*(?:de\s+)?[-/ ]?\s*(\d{2,4})\b"),
+     lambda m: (m[2], int(m[1]) * 3)),
+    (re.compile(r"\b([12])\s*[º°o]?\s*sem(?:estre)?\.?\s*(?:de\s+)?[-/ ]?\s*(\d{2,4})\b"),
+     lambda m: (m[2], int(m[1]) * 6)),
+    (re.compile(r"\b(\d{4})-(\d{1,2})\b"), lambda m: (m[1], int(m[2]))),
+    (re.compile(r"\b(?:\d{1,2}/)?(\d{1,2})/(\d{2,4})\b"), lambda m: (m[2], int(m[1]))),
+    (re.compile(r"\b(" + "|".join(MONTHS) + r")\.?\s*(?:de\s+)?[-/ ]?\s*(\d{2,4})\b"),
+     lambda m: (m[2], MONTHS[m[1]])),
+    (re.compile(r"\b(\d{4})\b"), lambda m: (m[1], 12)),
+]
+
+
+def period_sort_key(period):
+    """Chave ordenável (ano * 100 + mês) de um período como '06/2025', '1T25', 'jun/25' ou '2024'.
+
+    Períodos vazios ou não reconhecidos valem 0 e ficam antes de todos os datados.
+    """
+    text = str(period or "").strip().lower()
+    for pattern, parse in PERIOD_PATTERNS:
+        match = pattern.search(text)
+        if match is None:
+            continue
+        year, month = parse(match)
+        year = int(year)
+        if year < 100:
+            year += 2000
+        if 1900 <= year <= 2100 and 1 <= month <= 12:
+            return year * 100 + month
+    return 0
+
+
+def _parse_value(raw_value):
+    """Converte valores numéricos (inclusive no formato brasileiro '1.234,56') em float."""
+    if isinstance(raw_value, (int, float)):
+        return float(raw_value)
+    text = str(raw_value).strip().replace("R$", "").replace("%", "").strip()
+    if "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    return float(text)
+
+
+def normalize_records(source_file, raw_records):
+    """Valida e normaliza os registros devolvidos pelo LLM, descartando os inválidos."""
+    records = []
+    for raw in raw_records:
+        try:
+            metric = str(raw.get("metric", "")).strip().lower()
+            if metric not in METRIC_DEFINITIONS:
+                metric = "outra"
+            records.append({
+                "source_file": source_file,
+                "ticker": str(raw.get("ticker") or "").strip().upper(),
+                "metric": metric,
+                "value": _parse_value(raw["value"]),
+                "unit": str(raw.get("unit") or "").strip(),
+                "period": str(raw.get("period") or "").strip(),
+                "period_key": period_sort_key(raw.get("period")),
+                "page": int(raw.get("page") or 0),
+            })
+        except (KeyError, TypeError, ValueError):
+            continue
+    return records
+
+
+class MetricsStore:
+    def __init__(self, table_path=METRICS_TABLE_PATH):
+        """Abre a tabela de métricas em Parquet (criada na primeira escrita)."""
+        self.table_path = table_path
+        self._lock = threading.RLock()
+        self._frame = None
+        self._frame_mtime = None
+
+    def _empty_frame(self):
+        return SCHEMA.empty_table().to_pandas()
+
+    def load(self):
+        """Retorna a tabela como DataFrame, relendo o arquivo só quando ele muda."""
+        with self._lock:
+            if not os.path.exists(self.table_path):
+                self._frame, self._frame_mtime = self._empty_frame(), None
+                return self._frame
+            mtime = os.path.getmtime(self.table_path)
+            if self._frame is None or mtime != self._frame_mtime:
+                frame = pq.read_table(self.table_path).to_pandas()
+                if "period_key" not in frame:
+                    # Tabelas gravadas antes da chave de ordenação dos períodos
+                    frame.insert(
+                        frame.columns.get_loc("period") + 1,
+                        "period_key",
+                        frame["period"].map(period_sort_key).astype("int32"),
+                    )
+                self._frame = frame
+                self._frame_mtime = mtime
+            return self._frame
+
+    def _write(self, frame):
+        """Grava a tabela de forma atômica."""
+        table_dir = os.path.dirname(self.table_path)
+        if table_dir:
+            os.makedirs(table_dir, exist_ok=True)
+        table = pa.Table.from_pandas(frame.reset_index(drop=True), schema=SCHEMA, preserve_index=False)
+        tmp_path = f"{self.table_path}.tmp"
+        pq.write_table(table, tmp_path, compression="zstd")
+        os.replace(tmp_path, self.table_path)
+        self._frame = None
+
+    def replace_document(self, source_file, records):
+        """Substitui todas as métricas de um documento pelos registros informados."""
+        with self._lock:
+            frame = self.load()
+            frame = frame[frame["source_file"] != source_file]
+            if records:
+                new_rows = pd.DataFrame(records, columns=SCHEMA.names)
+                frame = pd.concat([frame, new_rows], ignore_index=True) if len(frame) else new_rows
+            self._write(frame)
+
+    def documents(self):
+        """Retorna os documentos que já têm métricas extraídas."""
+        return set(self.load()["source_file"].unique())
+
+    def query(self, tickers=None, metrics=None, source_files=None):
+        """Filtra a tabela por tickers, métricas e/ou documentos."""
+        frame = self.load()
+        mask = pd.Series(True, index=frame.index)
+        if tickers:
+            mask &= frame["ticker"].isin([t.upper() for t in tickers])
+        if metrics:
+            mask &= frame["metric"].isin(metrics)
+        if source_files:
+            mask &= frame["source_file"].isin(source_files)
+        return frame[mask]
+
+    def key_metrics_overview(self):
+        """Última ocorrência de cada (ticker, métrica) no acervo, pronta para exibição."""
+        frame = self.load()
+        frame = frame[(frame["ticker"] != "") & (frame["metric"] != "outra")]
+        if frame.empty:
+            return frame
+        overview = (
+            frame.sort_values(["period_key", "page"])
+            .drop_duplicates(["ticker", "metric"], keep="last")
+            .assign(metric=lambda df: df["metric"].map(lambda m: METRIC_DEFINITIONS[m][0]))
+            .sort_values(["ticker", "metric"])
+        )
+        return overview[["ticker", "metric", "value", "unit", "period", "source_file", "page"]]
+
+
+def find_question_filters(question):
+    """Identifica tickers e métricas citados em uma pergunta."""
+    tickers = TICKER_PATTERN.findall(question.upper())
+    lowered = question.lower()
+    metrics = [
+        name for name, (_, terms) in METRIC_DEFINITIONS.items()
+        if any(re.search(rf"(?<!\w){re.escape(term)}(?!\w)", lowered) for term in terms)
+    ]
+    return tickers, metrics
+
+
+def format_rows(frame, max_rows=30):
+    """Formata linhas da tabela de métricas como uma tabela markdown."""
+    lines = ["| Ticker | Métrica | Valor | Período | Fonte |", "|---|---|---|---|---|"]
+    for row in frame.head(max_rows).itertuples(index=False):
+        label = METRIC_DEFINITIONS.get(row.metric, (row.metric,))[0]
+        value = f"{row.value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        lines.append(
+            f"| {row.ticker or '-'} | {label} | {value} {row.unit} | {row.period or '-'} "
+            f"| {row.source_file} (p. {row.page}) |"
+        )
+    return "\n".join(lines)
+
+
+def answer_numeric_question(question, store=None):
+    """Responde perguntas numéricas consultando a tabela de métricas.
+
+    Retorna None quando a pergunta não cita ticker nem métrica conhecida, ou
+    quando não há dados correspondentes.
+    """
+    store = store or get_metrics_store()
+    tickers, metrics = find_question_filters(question)
+    if not tickers and not metrics:
+        return None
+    rows = store.query(tickers=tickers or None, metrics=metrics or None)
+    if rows.empty:
+        return None
+    return format_rows(rows.sort_values(["ticker", "metric", "period_key"]))
+
+
+def extract_document_metrics(file_path, model_name=None, pages=None):
+    """Extrai as métricas de todas as páginas de um relatório, em lotes paralelos."""
+    model_name = model_name or LLM_MODEL_NAME
+    source_file = os.path.basename(file_path)
+    if pages is None:
+        pages = file_handler.get_pdf_pages(file_path)
+    numbered_pages = [(i + 1, text) for i, text in enumerate(pages) if text.strip()]
+    batches = [
+        numbered_pages[i:i + METRICS_PAGES_PER_BATCH]
+        for i in range(0, len(numbered_pages), METRICS_PAGES_PER_BATCH)
+    ]
+
+    def extract_batch(batch):
+        try:
+            return llm_services.extract_structured_metrics(
+                batch, list(METRIC_DEFINITIONS.keys()), model_name=model_name
+            )
+        except Exception as e:
+            print(f"⚠️ Falha ao extrair métricas das páginas {batch[0][0]}-{batch[-1][0]}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=METRICS_MAX_WORKERS) as executor:
+        raw_records = [record for batch_records in executor.map(telemetry.bind_feature(extract_batch), batches)
+                       for record in batch_records]
+
+    records = normalize_records(source_file, raw_records)
+    print(f"📈 {len(records)} métricas extraídas de {source_file}")
+    return records
+
+
+def index_document_metrics(file_path, model_name=None, store=None):
+    """Extrai as métricas de um relatório e as grava na tabela."""
+    store = store or get_metrics_store()
+    records = extract_document_metrics(file_path, model_name=model_name)
+    store.replace_document(os.path.basename(file_path), records)
+    return len(records)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metrics_store():
+    """Retorna a instância compartilhada da tabela de métricas."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MetricsStore()
+    return _store
@@ -0,0 +1,178 @@
+"""Módulo de Concatenação de MP3
+
+Concatena MP3s no nível de quadros, sem decodificar nem recodificar: os
+cabeçalhos de quadro são lidos, as tags ID3 e o quadro Xing/Info/VBRI de cada
+parte são descartados e os quadros de áudio são copiados direto para o arquivo
+ou stream de saída. O custo é o de uma cópia de bytes e a memória não cresce
+com a duração do áudio final.
+"""
+import os
+from io import BytesIO
+
+# Tabelas de bitrate (kbps) indexadas por (versão MPEG 1 ou 2/2.5, camada)
+_BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (2, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {
+    "1": [44100, 48000, 32000],
+    "2": [22050, 24000, 16000],
+    "2.5": [11025, 12000, 8000],
+}
+_VERSIONS = {0b00: "2.5", 0b10: "2", 0b11: "1"}
+_LAYERS = {0b01: 3, 0b10: 2, 0b11: 1}
+
+ID3V1_SIZE = 128
+
+
+class Mp3FormatError(ValueError):
+    """Partes que não podem ser concatenadas quadro a quadro."""
+
+
+class FrameHeader:
+    def __init__(self, version, layer, bitrate, sample_rate, padding, channel_mode, protected):
+        self.version = version
+        self.layer = layer
+        self.bitrate = bitrate
+        self.sample_rate = sample_rate
+        self.padding = padding
+        self.channel_mode = channel_mode
+        self.protected = protected
+
+    @property
+    def frame_length(self):
+        if self.layer == 1:
+            return (12 * self.bitrate * 1000 // self.sample_rate + self.padding) * 4
+        coefficient = 72 if self.layer == 3 and self.version != "1" else 144
+        return coefficient * self.bitrate * 1000 // self.sample_rate + self.padding
+
+    @property
+    def side_info_length(self):
+        mono = self.channel_mode == 0b11
+        if self.version == "1":
+            return 17 if mono else 32
+        return 9 if mono else 17
+
+    @property
+    def stream_format(self):
+        """Atributos que precisam coincidir entre as partes (o bitrate pode variar)."""
+        return (self.version, self.layer, self.sample_rate, self.channel_mode == 0b11)
+
+
+def parse_frame_header(data, offset=0):
+    """Interpreta o cabeçalho de quadro em data[offset:offset+4]; None se não for válido."""
+    if offset + 4 > len(data):
+        return None
+    b0, b1, b2, b3 = data[offset:offset + 4]
+    if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+    version = _VERSIONS.get((b1 >> 3) & 0b11)
+    layer = _LAYERS.get((b1 >> 1) & 0b11)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0b11
+    if version is None or layer is None or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None  # versão/camada reservadas, bitrate livre ou inválido
+    return FrameHeader(
+        version=version,
+        layer=layer,
+        bitrate=_BITRATES[(1 if version == "1" else 2, layer)][bitrate_index],
+        sample_rate=_SAMPLE_RATES[version][sample_rate_index],
+        padding=(b2 >> 1) & 1,
+        channel_mode=b3 >> 6,
+        protected=not (b1 & 1),
+    )
+
+
+def _id3v2_length(data):
+    """Tamanho da tag ID3v2 no início dos dados (0 se não houver)."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = 0
+    for byte in data[6:10]:  # inteiro "synchsafe": 7 bits por byte
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def _is_vbr_info_frame(data, start, header):
+    """Indica se o quadro é o cabeçalho Xing/Info/VBRI (metadados, não áudio)."""
+    side_info = start + 4 + (2 if header.protected else 0) + header.side_info_length
+    if data[side_info:side_info + 4] in (b"Xing", b"Info"):
+        return True
+    return data[start + 36:start + 40] == b"VBRI"
+
+
+def iter_frames(data):
+    """Percorre os quadros de áudio de um MP3, retornando (cabeçalho, início, fim).
+
+    Tags ID3v2/ID3v1 e o quadro Xing/Info/VBRI são ignorados; bytes que não
+    formam um quadro válido são pulados até a próxima sincronização.
+    """
+    data = memoryview(data)
+    end = len(data)
+    if end >= ID3V1_SIZE and data[end - ID3V1_SIZE:end - ID3V1_SIZE + 3] == b"TAG":
+        end -= ID3V1_SIZE
+    offset = _id3v2_length(data)
+    first = True
+    while offset + 4 <= end:
+        header = parse_frame_header(data, offset)
+        if header is None:
+            offset += 1
+            continue
+        frame_end = offset + header.frame_length
+        if frame_end > end:
+            break  # quadro truncado no fim da parte
+        if not (first and _is_vbr_info_frame(data, offset, header)):
+            yield header, offset, frame_end
+        first = False
+        offset = frame_end
+
+
+def _read_part(part):
+    if isinstance(part, (bytes, bytearray, memoryview)):
+        return part
+    with open(part, "rb") as f:
+        return f.read()
+
+
+def concatenate_mp3(parts, output):
+    """Concatena as partes (bytes ou caminhos) escrevendo os quadros em output.
+
+    output pode ser um caminho ou um stream binário. Retorna o número de quadros
+    escritos. Levanta Mp3FormatError se as partes tiverem formatos diferentes
+    (taxa de amostragem, canais, versão/camada) ou se alguma não tiver quadros;
+    nesse caso a saída fica incompleta e deve ser descartada.
+    """
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, "wb") as f:
+            return concatenate_mp3(parts, f)
+
+    stream_format = None
+    frames = 0
+    for index, part in enumerate(parts):
+        data = _read_part(part)
+        part_frames = 0
+        for header, start, end in iter_frames(data):
+            if stream_format is None:
+                stream_format = header.stream_format
+            elif header.stream_format != stream_format:
+                raise Mp3FormatError(
+                    f"Parte {index + 1} tem formato {header.stream_format}, esperado {stream_format}"
+                )
+            output.write(data[start:end])
+            part_frames += 1
+        if part_frames == 0:
+            raise Mp3FormatError(f"Parte {index + 1} não contém quadros MP3 válidos")
+        frames += part_frames
+    return frames
+
+
+def concatenate_mp3_bytes(parts):
+    """Atalho de concatenate_mp3 que retorna o MP3 final em bytes."""
+    buffer = BytesIO()
+    concatenate_mp3(parts, buffer)
+    return buffer.getvalue()
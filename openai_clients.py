@@ -0,0 +1,315 @@
+"""Módulo de Clientes da OpenAI
+
+Camada compartilhada de acesso HTTP à OpenAI. Chat (LangChain), embeddings e
+TTS usam um único httpx.Client com pool de conexões por processo (sem novo
+handshake TLS a cada chamada) e um transporte que aplica:
+
+- política comum de retentativas com backoff exponencial e jitter, respeitando
+  Retry-After;
+- limite global de requisições simultâneas por endpoint (chat, embeddings, tts);
+- circuit breaker por endpoint, aberto quando a taxa de erros ou a latência
+  sobem demais. Com o circuito aberto (ou sem vaga na fila), a chamada falha
+  imediatamente com 503 em vez de acumular requisições.
+"""
+import json
+import random
+import threading
+import time
+from collections import deque
+
+import httpx
+from openai import OpenAI
+
+import telemetry
+from config import (
+    OPENAI_BASE_URL,
+    OPENAI_REQUEST_TIMEOUT_SECONDS,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_MAX_RETRIES,
+    OPENAI_BACKOFF_BASE_SECONDS,
+    OPENAI_BACKOFF_MAX_SECONDS,
+    OPENAI_ENDPOINT_CONCURRENCY,
+    OPENAI_QUEUE_TIMEOUT_SECONDS,
+    CIRCUIT_WINDOW_SIZE,
+    CIRCUIT_MIN_CALLS,
+    CIRCUIT_FAILURE_RATIO,
+    CIRCUIT_LATENCY_SECONDS,
+    CIRCUIT_COOLDOWN_SECONDS,
+)
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+ENDPOINT_PATHS = {
+    "/chat/completions": "chat",
+    "/embeddings": "embeddings",
+    "/audio/speech": "tts",
+}
+
+
+def endpoint_for(request):
+    """Identifica o endpoint (chat, embeddings, tts ou other) de uma requisição."""
+    for suffix, endpoint in ENDPOINT_PATHS.items():
+        if request.url.path.endswith(suffix):
+            return endpoint
+    return "other"
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, window_size=CIRCUIT_WINDOW_SIZE, min_calls=CIRCUIT_MIN_CALLS,
+                 failure_ratio=CIRCUIT_FAILURE_RATIO, latency_threshold=CIRCUIT_LATENCY_SECONDS,
+                 cooldown=CIRCUIT_COOLDOWN_SECONDS, clock=time.monotonic):
+        """Circuit breaker sobre as últimas window_size chamadas de um endpoint.
+
+        Abre quando a fração de falhas passa de failure_ratio ou quando a
+        latência mediana passa de latency_threshold (com ao menos min_calls
+        chamadas na janela). Após cooldown segundos, libera uma chamada de teste.
+        """
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_owner = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow_request(self):
+        """Indica se a chamada pode seguir (no meio-aberto, só uma de cada vez)."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._clock() - self._opened_at < self.cooldown or self._probe_in_flight:
+                return False
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+            self._probe_owner = threading.get_ident()
+            return True
+
+    @property
+    def is_open(self):
+        """Circuito aberto e ainda no período de espera (novas chamadas são rejeitadas)."""
+        return self.state == self.OPEN
+
+    def release_probe(self):
+        """Libera a chamada de teste desta thread que terminou sem resultado registrado (ex.: exceção)."""
+        with self._lock:
+            if self._probe_in_flight and self._probe_owner == threading.get_ident():
+                self._probe_in_flight = False
+                self._probe_owner = None
+
+    def record(self, success, latency):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                self._probe_owner = None
+                if success and latency < self.latency_threshold:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+
+            self._outcomes.append((success, latency))
+            if self._state == self.CLOSED and len(self._outcomes) >= self.min_calls:
+                failures = sum(1 for ok, _ in self._outcomes if not ok)
+                latencies = sorted(latency for _, latency in self._outcomes)
+                if (failures / len(self._outcomes) >= self.failure_ratio
+                        or latencies[len(latencies) // 2] >= self.latency_threshold):
+                    self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        print("🔌 Circuit breaker aberto: falhando rápido até o upstream se recuperar")
+
+
+class _SlotReleasingStream(httpx.SyncByteStream):
+    """Mantém a vaga do endpoint ocupada até o corpo (ex.: streaming SSE) ser consumido."""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class ResilientTransport(httpx.BaseTransport):
+    def __init__(self, transport=None, max_retries=OPENAI_MAX_RETRIES,
+                 backoff_base=OPENAI_BACKOFF_BASE_SECONDS, backoff_max=OPENAI_BACKOFF_MAX_SECONDS,
+                 concurrency=None, queue_timeout=OPENAI_QUEUE_TIMEOUT_SECONDS,
+                 breaker_factory=CircuitBreaker, sleep=time.sleep):
+        """Transporte com retentativas, limite de concorrência e circuit breaker por endpoint."""
+        self._transport = transport or httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            )
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.queue_timeout = queue_timeout
+        self._sleep = sleep
+        concurrency = concurrency or OPENAI_ENDPOINT_CONCURRENCY
+        self._semaphores = {
+            endpoint: threading.BoundedSemaphore(limit) for endpoint, limit in concurrency.items()
+        }
+        self.breakers = {endpoint: breaker_factory() for endpoint in concurrency}
+
+    def _backoff(self, attempt, response=None):
+        """Backoff exponencial com jitter total; Retry-After tem prioridade."""
+        if response is not None:
+            retry_after = response.headers.get("retry-after")
+            try:
+                if retry_after is not None:
+                    return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _reject(request, endpoint, reason):
+        body = json.dumps({"error": {"message": reason, "type": "service_unavailable", "code": endpoint}})
+        return httpx.Response(503, content=body.encode("utf-8"), request=request,
+                              headers={"content-type": "application/json"})
+
+    def handle_request(self, request):
+        endpoint = endpoint_for(request)
+        semaphore = self._semaphores.get(endpoint)
+        breaker = self.breakers.get(endpoint)
+
+        # O circuit breaker vem antes da vaga: com o circuito aberto a chamada é
+        # rejeitada na hora, sem esperar a fila de um endpoint saturado
+        if breaker is not None and not breaker.allow_request():
+            return self._reject(request, endpoint, f"Circuito aberto para {endpoint}: OpenAI instável")
+        if semaphore is not None and not semaphore.acquire(timeout=self.queue_timeout):
+            # Sem vaga, a chamada de teste do meio-aberto (se for esta) fica livre para a próxima
+            if breaker is not None:
+                breaker.release_probe()
+            return self._reject(request, endpoint, f"Sobrecarga em {endpoint}: fila cheia")
+
+        released = False
+
+        def release():
+            nonlocal released
+            if semaphore is not None and not released:
+                released = True
+                semaphore.release()
+
+        try:
+            response = self._send_with_retries(request, breaker)
+        except BaseException:
+            release()
+            raise
+        finally:
+            if breaker is not None:
+                breaker.release_probe()
+        response.extensions["openai_endpoint"] = endpoint
+        if semaphore is None:
+            return response
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_SlotReleasingStream(response.stream, release),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    def _send_with_retries(self, request, breaker):
+        request.read()  # Garante um corpo reenviável nas retentativas
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                response = self._transport.handle_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                if breaker is not None:
+                    breaker.record(False, time.monotonic() - start)
+                # Com o circuito aberto, novas tentativas só aumentariam a carga no upstream
+                if attempt >= self.max_retries or (breaker is not None and breaker.is_open):
+                    raise
+                self._sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+
+            success = response.status_code not in RETRYABLE_STATUS
+            if breaker is not None:
+                breaker.record(success, time.monotonic() - start)
+            if success or attempt >= self.max_retries or (breaker is not None and breaker.is_open):
+                response.extensions["openai_retries"] = attempt
+                return response
+
+            response.read()
+            response.close()
+            self._sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def close(self):
+        self._transport.close()
+
+
+_transport = None
+_http_client = None
+_openai_client = None
+_clients_lock = threading.Lock()
+
+
+def get_http_client():
+    """Retorna o httpx.Client compartilhado (pool, retentativas, limites e telemetria)."""
+    global _transport, _http_client
+    with _clients_lock:
+        if _http_client is None:
+            _transport = ResilientTransport()
+            _http_client = telemetry.instrument_http_client(httpx.Client(
+                transport=_transport,
+                timeout=httpx.Timeout(OPENAI_REQUEST_TIMEOUT_SECONDS, connect=10.0),
+            ))
+    return _http_client
+
+
+def client_kwargs():
+    """Parâmetros comuns para ChatOpenAI, OpenAIEmbeddings e OpenAI.
+
+    As retentativas do SDK ficam desligadas: a política é aplicada uma única vez
+    no transporte compartilhado.
+    """
+    return {"base_url": OPENAI_BASE_URL, "http_client": get_http_client(), "max_retries": 0}
+
+
+def get_openai_client():
+    """Retorna o cliente OpenAI compartilhado (usado no TTS)."""
+    global _openai_client
+    if _openai_client is None:
+        client = OpenAI(**client_kwargs())
+        with _clients_lock:
+            if _openai_client is None:
+                _openai_client = client
+    return _openai_client
+
+
+def get_circuit_states():
+    """Estado do circuit breaker de cada endpoint (exibido na página Sistema)."""
+    get_http_client()
+    return {endpoint: breaker.state for endpoint, breaker in _transport.breakers.items()}
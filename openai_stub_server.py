@@ -0,0 +1,381 @@
+"""Módulo do Servidor Simulado da OpenAI
+
+Servidor HTTP local compatível com a API da OpenAI (chat completions com e sem
+streaming, embeddings e audio/speech) para testes de carga e benchmarks sem
+rede. Latência, vazão de tokens e injeção de erros (500 e 429) são
+configuráveis; as respostas e os embeddings são determinísticos.
+
+Uso:
+    python openai_stub_server.py --port 8787 --latency-mean 0.4 --tokens-per-second 60
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1 streamlit run app.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+EMBEDDING_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+VOCABULARY = (
+    "o fundo apresentou resultado consistente no período com dividend yield de 0,85% ao mês "
+    "vacância física reduzida receita de aluguéis crescente e cotação abaixo do valor patrimonial "
+    "a gestão mantém alavancagem controlada e perspectivas positivas para o segmento logístico"
+).split()
+
+# Frame MPEG-1 Layer III, 128 kbps, 44,1 kHz, mono, sem CRC (417 bytes, ~26 ms)
+MP3_FRAME = b"\xff\xfb\x90\xc4" + b"\x00" * 413
+MP3_FRAME_SECONDS = 1152 / 44100
+TTS_CHARS_PER_SECOND = 15
+
+
+class StubSettings:
+    def __init__(self, latency_distribution="fixed", latency_mean=0.0, latency_spread=0.0,
+                 tokens_per_second=0.0, completion_tokens=60, error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=1, seed=0):
+        """Parâmetros do servidor simulado.
+
+        latency_mean/latency_spread definem o atraso até a primeira resposta
+        (em segundos) conforme latency_distribution. tokens_per_second limita a
+        vazão do streaming e o tempo das respostas completas (0 = sem limite).
+        error_rate e rate_limit_rate são as probabilidades de responder 500 e 429.
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Distribuição de latência inválida: {latency_distribution}")
+        self.latency_distribution = latency_distribution
+        self.latency_mean = latency_mean
+        self.latency_spread = latency_spread
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.seed = seed
+
+
+class StubStats:
+    def __init__(self):
+        """Contadores de requisições atendidas pelo servidor simulado."""
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.errors = 0
+        self.rate_limited = 0
+
+    def record(self, path, status):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            if status == 429:
+                self.rate_limited += 1
+            elif status >= 500:
+                self.errors += 1
+
+
+def count_tokens(text):
+    """Estimativa simples de tokens (~4 caracteres por token)."""
+    return len(text) // 4 + 1 if text else 0
+
+
+def deterministic_embedding(text, dimensions=1536):
+    """Vetor unitário derivado do hash do texto: o mesmo texto sempre gera o mesmo vetor."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "big")
+    vector = np.random.default_rng(seed).standard_normal(dimensions)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def deterministic_completion(messages, max_tokens):
+    """Resposta determinística (uma palavra por token) a partir do conteúdo das mensagens."""
+    prompt = "\n".join(_message_text(m) for m in messages)
+    if "JSON" in prompt:
+        return ["{}"]
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+    return [rng.choice(VOCABULARY) + " " for _ in range(max_tokens)]
+
+
+def silent_mp3(text):
+    """MP3 silencioso com duração proporcional ao tamanho do texto."""
+    seconds = max(1.0, len(text) / TTS_CHARS_PER_SECOND)
+    return MP3_FRAME * int(seconds / MP3_FRAME_SECONDS)
+
+
+def _message_text(message):
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def settings(self):
+        return self.server.stub_settings
+
+    # --- Utilitários ---
+
+    def _sleep_latency(self):
+        s = self.settings
+        rng = self.server.rng
+        with self.server.rng_lock:
+            if s.latency_distribution == "uniform":
+                delay = rng.uniform(s.latency_mean - s.latency_spread, s.latency_mean + s.latency_spread)
+            elif s.latency_distribution == "normal":
+                delay = rng.gauss(s.latency_mean, s.latency_spread)
+            elif s.latency_distribution == "lognormal" and s.latency_mean > 0:
+                delay = s.latency_mean * rng.lognormvariate(0, s.latency_spread)
+            else:
+                delay = s.latency_mean
+        if delay > 0:
+            time.sleep(delay)
+
+    def _token_delay(self):
+        return 1 / self.settings.tokens_per_second if self.settings.tokens_per_second > 0 else 0
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _start_response(self, status, headers):
+        # A requisição é contada antes de responder: o cliente pode ler a resposta
+        # e consultar as estatísticas antes que a thread do servidor volte a rodar
+        self.server.stub_stats.record(self.path, status)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self._start_response(status, {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            **(headers or {}),
+        })
+        self.wfile.write(body)
+
+    def _send_error(self, status, message, error_type, headers=None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": None}}, headers)
+
+    def _inject_failure(self):
+        """Sorteia erros 429/500 conforme a configuração. Retorna True se respondeu com erro."""
+        with self.server.rng_lock:
+            roll = self.server.rng.random()
+        if roll < self.settings.rate_limit_rate:
+            self._send_error(429, "Rate limit simulado", "rate_limit_error",
+                             {"Retry-After": str(self.settings.retry_after)})
+            return True
+        if roll < self.settings.rate_limit_rate + self.settings.error_rate:
+            self._send_error(500, "Erro simulado do servidor", "server_error")
+            return True
+        return False
+
+    # --- Rotas ---
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            models = list(EMBEDDING_DIMENSIONS) + ["gpt-4o-mini", "tts-1"]
+            self._send_json(200, {"object": "list", "data": [
+                {"id": name, "object": "model", "owned_by": "stub"} for name in models
+            ]})
+        else:
+            self._send_error(404, f"Rota não encontrada: {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        try:
+            payload = self._read_json()
+        except ValueError:
+            self._send_error(400, "JSON inválido", "invalid_request_error")
+            return
+
+        routes = {
+            "/chat/completions": self._chat_completions,
+            "/embeddings": self._embeddings,
+            "/audio/speech": self._speech,
+        }
+        for suffix, route in routes.items():
+            if self.path.rstrip("/").endswith(suffix):
+                if self._inject_failure():
+                    return
+                route(payload)
+                return
+        self._send_error(404, f"Rota não encontrada: {self.path}", "invalid_request_error")
+
+    def _chat_completions(self, payload):
+        model = payload.get("model", "gpt-4o-mini")
+        messages = payload.get("messages", [])
+        max_tokens = payload.get("max_completion_tokens") or payload.get("max_tokens") or self.settings.completion_tokens
+        pieces = deterministic_completion(messages, max_tokens)
+        usage = {
+            "prompt_tokens": sum(count_tokens(_message_text(m)) for m in messages),
+            "completion_tokens": len(pieces),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+
+        self._sleep_latency()
+        if not payload.get("stream"):
+            time.sleep(self._token_delay() * len(pieces))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(pieces).strip()},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            })
+            return
+
+        self._start_response(200, {
+            "Content-Type": "text/event-stream",
+            "Cache-Control": "no-cache",
+            "Connection": "close",
+        })
+        self.close_connection = True
+
+        def send_chunk(delta, finish_reason=None, chunk_usage=None):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [] if chunk_usage else [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            if chunk_usage:
+                chunk["usage"] = chunk_usage
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        send_chunk({"role": "assistant", "content": ""})
+        for piece in pieces:
+            send_chunk({"content": piece})
+            time.sleep(self._token_delay())
+        send_chunk({}, finish_reason="stop")
+        if (payload.get("stream_options") or {}).get("include_usage"):
+            send_chunk(None, chunk_usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _embeddings(self, payload):
+        model = payload.get("model", "text-embedding-3-small")
+        inputs = payload.get("input", [])
+        if isinstance(inputs, str) or (inputs and isinstance(inputs[0], int)):
+            inputs = [inputs]
+        dimensions = payload.get("dimensions") or EMBEDDING_DIMENSIONS.get(model, 1536)
+
+        texts = [item if isinstance(item, str) else " ".join(map(str, item)) for item in inputs]
+        prompt_tokens = sum(len(item) if isinstance(item, list) else count_tokens(item) for item in inputs)
+        self._sleep_latency()
+        self._send_json(200, {
+            "object": "list",
+            "model": model,
+            "data": [
+                {"object": "embedding", "index": i, "embedding": deterministic_embedding(text, dimensions)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        })
+
+    def _speech(self, payload):
+        audio = silent_mp3(payload.get("input", ""))
+        self._sleep_latency()
+        time.sleep(self._token_delay() * count_tokens(payload.get("input", "")))
+        self._start_response(200, {"Content-Type": "audio/mpeg", "Content-Length": str(len(audio))})
+        self.wfile.write(audio)
+
+
+class StubOpenAIServer:
+    def __init__(self, settings=None, host="127.0.0.1", port=0):
+        """Servidor simulado. Com port=0 o sistema escolhe uma porta livre."""
+        self.settings = settings or StubSettings()
+        self.stats = StubStats()
+        self._httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub_settings = self.settings
+        self._httpd.stub_stats = self.stats
+        self._httpd.rng = random.Random(self.settings.seed)
+        self._httpd.rng_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self):
+        """Inicia o servidor em uma thread em segundo plano."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor local compatível com a API da OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-mean", type=float, default=0.0, help="Atraso médio em segundos")
+    parser.add_argument("--latency-spread", type=float, default=0.0,
+                        help="Amplitude (uniform), desvio padrão (normal) ou sigma (lognormal)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="0 = sem limite")
+    parser.add_argument("--completion-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probabilidade de erro 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probabilidade de erro 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    settings = StubSettings(
+        latency_distribution=args.latency_distribution,
+        latency_mean=args.latency_mean,
+        latency_spread=args.latency_spread,
+        tokens_per_second=args.tokens_per_second,
+        completion_tokens=args.completion_tokens,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    server = StubOpenAIServer(settings, host=args.host, port=args.port)
+    print(f"🧪 Servidor simulado da OpenAI em {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("👋 Encerrando servidor simulado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Módulo do Índice de Páginas
+
+Guarda em SQLite o texto de cada página dos relatórios e as estatísticas do
+documento (páginas, palavras e caracteres), extraídos uma única vez por versão
+do arquivo (hash do conteúdo). O visualizador de texto lê só as páginas
+exibidas, sem extrair o PDF nem manter o documento inteiro na memória a cada
+rerun.
+
+As páginas também entram em um índice de texto completo (FTS5, sem diferenciar
+maiúsculas nem acentos), usado na busca em um relatório e em toda a
+biblioteca: termos soltos precisam aparecer todos na página e trechos entre
+aspas são buscados como frase.
+"""
+import os
+import re
+import threading
+import time
+
+import file_handler
+from local_storage import SQLiteStore, atomic_write
+from config import PAGE_STORE_PATH, PAGE_EXPORT_DIR, TEXT_SEARCH_SNIPPET_TOKENS
+
+# Marcadores dos termos encontrados nos trechos (negrito em Markdown)
+HIGHLIGHT_START = "**"
+HIGHLIGHT_END = "**"
+
+
+def _fts_query(text):
+    """Converte o texto digitado em uma consulta FTS5 (None se não houver termos).
+
+    Cada termo vira uma frase entre aspas, de modo que pontuação e operadores
+    digitados não são interpretados como sintaxe do FTS5.
+    """
+    parts = []
+    for phrase, word in re.findall(r'"([^"]*)"|(\S+)', text):
+        term = phrase or word
+        if re.search(r"\w", term):
+            parts.append('"' + term.replace('"', "") + '"')
+    return " ".join(parts) or None
+
+
+class PageStore(SQLiteStore):
+    def __init__(self, db_path=PAGE_STORE_PATH, export_dir=PAGE_EXPORT_DIR):
+        """Abre (ou cria) o banco SQLite do índice de páginas."""
+        super().__init__(db_path)
+        self.export_dir = export_dir
+
+        conn = self._get_connection()
+        has_fts = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'pages_fts'"
+        ).fetchone()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                file_hash TEXT PRIMARY KEY,
+                file_name TEXT NOT NULL,
+                page_count INTEGER NOT NULL,
+                word_count INTEGER NOT NULL,
+                char_count INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                file_hash TEXT NOT NULL,
+                page_number INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                word_count INTEGER NOT NULL,
+                char_count INTEGER NOT NULL,
+                PRIMARY KEY (file_hash, page_number)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS pages_fts USING fts5(
+                text,
+                file_hash UNINDEXED,
+                page_number UNINDEXED,
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+            """
+        )
+        if not has_fts:
+            # Bancos criados antes da busca textual: indexa as páginas já guardadas
+            conn.execute("INSERT INTO pages_fts (text, file_hash, page_number) SELECT text, file_hash, page_number FROM pages")
+        conn.commit()
+
+    def _info(self, file_hash):
+        row = self._get_connection().execute(
+            "SELECT file_hash, file_name, page_count, word_count, char_count FROM documents WHERE file_hash = ?",
+            (file_hash,),
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("file_hash", "file_name", "page_count", "word_count", "char_count"), row))
+
+    def index(self, file_path, pages=None):
+        """Indexa as páginas do PDF (se esta versão ainda não estiver no índice) e retorna as estatísticas.
+
+        pages permite reaproveitar o texto já extraído por quem chamou.
+        """
+        file_hash = file_handler.get_file_hash(file_path)
+        info = self._info(file_hash)
+        if info is not None:
+            return info
+
+        started = time.time()
+        if pages is None:
+            pages = file_handler.get_pdf_pages(file_path)
+        rows = [
+            (file_hash, number, text, len(text.split()), len(text))
+            for number, text in enumerate(pages, start=1)
+        ]
+        file_name = os.path.basename(file_path)
+        conn = self._get_connection()
+        with conn:
+            # Versões anteriores do mesmo arquivo saem do índice (e da busca)
+            stale = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT file_hash FROM documents WHERE file_name = ? AND file_hash != ?", (file_name, file_hash)
+                )
+            ]
+            for old_hash in [*stale, file_hash]:
+                conn.execute("DELETE FROM documents WHERE file_hash = ?", (old_hash,))
+                conn.execute("DELETE FROM pages WHERE file_hash = ?", (old_hash,))
+                conn.execute("DELETE FROM pages_fts WHERE file_hash = ?", (old_hash,))
+            conn.executemany("INSERT INTO pages VALUES (?, ?, ?, ?, ?)", rows)
+            conn.executemany(
+                "INSERT INTO pages_fts (text, file_hash, page_number) VALUES (?, ?, ?)",
+                [(text, page_hash, number) for page_hash, number, text, _, _ in rows],
+            )
+            conn.execute(
+                "INSERT INTO documents VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    file_hash,
+                    file_name,
+                    len(rows),
+                    sum(row[3] for row in rows),
+                    sum(row[4] for row in rows),
+                    time.time(),
+                ),
+            )
+        print(f"📑 {len(rows)} páginas de {file_name} indexadas em {time.time() - started:.1f}s")
+        return self._info(file_hash)
+
+    def document(self, file_path):
+        """Estatísticas do documento indexado, ou None se esta versão ainda não foi indexada."""
+        return self._info(file_handler.get_file_hash(file_path))
+
+    def pages(self, file_path, start, count):
+        """Lista de (número da página, texto) a partir da página start (1 = primeira)."""
+        return self._get_connection().execute(
+            "SELECT page_number, text FROM pages WHERE file_hash = ? AND page_number >= ? "
+            "ORDER BY page_number LIMIT ?",
+            (file_handler.get_file_hash(file_path), start, count),
+        ).fetchall()
+
+    def iter_pages(self, file_path):
+        """Percorre (número da página, texto) do documento inteiro, uma página por vez."""
+        cursor = self._get_connection().execute(
+            "SELECT page_number, text FROM pages WHERE file_hash = ? ORDER BY page_number",
+            (file_handler.get_file_hash(file_path),),
+        )
+        yield from cursor
+
+    def full_text(self, file_path):
+        """Texto completo do documento (o PDF é extraído e indexado só na primeira vez)."""
+        self.index(file_path)
+        return "\n".join(text for _, text in self.iter_pages(file_path))
+
+    def documents(self):
+        """Nomes dos arquivos indexados."""
+        return {row[0] for row in self._get_connection().execute("SELECT file_name FROM documents")}
+
+    def _snippet(self):
+        return (
+            f"snippet(pages_fts, 0, '{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', {int(TEXT_SEARCH_SNIPPET_TOKENS)})"
+        )
+
+    def search(self, file_path, query, limit=20):
+        """Páginas do documento que atendem à consulta, em ordem.
+
+        Retorna (total de páginas encontradas, até limit dicts com
+        page_number e snippet, com os termos destacados).
+        """
+        fts_query = _fts_query(query)
+        if fts_query is None:
+            return 0, []
+        file_hash = file_handler.get_file_hash(file_path)
+        conn = self._get_connection()
+        total = conn.execute(
+            "SELECT COUNT(*) FROM pages_fts WHERE pages_fts MATCH ? AND file_hash = ?", (fts_query, file_hash)
+        ).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT page_number, {self._snippet()} FROM pages_fts "
+            "WHERE pages_fts MATCH ? AND file_hash = ? ORDER BY page_number LIMIT ?",
+            (fts_query, file_hash, limit),
+        ).fetchall()
+        return total, [{"page_number": page_number, "snippet": snippet} for page_number, snippet in rows]
+
+    def search_library(self, query, limit=20):
+        """Páginas de todos os relatórios indexados que atendem à consulta, das mais relevantes (BM25).
+
+        Retorna (total de páginas encontradas, até limit dicts com file_name,
+        file_hash, page_number e snippet).
+        """
+        fts_query = _fts_query(query)
+        if fts_query is None:
+            return 0, []
+        conn = self._get_connection()
+        total = conn.execute("SELECT COUNT(*) FROM pages_fts WHERE pages_fts MATCH ?", (fts_query,)).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT documents.file_name, pages_fts.file_hash, pages_fts.page_number, {self._snippet()} "
+            "FROM pages_fts JOIN documents ON documents.file_hash = pages_fts.file_hash "
+            "WHERE pages_fts MATCH ? ORDER BY bm25(pages_fts) LIMIT ?",
+            (fts_query, limit),
+        ).fetchall()
+        return total, [
+            {"file_name": file_name, "file_hash": file_hash, "page_number": page_number, "snippet": snippet}
+            for file_name, file_hash, page_number, snippet in rows
+        ]
+
+    def export_text(self, file_path):
+        """Caminho de um .txt com o texto completo do documento (gravado uma vez por versão)."""
+        file_hash = file_handler.get_file_hash(file_path)
+        export_path = os.path.join(self.export_dir, f"{file_hash}.txt")
+        if os.path.exists(export_path):
+            return export_path
+        with atomic_write(export_path, "w", encoding="utf-8") as f:
+            for page_number, text in self.iter_pages(file_path):
+                if page_number > 1:
+                    f.write("\n")
+                f.write(text)
+        return export_path
+
+
+_page_store = None
+_page_store_lock = threading.Lock()
+
+
+def get_page_store():
+    """Retorna a instância compartilhada do índice de páginas."""
+    global _page_store
+    with _page_store_lock:
+        if _page_store is None:
+            _page_store = PageStore()
+    return _page_store
@@ -0,0 +1,225 @@
+"""Módulo do Roteador de Perguntas
+
+Classifica as perguntas do chat antes do agente. Perguntas que só dependem dos
+relatórios processados seguem por um caminho rápido (recuperação + uma única
+chamada ao LLM); perguntas que exigem a web ou várias etapas seguem para o
+agente ReAct. A classificação combina regras e similaridade de embeddings com
+exemplos rotulados, sem chamar o LLM.
+"""
+import re
+import threading
+
+import numpy as np
+
+import llm_services
+import metrics_store
+from config import (
+    LLM_MODEL_NAME,
+    ROUTER_ENABLED,
+    ROUTER_MIN_SIMILARITY,
+    ROUTER_MARGIN,
+    ROUTER_RETRIEVER_K,
+)
+
+ROUTE_REPORTS = "reports"
+ROUTE_AGENT = "agent"
+
+# Indícios de que a pergunta precisa de informação externa ou atual
+WEB_PATTERNS = [
+    r"\bhoje\b", r"\bagora\b", r"\bneste momento\b", r"\bem tempo real\b",
+    r"\bnotícias?\b", r"\bnoticias?\b", r"\búltimas?\b", r"\bultimas?\b",
+    r"\binternet\b", r"\bweb\b", r"\bgoogle\b", r"\bpesquis[ea]r?\b", r"\bbusque na\b",
+    r"\bselic\b", r"\bipca\b", r"\bcdi\b", r"\bibovespa\b", r"\bifix\b", r"\bdólar\b", r"\bdolar\b",
+    r"\bcotação atual\b", r"\bcotacao atual\b", r"\bpreço atual\b", r"\bpreco atual\b",
+    r"https?://",
+]
+
+# Indícios de perguntas em várias etapas (cálculos, encadeamentos)
+MULTI_STEP_PATTERNS = [
+    r"\be depois\b", r"\bem seguida\b", r"\bprimeiro\b.*\bdepois\b",
+    r"\bcalcule\b", r"\bsimule\b", r"\bprojete\b", r"\bquanto (eu )?(teria|receberia|ganharia)\b",
+    r"\bse eu investir\b",
+]
+
+# Indícios de perguntas respondidas pelos relatórios
+REPORT_PATTERNS = [
+    r"\brelatórios?\b", r"\brelatorios?\b", r"\bdocumentos?\b", r"\bsegundo o\b", r"\bde acordo com\b",
+    r"\bno informe\b", r"\bno balanço\b", r"\bna dre\b",
+]
+
+# Exemplos rotulados usados na classificação por similaridade
+EXEMPLARS = {
+    ROUTE_REPORTS: [
+        "Qual o dividend yield do KNRI11 no último relatório?",
+        "Qual a vacância física do fundo?",
+        "Resuma os principais pontos do relatório gerencial",
+        "Qual foi o lucro líquido da empresa no trimestre?",
+        "Quais imóveis compõem o portfólio do fundo?",
+        "Qual o valor patrimonial por cota?",
+        "Como evoluiu a receita de aluguéis segundo o relatório?",
+        "Quais os riscos citados pela gestão?",
+        "Qual o P/VP e o ROE da companhia?",
+        "Quanto o fundo distribuiu de rendimento por cota?",
+    ],
+    ROUTE_AGENT: [
+        "Qual a cotação do PETR4 hoje?",
+        "Quais as últimas notícias sobre fundos imobiliários?",
+        "Como está a Selic e o Ibovespa agora?",
+        "Compare o KNRI11 com a média do mercado e depois recomende uma carteira",
+        "Se eu investir 10 mil reais, quanto receberia de dividendos por ano?",
+        "Pesquise na internet a opinião dos analistas sobre a empresa",
+        "Qual a melhor corretora para investir?",
+        "Oi, tudo bem?",
+    ],
+}
+
+
+def _matches_any(patterns, text):
+    return any(re.search(pattern, text) for pattern in patterns)
+
+
+def _normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=float)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class QuestionRouter:
+    def __init__(self, embedding_function=None, exemplars=None):
+        """Cria o roteador. Sem embedding_function, só as regras são usadas."""
+        self.embedding_function = embedding_function
+        self.exemplars = exemplars or EXEMPLARS
+        self._exemplar_vectors = None
+        self._lock = threading.Lock()
+
+    def _get_exemplar_vectors(self):
+        """Calcula (uma única vez) os embeddings dos exemplos rotulados."""
+        with self._lock:
+            if self._exemplar_vectors is None:
+                self._exemplar_vectors = {
+                    label: _normalize_rows(self.embedding_function.embed_documents(questions))
+                    for label, questions in self.exemplars.items()
+                }
+        return self._exemplar_vectors
+
+    def similarity_scores(self, question):
+        """Maior similaridade de cosseno da pergunta com os exemplos de cada rota."""
+        vector = _normalize_rows(self.embedding_function.embed_query(question))
+        return {
+            label: float(np.max(vectors @ vector))
+            for label, vectors in self._get_exemplar_vectors().items()
+        }
+
+    def classify(self, question):
+        """Retorna ROUTE_REPORTS ou ROUTE_AGENT para a pergunta."""
+        text = question.lower()
+        if _matches_any(WEB_PATTERNS, text) or _matches_any(MULTI_STEP_PATTERNS, text):
+            return ROUTE_AGENT
+
+        if _matches_any(REPORT_PATTERNS, text):
+            return ROUTE_REPORTS
+
+        if self.embedding_function is not None:
+            try:
+                scores = self.similarity_scores(question)
+                reports_score, agent_score = scores[ROUTE_REPORTS], scores[ROUTE_AGENT]
+                if reports_score >= ROUTER_MIN_SIMILARITY and reports_score - agent_score >= ROUTER_MARGIN:
+                    return ROUTE_REPORTS
+                return ROUTE_AGENT
+            except Exception as e:
+                print(f"⚠️ Falha na classificação por similaridade: {e}")
+
+        # Sem embeddings: perguntas sobre tickers ou métricas conhecidas ficam nos relatórios
+        tickers, metrics = metrics_store.find_question_filters(question)
+        return ROUTE_REPORTS if tickers or metrics else ROUTE_AGENT
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def _embedding_model(embedding_function):
+    if embedding_function is None:
+        return None
+    return getattr(embedding_function, "model", None) or id(embedding_function)
+
+
+def get_router(embedding_function=None):
+    """Retorna o roteador compartilhado (os embeddings dos exemplos são reaproveitados)."""
+    global _router
+    with _router_lock:
+        # O roteador só é refeito se o modelo de embeddings mudar
+        if _router is None or _embedding_model(_router.embedding_function) != _embedding_model(embedding_function):
+            _router = QuestionRouter(embedding_function)
+    return _router
+
+
+def classify_question(question, vector_manager):
+    """Rota da pergunta: ROUTE_REPORTS (resposta direta) ou ROUTE_AGENT."""
+    if not ROUTER_ENABLED:
+        return ROUTE_AGENT
+    return get_router(vector_manager.embedding_function).classify(question)
+
+
+def _metrics_context(question):
+    try:
+        return metrics_store.answer_numeric_question(question)
+    except Exception as e:
+        print(f"⚠️ Erro ao consultar a tabela de métricas: {e}")
+        return None
+
+
+def answer_question(question, vector_manager, model_name=None, memory=None, route=None):
+    """Responde uma pergunta do chat pela rota mais barata possível.
+
+    memory (conversation_memory.ConversationMemory) fornece o histórico da
+    sessão e recebe o novo turno; route força uma rota em vez de classificar a
+    pergunta. Retorna (resposta, rota).
+    """
+    model_name = model_name or LLM_MODEL_NAME
+    route = route or classify_question(question, vector_manager)
+    print(f"🧭 Rota da pergunta: {route}")
+
+    if route == ROUTE_REPORTS:
+        answer = llm_services.answer_from_reports(
+            question,
+            vector_manager.get_retriever(k=ROUTER_RETRIEVER_K),
+            model_name=model_name,
+            metrics_context=_metrics_context(question),
+            history=memory.format_history() if memory is not None else None,
+        )
+        if memory is not None:
+            memory.add_turn(question, answer)
+        return answer, route
+
+    agent_executor = llm_services.setup_agent(
+        vector_manager.get_retriever(),
+        model_name=model_name,
+        memory=memory.as_agent_memory() if memory is not None else None,
+    )
+    return agent_executor.invoke({"input": question})["output"], route
+
+
+def stream_answer(question, vector_manager, route, model_name=None, memory=None):
+    """Versão em streaming de answer_question para uma rota já definida.
+
+    Na rota de relatórios as partes são repassadas à medida que o modelo as
+    gera; o agente só tem a resposta ao fim do ciclo ReAct e a entrega de uma vez.
+    """
+    if route != ROUTE_REPORTS:
+        yield answer_question(question, vector_manager, model_name=model_name, memory=memory, route=route)[0]
+        return
+
+    print(f"🧭 Rota da pergunta: {route}")
+    parts = []
+    for delta in llm_services.stream_answer_from_reports(
+        question,
+        vector_manager.get_retriever(k=ROUTER_RETRIEVER_K),
+        model_name=model_name or LLM_MODEL_NAME,
+        metrics_context=_metrics_context(question),
+        history=memory.format_history() if memory is not None else None,
+    ):
+        parts.append(delta)
+        yield delta
+    if memory is not None:
+        memory.add_turn(question, "".join(parts))
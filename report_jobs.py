@@ -0,0 +1,141 @@
+"""Módulo das Tarefas da Aplicação
+
+Funções executadas pelo executor de tarefas (jobs.py) para as ações demoradas
+das páginas: resumo de relatório, áudio do resumo, áudio do relatório
+completo, insights do dashboard e ingestão dos relatórios pendentes. Cada
+função recebe o contexto da tarefa (progresso, parciais e cancelamento) e
+retorna um resultado serializável em JSON; áudios vão para o armazenamento de
+blobs e o resultado guarda só o identificador. Os módulos de IA são
+importados dentro das funções, já na thread da tarefa.
+"""
+import os
+
+import telemetry
+from config import SUMMARY_AUDIO_PIPELINED
+
+
+def run_summary(job, file_path, model_name):
+    """Resumo do relatório; o texto parcial é publicado à medida que é gerado."""
+    import result_store
+
+    parts = []
+    with telemetry.feature("summary"):
+        for delta in result_store.stream_cached_report_summary(file_path, model_name=model_name):
+            parts.append(delta)
+            job.publish({"summary": "".join(parts)})
+    return {"summary": "".join(parts)}
+
+
+def run_summary_audio(job, file_path, model_name):
+    """Resumo e o seu áudio. No modo em pipeline, cada trecho sintetizado é publicado assim que fica pronto."""
+    import blob_store
+    import llm_services
+    import result_store
+    import tts_pipeline
+
+    store = blob_store.get_blob_store()
+    segment_handles = []
+    with telemetry.feature("tts"):
+        if SUMMARY_AUDIO_PIPELINED:
+            summary_parts = []
+            audio_parts = []
+            # A geração do resumo conta como summary; só a síntese fica em tts
+            deltas = telemetry.iter_with_feature(
+                "summary", result_store.stream_cached_report_summary(file_path, model_name=model_name)
+            )
+            for segment, audio in tts_pipeline.speak_stream(deltas, on_text=summary_parts.append):
+                if audio:
+                    audio_parts.append(audio)
+                    segment_handles.append(store.put(job.session_id, audio))
+                job.publish({"summary": "".join(summary_parts), "segments": segment_handles}, force=True)
+            summary = "".join(summary_parts)
+            audio_content = llm_services.concatenate_audio_files(audio_parts) if audio_parts else None
+        else:
+            with telemetry.feature("summary"):
+                summary = result_store.cached_report_summary(file_path, model_name=model_name)
+            job.publish({"summary": summary}, force=True)
+            audio_content = llm_services.text_to_speech(summary)
+
+    if not audio_content:
+        raise RuntimeError("Falha ao gerar áudio do resumo")
+    # Os trechos ficam até expirar (BLOB_TTL_SECONDS): um trecho ainda tocando na página não é interrompido
+    return {"summary": summary, "handle": store.put(job.session_id, audio_content), "segments": segment_handles}
+
+
+def run_full_audio(job, file_path):
+    """Áudio do relatório completo, com o andamento das partes sintetizadas."""
+    import blob_store
+    import page_store
+    import tts_pipeline
+
+    with telemetry.feature("tts"):
+        full_text = page_store.get_page_store().full_text(file_path)
+        audio_content, total_parts, failed_parts = tts_pipeline.synthesize_text(
+            full_text,
+            on_progress=lambda done, total: job.progress(done, total, f"Convertidas {done}/{total} partes para áudio"),
+        )
+    if not audio_content:
+        raise RuntimeError("Nenhum áudio foi gerado")
+    return {
+        "handle": blob_store.get_blob_store().put(job.session_id, audio_content),
+        "parts": total_parts,
+        "failed_parts": failed_parts,
+    }
+
+
+def run_insights(job, action, model_name):
+    """Resumo executivo, métricas chave ou análise detalhada a partir dos relatórios indexados."""
+    import result_store
+    import services
+
+    retriever = services.get_vector_manager().get_retriever(k=6)
+    with telemetry.feature("insights"):
+        if action == "market_summary":
+            return {"market_summary": result_store.cached_market_summary(retriever, model_name=model_name)}
+        if action == "key_metrics":
+            return result_store.cached_key_metrics(retriever, model_name=model_name)
+        if action == "detailed_insights":
+            return {"insights": result_store.cached_insights(retriever, model_name=model_name)}
+    raise ValueError(f"Insight desconhecido: {action}")
+
+
+def run_ingest(job, model_name):
+    """Processa os relatórios de reports_new e atualiza os insights do dashboard."""
+    import file_handler
+    import ingestion
+    import insights_materializer
+    import services
+
+    vector_manager = services.get_vector_manager()
+    new_reports = file_handler.get_new_reports_to_process()
+    processed, skipped = [], []
+    try:
+        with telemetry.feature("ingest"):
+            for index, report_path in enumerate(new_reports):
+                job.progress(index, len(new_reports), f"Processando {os.path.basename(report_path)}")
+                chunks_added = ingestion.ingest_report(vector_manager, report_path, model_name=model_name)
+                entry = {"file_name": os.path.basename(report_path), "chunks_added": chunks_added}
+                (processed if chunks_added > 0 else skipped).append(entry)
+    finally:
+        # Contagens e listas de documentos em cache passam a refletir o que foi ingerido
+        if processed:
+            services.documents_changed()
+
+    insights_error = None
+    if processed:
+        job.progress(len(new_reports), len(new_reports), "Atualizando insights do dashboard")
+        try:
+            with telemetry.feature("insights"):
+                insights_materializer.materialize(vector_manager, model_name=model_name)
+        except Exception as e:
+            insights_error = str(e)
+    return {"processed": processed, "skipped": skipped, "insights_error": insights_error}
+
+
+HANDLERS = {
+    "summary": run_summary,
+    "summary_audio": run_summary_audio,
+    "full_audio": run_full_audio,
+    "insights": run_insights,
+    "ingest": run_ingest,
+}
@@ -0,0 +1,200 @@
+"""Módulo de Armazenamento de Resultados
+
+Guarda resumos, resumos de mercado, métricas e insights em SQLite, comprimidos
+com zstd, indexados por (operação, versão dos documentos, modelo, versão do
+prompt). Enquanto nenhum desses elementos mudar, o resultado é reaproveitado
+em vez de chamar o LLM novamente.
+"""
+import json
+import threading
+import time
+
+import zstandard
+
+import file_handler
+import llm_services
+import summarizer
+from local_storage import SQLiteStore
+from config import LLM_MODEL_NAME, RESULT_STORE_PATH, RESULT_STORE_COMPRESSION_LEVEL
+
+
+class ResultStore(SQLiteStore):
+    def __init__(self, db_path=RESULT_STORE_PATH):
+        """Abre (ou cria) o banco SQLite de resultados."""
+        super().__init__(db_path)
+        self._compressor = zstandard.ZstdCompressor(level=RESULT_STORE_COMPRESSION_LEVEL)
+        self._decompressor = zstandard.ZstdDecompressor()
+        self._compress_lock = threading.Lock()
+
+        conn = self._get_connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                operation TEXT NOT NULL,
+                version_key TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (operation, version_key, model_name, prompt_version)
+            )
+            """
+        )
+        conn.commit()
+
+    def get(self, operation, version_key, model_name, prompt_version):
+        """Retorna o resultado armazenado ou None se não existir."""
+        row = self._get_connection().execute(
+            "SELECT value FROM results WHERE operation = ? AND version_key = ? "
+            "AND model_name = ? AND prompt_version = ?",
+            (operation, version_key, model_name, prompt_version),
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(self._decompressor.decompress(row[0]))
+
+    def put(self, operation, version_key, model_name, prompt_version, value):
+        """Armazena (ou substitui) um resultado serializável em JSON."""
+        payload = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        with self._compress_lock:
+            compressed = self._compressor.compress(payload)
+        conn = self._get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO results "
+            "(operation, version_key, model_name, prompt_version, value, created_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (operation, version_key, model_name, prompt_version, compressed, time.time()),
+        )
+        conn.commit()
+
+    def get_or_compute(self, operation, version_key, model_name, prompt_version,
+                       compute_fn, should_store=None):
+        """Retorna o resultado armazenado ou o calcula com compute_fn e o armazena.
+
+        should_store permite descartar resultados que não devem ser reaproveitados,
+        como mensagens de erro.
+        """
+        cached = self.get(operation, version_key, model_name, prompt_version)
+        if cached is not None:
+            print(f"♻️ Resultado reaproveitado: {operation} ({model_name})")
+            return cached
+
+        value = compute_fn()
+        if value is not None and (should_store is None or should_store(value)):
+            self.put(operation, version_key, model_name, prompt_version, value)
+        return value
+
+    def invalidate(self, operation=None, version_key=None):
+        """Remove resultados de uma operação e/ou versão de documentos."""
+        clauses = []
+        params = []
+        if operation is not None:
+            clauses.append("operation = ?")
+            params.append(operation)
+        if version_key is not None:
+            clauses.append("version_key = ?")
+            params.append(version_key)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        conn = self._get_connection()
+        cursor = conn.execute(f"DELETE FROM results{where}", params)
+        conn.commit()
+        return cursor.rowcount
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_result_store():
+    """Retorna a instância compartilhada do armazenamento de resultados."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore()
+    return _store
+
+
+def _is_valid_text(value):
+    return bool(value) and not value.startswith("Erro")
+
+
+def _report_summary_key(file_path, model_name, length):
+    return (
+        f"summary:{length or 'padrao'}",
+        file_handler.get_file_hash(file_path),
+        model_name,
+        f"{llm_services.PROMPT_VERSIONS['summary']}.{llm_services.PROMPT_VERSIONS['section_summary']}",
+    )
+
+
+def cached_report_summary(file_path, model_name=None, length=None):
+    """Resumo de um relatório, reaproveitado enquanto o arquivo e o prompt não mudarem."""
+    model_name = model_name or LLM_MODEL_NAME
+    return get_result_store().get_or_compute(
+        *_report_summary_key(file_path, model_name, length),
+        lambda: summarizer.summarize_report(file_path, model_name=model_name, length=length),
+        should_store=_is_valid_text,
+    )
+
+
+def stream_cached_report_summary(file_path, model_name=None, length=None):
+    """Versão em streaming de cached_report_summary.
+
+    Um resumo já armazenado é entregue de uma vez; caso contrário, as partes são
+    repassadas à medida que o modelo as gera e o texto completo é armazenado ao final.
+    """
+    model_name = model_name or LLM_MODEL_NAME
+    key = _report_summary_key(file_path, model_name, length)
+    store = get_result_store()
+    cached = store.get(*key)
+    if cached is not None:
+        print(f"♻️ Resultado reaproveitado: {key[0]} ({model_name})")
+        yield cached
+        return
+
+    parts = []
+    for delta in summarizer.stream_report_summary(file_path, model_name=model_name, length=length):
+        parts.append(delta)
+        yield delta
+    summary = "".join(parts)
+    if _is_valid_text(summary):
+        store.put(*key, summary)
+
+
+def cached_market_summary(retriever, model_name=None):
+    """Resumo executivo do mercado, reaproveitado até o conjunto de relatórios mudar."""
+    model_name = model_name or LLM_MODEL_NAME
+    return get_result_store().get_or_compute(
+        "market_summary",
+        file_handler.get_corpus_version(),
+        model_name,
+        llm_services.PROMPT_VERSIONS["market_summary"],
+        lambda: llm_services.generate_market_summary(retriever, model_name=model_name),
+        should_store=lambda value: _is_valid_text(value) and not value.startswith("Não há documentos"),
+    )
+
+
+def cached_key_metrics(retriever, model_name=None):
+    """Métricas chave, reaproveitadas até o conjunto de relatórios mudar."""
+    model_name = model_name or LLM_MODEL_NAME
+    return get_result_store().get_or_compute(
+        "key_metrics",
+        file_handler.get_corpus_version(),
+        model_name,
+        llm_services.PROMPT_VERSIONS["key_metrics"],
+        lambda: llm_services.extract_key_metrics(retriever, model_name=model_name),
+        should_store=lambda value: bool(value) and "error" not in value,
+    )
+
+
+def cached_insights(retriever, model_name=None):
+    """Insights detalhados, reaproveitados até o conjunto de relatórios mudar."""
+    model_name = model_name or LLM_MODEL_NAME
+    return get_result_store().get_or_compute(
+        "insights",
+        file_handler.get_corpus_version(),
+        model_name,
+        llm_services.PROMPT_VERSIONS["insights"],
+        lambda: llm_services.generate_insights_from_documents(retriever, model_name=model_name),
+        should_store=lambda value: bool(value) and all(_is_valid_text(v) for v in value.values()),
+    )
@@ -0,0 +1,263 @@
+"""Módulo de Serviços da Aplicação
+
+Registro de recursos compartilhados pelo processo: vector store, cliente de
+embeddings, cliente HTTP da OpenAI, caches, bancos locais e executor de
+tarefas. Cada recurso é criado uma única vez (e não a cada rerun do
+Streamlit), pode ser aquecido na inicialização, tem uma verificação de saúde e
+pode ser invalidado com segurança quando os documentos mudam: quem ainda usa a
+instância antiga termina normalmente e as próximas chamadas recebem a nova.
+
+A versão dos documentos fica em SQLite (SharedGeneration), compartilhada entre
+o app e a API: uma ingestão feita em qualquer processo expira as contagens e
+listas derivadas de todos eles.
+"""
+import threading
+import time
+
+import audio_cache
+import blob_store
+import jobs
+import llm_cache
+import memory
+import openai_clients
+import question_router
+import result_store
+from vector_store import VectorStoreManager, build_embedding_function
+from local_storage import SQLiteStore
+from config import ROUTER_ENABLED, SERVICES_WARMUP_QUERY, SERVICES_STATE_PATH
+
+
+class SharedGeneration(SQLiteStore):
+    def __init__(self, db_path=SERVICES_STATE_PATH, name="documents"):
+        """Contador em SQLite lido e incrementado por todos os processos que usam o mesmo banco."""
+        super().__init__(db_path)
+        self.name = name
+
+        conn = self._get_connection()
+        conn.execute("CREATE TABLE IF NOT EXISTS generations (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        conn.execute("INSERT OR IGNORE INTO generations VALUES (?, 0)", (name,))
+        conn.commit()
+
+    def value(self):
+        return self._get_connection().execute(
+            "SELECT value FROM generations WHERE name = ?", (self.name,)
+        ).fetchone()[0]
+
+    def increment(self):
+        conn = self._get_connection()
+        with conn:
+            conn.execute("UPDATE generations SET value = value + 1 WHERE name = ?", (self.name,))
+
+
+class ServiceRegistry:
+    def __init__(self, shared_generation=None):
+        """Registro de fábricas e instâncias dos serviços do processo.
+
+        shared_generation (SharedGeneration) torna a versão dos documentos
+        comum a vários processos; sem ela, a versão é só deste processo.
+        """
+        self._factories = {}
+        self._checks = {}
+        self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._shared_generation = shared_generation
+        self._generation = 0
+        self._derived = {}
+
+    def register(self, name, factory, check=None):
+        """Registra um serviço; check(instância) levanta exceção se ele não estiver saudável."""
+        with self._lock:
+            self._factories[name] = factory
+            self._checks[name] = check
+            self._locks[name] = threading.Lock()
+
+    def get(self, name):
+        """Retorna a instância do serviço, criando-a na primeira chamada."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.time()
+                instance = self._factories[name]()
+                self._instances[name] = instance
+                print(f"🔧 Serviço '{name}' criado em {time.time() - started:.2f}s")
+        return instance
+
+    def invalidate(self, *names):
+        """Descarta as instâncias; a próxima chamada a get() cria novas."""
+        for name in names or list(self._factories):
+            with self._locks[name]:
+                self._instances.pop(name, None)
+
+    @property
+    def generation(self):
+        """Versão do conjunto de documentos, incrementada a cada ingestão (em qualquer processo, se compartilhada)."""
+        if self._shared_generation is not None:
+            return self._shared_generation.value()
+        return self._generation
+
+    def documents_changed(self):
+        """Sinaliza que documentos foram adicionados ou removidos (valores derivados expiram)."""
+        if self._shared_generation is not None:
+            self._shared_generation.increment()
+        with self._lock:
+            self._generation += 1
+            self._derived.clear()
+
+    def derived(self, key, compute_fn):
+        """Valor calculado a partir dos documentos, reaproveitado até a próxima ingestão."""
+        generation = self.generation
+        with self._lock:
+            entry = self._derived.get(key)
+        if entry is not None and entry[0] == generation:
+            return entry[1]
+        value = compute_fn()
+        with self._lock:
+            self._derived[key] = (generation, value)
+        return value
+
+    def health(self):
+        """Executa as verificações de saúde: {nome: {"ok", "detail", "latency_ms"}}."""
+        report = {}
+        for name, check in list(self._checks.items()):
+            if check is None:
+                continue
+            started = time.time()
+            try:
+                detail = check(self.get(name))
+                ok = True
+            except Exception as e:
+                detail = str(e)
+                ok = False
+            report[name] = {
+                "ok": ok,
+                "detail": "" if detail is None else str(detail),
+                "latency_ms": (time.time() - started) * 1000,
+            }
+        return report
+
+
+def _check_vector_store(manager):
+    if manager.vector_store is None:
+        raise RuntimeError("ChromaDB não inicializado")
+    return f"{manager.vector_store._collection.count()} chunks"
+
+
+def _check_http_client(client):
+    open_circuits = [
+        endpoint for endpoint, state in openai_clients.get_circuit_states().items() if state != "closed"
+    ]
+    if open_circuits:
+        raise RuntimeError(f"circuit breaker aberto: {', '.join(open_circuits)}")
+    return "circuitos fechados"
+
+
+def _check_result_store(store):
+    store._get_connection().execute("SELECT 1").fetchone()
+
+
+def _check_jobs(runner):
+    return f"{runner.count_active()} tarefa(s) ativa(s)"
+
+
+def _check_redis(client):
+    if client is False:
+        return "desativado (sem REDIS_URL)"
+    client.ping()
+
+
+def _build_registry():
+    registry = ServiceRegistry(shared_generation=SharedGeneration())
+    registry.register("embeddings", build_embedding_function)
+    registry.register(
+        "vector_store",
+        lambda: VectorStoreManager(embedding_function=registry.get("embeddings")),
+        check=_check_vector_store,
+    )
+    registry.register("http_client", openai_clients.get_http_client, check=_check_http_client)
+    registry.register("result_store", result_store.get_result_store, check=_check_result_store)
+    # Serviços opcionais: False indica desativado (None significaria "ainda não criado")
+    registry.register("llm_cache", lambda: llm_cache.get_shared_cache() or False)
+    registry.register("audio_cache", lambda: audio_cache.get_audio_cache() or False)
+    registry.register("blob_store", blob_store.get_blob_store)
+    registry.register("jobs", jobs.get_job_runner, check=_check_jobs)
+    registry.register("redis", lambda: memory.get_redis_client() or False, check=_check_redis)
+    return registry
+
+
+_registry = None
+_registry_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def get_registry():
+    """Retorna o registro de serviços do processo."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = _build_registry()
+    return _registry
+
+
+def get_vector_manager():
+    """VectorStoreManager compartilhado pelo processo."""
+    return get_registry().get("vector_store")
+
+
+def document_count():
+    """Número de chunks indexados, reaproveitado até a próxima ingestão."""
+    return get_registry().derived("document_count", lambda: get_vector_manager().count_documents())
+
+
+def processed_documents_info():
+    """Resumo dos documentos indexados, reaproveitado até a próxima ingestão."""
+    return get_registry().derived(
+        "processed_documents_info", lambda: get_vector_manager().get_processed_documents_info()
+    )
+
+
+def documents_changed():
+    """Chamado após ingestões: contagens e listas derivadas dos documentos são recalculadas."""
+    get_registry().documents_changed()
+
+
+def warm_up(query=SERVICES_WARMUP_QUERY):
+    """Cria os serviços e carrega o índice HNSW com uma consulta de teste.
+
+    Retorna {etapa: segundos}. Falhas são registradas e não impedem o app de subir.
+    """
+    registry = get_registry()
+    timings = {}
+    steps = [
+        ("serviços", lambda: [registry.get(name) for name in ("embeddings", "vector_store", "http_client",
+                                                              "result_store", "llm_cache", "audio_cache",
+                                                              "blob_store", "jobs")]),
+        ("documentos", document_count),
+    ]
+    if query:
+        # A primeira busca carrega o índice do ChromaDB na memória
+        steps.append(("consulta de teste", lambda: document_count() and get_vector_manager().search_similarity(query, k=1)))
+    if ROUTER_ENABLED:
+        steps.append(("roteador", lambda: question_router.get_router(registry.get("embeddings"))))
+    for label, step in steps:
+        started = time.time()
+        try:
+            step()
+        except Exception as e:
+            print(f"⚠️ Aquecimento de {label} falhou: {e}")
+        timings[label] = time.time() - started
+    print("🔥 Serviços aquecidos: " + ", ".join(f"{label} {seconds:.2f}s" for label, seconds in timings.items()))
+    return timings
+
+
+def start_warm_up():
+    """Dispara o aquecimento em segundo plano uma única vez por processo."""
+    global _warm_up_thread
+    with _registry_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name="services-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
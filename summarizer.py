@@ -0,0 +1,185 @@
+"""Módulo de Resumo Map-Reduce
+
+Resume relatórios de qualquer tamanho: o texto é dividido por tokens, cada
+seção é resumida em paralelo (map) e os resumos parciais são combinados
+recursivamente (reduce) até caberem em uma única chamada ao modelo.
+"""
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+import llm_services
+import page_store
+import telemetry
+from config import (
+    LLM_MODEL_NAME,
+    SUMMARY_CACHE_DIR,
+    SUMMARY_MAP_MODEL_NAME,
+    SUMMARY_DIRECT_MAX_TOKENS,
+    SUMMARY_SECTION_TOKENS,
+    SUMMARY_SECTION_OVERLAP_TOKENS,
+    SUMMARY_REDUCE_MAX_TOKENS,
+    SUMMARY_MAX_WORKERS,
+)
+
+SECTION_SEPARATOR = "\n\n---\n\n"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    """Retorna o tokenizador do tiktoken, ou None se não estiver disponível (ex.: offline)."""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"⚠️ tiktoken indisponível, usando estimativa de tokens: {e}")
+        return None
+
+
+def count_tokens(text):
+    """Conta (ou estima, sem tiktoken) o número de tokens de um texto."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def split_into_sections(text, section_tokens=None, overlap_tokens=None):
+    """Divide o texto em seções limitadas por número de tokens."""
+    if section_tokens is None:
+        section_tokens = SUMMARY_SECTION_TOKENS
+    if overlap_tokens is None:
+        overlap_tokens = SUMMARY_SECTION_OVERLAP_TOKENS
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=section_tokens,
+        chunk_overlap=overlap_tokens,
+        length_function=count_tokens,
+        separators=["\n\n", "\n", ". ", " ", ""],
+    )
+    return splitter.split_text(text)
+
+
+def _section_cache_path(section_text):
+    """Caminho do resumo em cache de uma seção (endereçado pelo conteúdo)."""
+    prompt_version = llm_services.PROMPT_VERSIONS["section_summary"]
+    key_source = f"{SUMMARY_MAP_MODEL_NAME}\n{prompt_version}\n{section_text}"
+    key = hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    return os.path.join(SUMMARY_CACHE_DIR, f"{key}.txt")
+
+
+def summarize_section(section_text):
+    """Resume uma seção (etapa map), reaproveitando o resumo em cache quando existir."""
+    cache_path = _section_cache_path(section_text)
+    if os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    chain = llm_services.get_section_summarizer_chain(SUMMARY_MAP_MODEL_NAME)
+    summary = chain.invoke({"text_to_summarize": section_text}).content
+
+    os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(summary)
+    os.replace(tmp_path, cache_path)
+    return summary
+
+
+def _group_for_reduce(summaries, max_tokens):
+    """Agrupa resumos consecutivos em lotes que cabem em uma etapa de reduce."""
+    groups = []
+    current = []
+    current_tokens = 0
+    for summary in summaries:
+        tokens = count_tokens(summary)
+        if current and current_tokens + tokens > max_tokens:
+            groups.append(current)
+            current = []
+            current_tokens = 0
+        current.append(summary)
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _reduce_intermediate(summaries, model_name, max_workers):
+    """Combina resumos parciais recursivamente até caberem na etapa final de reduce."""
+    intermediate_chain = llm_services.get_reduce_summarizer_chain(model_name, length="longo")
+
+    while len(summaries) > 1 and count_tokens(SECTION_SEPARATOR.join(summaries)) > SUMMARY_REDUCE_MAX_TOKENS:
+        groups = _group_for_reduce(summaries, SUMMARY_REDUCE_MAX_TOKENS)
+        if len(groups) == len(summaries):
+            # Cada resumo já ocupa um lote inteiro: combinar em pares para garantir progresso
+            groups = [summaries[i:i + 2] for i in range(0, len(summaries), 2)]
+        print(f"🔁 Reduce intermediário: {len(summaries)} resumos em {len(groups)} lotes")
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            summaries = list(executor.map(
+                telemetry.bind_feature(lambda group: intermediate_chain.invoke(
+                    {"text_to_summarize": SECTION_SEPARATOR.join(group)}
+                ).content),
+                groups,
+            ))
+    return summaries
+
+
+def _reduce(summaries, model_name, length, max_workers):
+    """Combina resumos parciais recursivamente até restar um único resumo."""
+    summaries = _reduce_intermediate(summaries, model_name, max_workers)
+    final_chain = llm_services.get_reduce_summarizer_chain(model_name, length=length)
+    return final_chain.invoke({"text_to_summarize": SECTION_SEPARATOR.join(summaries)}).content
+
+
+def _final_chain_and_input(text, model_name, length, max_workers):
+    """Executa as etapas anteriores à chamada final e retorna (cadeia final, texto de entrada)."""
+    if count_tokens(text) <= SUMMARY_DIRECT_MAX_TOKENS:
+        return llm_services.get_summarizer_chain(model_name, length=length), text
+
+    sections = split_into_sections(text)
+    print(f"🧩 Resumo map-reduce: {len(sections)} seções, até {max_workers} em paralelo")
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        section_summaries = list(executor.map(telemetry.bind_feature(summarize_section), sections))
+
+    summaries = _reduce_intermediate(section_summaries, model_name, max_workers)
+    final_chain = llm_services.get_reduce_summarizer_chain(model_name, length=length)
+    return final_chain, SECTION_SEPARATOR.join(summaries)
+
+
+def summarize_text(text, model_name=None, length=None, max_workers=SUMMARY_MAX_WORKERS):
+    """Resume um texto de qualquer tamanho usando map-reduce hierárquico.
+
+    Textos curtos são resumidos em uma única chamada. Nos longos, os resumos
+    das seções ficam em cache, então trocar o modelo ou o tamanho do resumo
+    reexecuta apenas a etapa de reduce.
+    """
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    chain, final_input = _final_chain_and_input(text, model_name, length, max_workers)
+    return chain.invoke({"text_to_summarize": final_input}).content
+
+
+def stream_summary_text(text, model_name=None, length=None, max_workers=SUMMARY_MAX_WORKERS):
+    """Como summarize_text, mas gera o resumo final em partes à medida que o modelo responde."""
+    if model_name is None:
+        model_name = LLM_MODEL_NAME
+    chain, final_input = _final_chain_and_input(text, model_name, length, max_workers)
+    for chunk in chain.stream({"text_to_summarize": final_input}):
+        if chunk.content:
+            yield chunk.content
+
+
+def summarize_report(file_path, model_name=None, length=None):
+    """Lê o texto de um PDF (pelo índice de páginas) e retorna o seu resumo."""
+    full_text = page_store.get_page_store().full_text(file_path)
+    return summarize_text(full_text, model_name=model_name, length=length)
+
+
+def stream_report_summary(file_path, model_name=None, length=None):
+    """Lê o texto de um PDF (pelo índice de páginas) e gera o seu resumo em partes (streaming)."""
+    full_text = page_store.get_page_store().full_text(file_path)
+    yield from stream_summary_text(full_text, model_name=model_name, length=length)
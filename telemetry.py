@@ -0,0 +1,379 @@
+"""Módulo de Telemetria
+
+Mede cada chamada à OpenAI (chat, embeddings e TTS): modelo, tokens de
+entrada e saída, latência, tempo até o primeiro token, retentativas e a
+funcionalidade que originou a chamada (chat, summary, insights, tts, ingest).
+As medições são exportadas via OpenTelemetry e também mantidas em um agregado
+local em janela deslizante, exibido na página Sistema.
+"""
+import contextvars
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+import httpx
+from langchain_core.callbacks import BaseCallbackHandler
+from opentelemetry import metrics, trace
+
+from config import (
+    OTEL_SERVICE_NAME,
+    OTEL_EXPORTER_OTLP_ENDPOINT,
+    TELEMETRY_WINDOW_SECONDS,
+    MODEL_PRICES_PER_MILLION,
+)
+
+UNKNOWN_FEATURE = "outros"
+
+_current_feature = contextvars.ContextVar("telemetry_feature", default=UNKNOWN_FEATURE)
+
+_meter = metrics.get_meter(OTEL_SERVICE_NAME)
+_tracer = trace.get_tracer(OTEL_SERVICE_NAME)
+_calls_counter = _meter.create_counter("openai.calls", description="Chamadas à API da OpenAI")
+_errors_counter = _meter.create_counter("openai.errors", description="Chamadas com erro")
+_retries_counter = _meter.create_counter("openai.retries", description="Retentativas HTTP")
+_tokens_counter = _meter.create_counter("openai.tokens", unit="token", description="Tokens consumidos")
+_cost_counter = _meter.create_counter("openai.cost", unit="USD", description="Custo estimado")
+_latency_histogram = _meter.create_histogram("openai.latency", unit="s", description="Latência por chamada")
+_ttft_histogram = _meter.create_histogram("openai.ttft", unit="s", description="Tempo até o primeiro token")
+
+
+@contextmanager
+def feature(name):
+    """Atribui as chamadas feitas dentro do bloco a uma funcionalidade."""
+    token = _current_feature.set(name)
+    try:
+        yield
+    finally:
+        _current_feature.reset(token)
+
+
+def current_feature():
+    return _current_feature.get()
+
+
+def bind_feature(fn):
+    """Propaga a funcionalidade atual para fn quando executada em outra thread."""
+    feature_name = current_feature()
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        with feature(feature_name):
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def iter_with_feature(name, iterable):
+    """Percorre o iterável atribuindo à funcionalidade o trabalho feito em cada next().
+
+    Diferente de usar feature() dentro de um gerador, nada vaza entre os itens
+    nem depende da thread que consome o iterável.
+    """
+    iterator = iter(iterable)
+    while True:
+        with feature(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def estimate_cost(model, input_units, output_units=0):
+    """Estima o custo em US$ de uma chamada a partir da tabela de preços."""
+    prices = MODEL_PRICES_PER_MILLION.get(model)
+    if prices is None:
+        # Modelos versionados (ex.: gpt-4o-mini-2024-07-18) usam o preço do nome base
+        matches = [name for name in MODEL_PRICES_PER_MILLION if model.startswith(name)]
+        if not matches:
+            return 0.0
+        prices = MODEL_PRICES_PER_MILLION[max(matches, key=len)]
+    return (input_units * prices[0] + output_units * prices[1]) / 1_000_000
+
+
+class RollingAggregate:
+    def __init__(self, window_seconds=TELEMETRY_WINDOW_SECONDS):
+        """Agregado das chamadas mais recentes, restrito a uma janela de tempo."""
+        self.window_seconds = window_seconds
+        self._records = deque()
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self._records.append(record)
+            self._expire(record["timestamp"])
+
+    def _expire(self, now):
+        while self._records and self._records[0]["timestamp"] < now - self.window_seconds:
+            self._records.popleft()
+
+    def records(self):
+        with self._lock:
+            self._expire(time.time())
+            return list(self._records)
+
+    def summary(self):
+        """Resumo por funcionalidade: chamadas, erros, tokens, custo e latências."""
+        groups = {}
+        for record in self.records():
+            groups.setdefault(record["feature"], []).append(record)
+
+        summary = {}
+        for feature_name, records in groups.items():
+            latencies = sorted(r["latency"] for r in records)
+            ttfts = [r["ttft"] for r in records if r["ttft"] is not None]
+            summary[feature_name] = {
+                "calls": len(records),
+                "errors": sum(1 for r in records if r["error"]),
+                "cache_hits": sum(1 for r in records if r.get("cached")),
+                "retries": sum(r["retries"] for r in records),
+                "input_tokens": sum(r["input_tokens"] for r in records),
+                "output_tokens": sum(r["output_tokens"] for r in records),
+                "cost": sum(r["cost"] for r in records),
+                "latency_p50": latencies[len(latencies) // 2],
+                "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                "ttft_avg": sum(ttfts) / len(ttfts) if ttfts else None,
+            }
+        return summary
+
+
+_aggregate = RollingAggregate()
+
+
+def get_usage_summary():
+    """Agregado por funcionalidade da janela atual (usado na página Sistema)."""
+    return _aggregate.summary()
+
+
+def record_call(kind, model, start_time, end_time=None, input_tokens=0, output_tokens=0,
+                ttft=None, retries=0, error=None, feature_name=None, cached=False):
+    """Registra uma chamada no OpenTelemetry e no agregado local.
+
+    Respostas do cache do LLM (cached=True) contam como chamada, sem tokens nem custo.
+    """
+    end_time = end_time or time.time()
+    feature_name = feature_name or current_feature()
+    latency = end_time - start_time
+    if cached:
+        input_tokens = output_tokens = 0
+    cost = estimate_cost(model, input_tokens, output_tokens)
+    attributes = {"kind": kind, "model": model, "feature": feature_name}
+
+    _calls_counter.add(1, attributes)
+    _latency_histogram.record(latency, attributes)
+    if input_tokens:
+        _tokens_counter.add(input_tokens, {**attributes, "token_type": "input"})
+    if output_tokens:
+        _tokens_counter.add(output_tokens, {**attributes, "token_type": "output"})
+    if cost:
+        _cost_counter.add(cost, attributes)
+    if ttft is not None:
+        _ttft_histogram.record(ttft, attributes)
+    if retries:
+        _retries_counter.add(retries, attributes)
+    if error:
+        _errors_counter.add(1, {**attributes, "error": type(error).__name__})
+
+    span = _tracer.start_span(f"openai.{kind}", start_time=int(start_time * 1e9), attributes={
+        **attributes,
+        "tokens.input": input_tokens,
+        "tokens.output": output_tokens,
+        "retries": retries,
+        "cache.hit": cached,
+    })
+    if error:
+        span.record_exception(error)
+        span.set_status(trace.Status(trace.StatusCode.ERROR))
+    span.end(end_time=int(end_time * 1e9))
+
+    _aggregate.add({
+        "timestamp": end_time,
+        "kind": kind,
+        "model": model,
+        "feature": feature_name,
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "latency": latency,
+        "ttft": ttft,
+        "retries": retries,
+        "cost": cost,
+        "cached": cached,
+        "error": bool(error),
+    })
+
+
+class LLMUsageCallbackHandler(BaseCallbackHandler):
+    """Callback do LangChain que mede tokens, latência e TTFT dos modelos de chat."""
+
+    def __init__(self):
+        self._runs = {}
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, invocation_params, metadata):
+        invocation_params = invocation_params or {}
+        metadata = metadata or {}
+        model = (
+            invocation_params.get("model_name")
+            or invocation_params.get("model")
+            or metadata.get("ls_model_name")
+            or "desconhecido"
+        )
+        with self._lock:
+            self._runs[run_id] = {
+                "model": model,
+                "start": time.time(),
+                "first_token": None,
+                "retries": 0,
+                "feature": current_feature(),
+            }
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, invocation_params=None,
+                            metadata=None, **kwargs):
+        self._start(run_id, invocation_params, metadata)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, invocation_params=None,
+                     metadata=None, **kwargs):
+        self._start(run_id, invocation_params, metadata)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None and run["first_token"] is None:
+                run["first_token"] = time.time()
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                run["retries"] += 1
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+
+        input_tokens = output_tokens = 0
+        usage = None
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        if message is not None and getattr(message, "usage_metadata", None):
+            usage = message.usage_metadata
+            input_tokens, output_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        elif response.llm_output and response.llm_output.get("token_usage"):
+            usage = response.llm_output["token_usage"]
+            input_tokens, output_tokens = usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0)
+
+        # Gerações do cache (llm_cache) trazem o uso da chamada original, que não é cobrado de novo
+        cached = bool(generations and (generations[0].generation_info or {}).get("cached"))
+        ttft = run["first_token"] - run["start"] if run["first_token"] else None
+        record_call("chat", run["model"], run["start"], input_tokens=input_tokens,
+                    output_tokens=output_tokens, ttft=ttft, retries=run["retries"],
+                    feature_name=run["feature"], cached=cached)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        record_call("chat", run["model"], run["start"], retries=run["retries"],
+                    error=error, feature_name=run["feature"])
+
+
+_callback_handler = LLMUsageCallbackHandler()
+
+
+def get_callback_handler():
+    """Retorna o callback compartilhado a ser anexado aos modelos de chat."""
+    return _callback_handler
+
+
+# --- Hooks do cliente HTTP da OpenAI (embeddings e TTS) ---
+
+_INSTRUMENTED_PATHS = {"/embeddings": "embeddings", "/audio/speech": "tts"}
+
+
+def _request_kind(request):
+    for suffix, kind in _INSTRUMENTED_PATHS.items():
+        if request.url.path.endswith(suffix):
+            return kind
+    return None
+
+
+def _on_request(request):
+    """Marca o início da requisição e conta retentativas do SDK da OpenAI."""
+    request.extensions["telemetry_start"] = time.time()
+    request.extensions["telemetry_feature"] = current_feature()
+
+
+def _on_response(response):
+    """Registra embeddings e TTS; chat é medido pelo callback do LangChain."""
+    request = response.request
+    # Retentativas feitas pelo transporte compartilhado ou, sem ele, pelo SDK da OpenAI
+    retries = response.extensions.get(
+        "openai_retries", int(request.headers.get("x-stainless-retry-count", "0") or 0)
+    )
+    kind = _request_kind(request)
+    if kind is None:
+        if retries:
+            _retries_counter.add(retries, {"kind": "chat", "feature": request.extensions.get("telemetry_feature")})
+        return
+
+    try:
+        payload = json.loads(request.content or b"{}")
+    except (ValueError, httpx.RequestNotRead):
+        payload = {}
+    model = payload.get("model", "desconhecido")
+    error = None if response.is_success else RuntimeError(f"HTTP {response.status_code}")
+
+    input_tokens = 0
+    if kind == "tts":
+        input_tokens = len(payload.get("input", ""))  # TTS é cobrado por caractere
+    elif response.is_success:
+        response.read()
+        input_tokens = response.json().get("usage", {}).get("prompt_tokens", 0)
+
+    record_call(kind, model, request.extensions.get("telemetry_start", time.time()),
+                input_tokens=input_tokens, retries=retries, error=error,
+                feature_name=request.extensions.get("telemetry_feature"))
+
+
+def instrument_http_client(client):
+    """Adiciona os hooks de telemetria a um httpx.Client."""
+    client.event_hooks["request"].append(_on_request)
+    client.event_hooks["response"].append(_on_response)
+    return client
+
+
+_exporters_configured = False
+
+
+def configure_exporters():
+    """Configura a exportação OTLP quando OTEL_EXPORTER_OTLP_ENDPOINT está definido."""
+    global _exporters_configured
+    if _exporters_configured or not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return
+    _exporters_configured = True
+    try:
+        from opentelemetry.exporter.otlp.proto.grpc.metric_exporter import OTLPMetricExporter
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.metrics import MeterProvider
+        from opentelemetry.sdk.metrics.export import PeriodicExportingMetricReader
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        resource = Resource.create({"service.name": OTEL_SERVICE_NAME})
+        metrics.set_meter_provider(MeterProvider(
+            resource=resource,
+            metric_readers=[PeriodicExportingMetricReader(OTLPMetricExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT))],
+        ))
+        tracer_provider = TracerProvider(resource=resource)
+        tracer_provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT)))
+        trace.set_tracer_provider(tracer_provider)
+        print(f"📡 Telemetria exportada para {OTEL_EXPORTER_OTLP_ENDPOINT}")
+    except Exception as e:
+        print(f"⚠️ Não foi possível configurar a exportação OTLP: {e}")
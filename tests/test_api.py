@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Script para testar a API HTTP (busca, perguntas, ingestão, resumos e TTS)
+"""
+import asyncio
+import os
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("fastapi")
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+import api
+import ingestion
+import question_router
+import result_store
+import services
+import tts_pipeline
+
+
+class FakeDocument:
+    def __init__(self, page_content, metadata):
+        self.page_content = page_content
+        self.metadata = metadata
+
+
+@pytest.fixture(autouse=True)
+def isolated_registry(temp_dir, monkeypatch):
+    """Registro de serviços com a versão dos documentos em temp_dir, fora do app_data/ real."""
+    generation = services.SharedGeneration(db_path=os.path.join(temp_dir, "services.sqlite3"))
+    monkeypatch.setattr(services, "_registry", services.ServiceRegistry(shared_generation=generation))
+    return generation
+
+
+@pytest.fixture
+def vector_manager(monkeypatch):
+    manager = MagicMock()
+    manager.search_similarity.return_value = [(FakeDocument("Vacância de 5%", {"source": "hglg.pdf"}), 0.25)]
+    monkeypatch.setattr(services, "get_vector_manager", lambda: manager)
+    monkeypatch.setattr(services, "start_warm_up", lambda: None)
+    return manager
+
+
+@pytest.fixture
+def client(vector_manager):
+    with TestClient(api.app) as client:
+        yield client
+
+
+def test_search(client, vector_manager):
+    """A busca repassa consulta e k ao vector store e devolve conteúdo, metadados e score."""
+    response = client.post("/search", json={"query": "vacância", "k": 2})
+    assert response.status_code == 200
+    assert response.json()["results"] == [{"content": "Vacância de 5%", "metadata": {"source": "hglg.pdf"}, "score": 0.25}]
+    vector_manager.search_similarity.assert_called_once_with("vacância", 2)
+
+
+def test_ask(client, monkeypatch):
+    """Sem rota informada a pergunta é classificada; a resposta vem com a rota usada."""
+    monkeypatch.setattr(question_router, "classify_question", lambda question, manager: "reports")
+    answer_question = MagicMock(return_value=("Vacância de 5%", "reports"))
+    monkeypatch.setattr(question_router, "answer_question", answer_question)
+
+    response = client.post("/ask", json={"question": "Qual a vacância?"})
+
+    assert response.json() == {"answer": "Vacância de 5%", "route": "reports"}
+    assert answer_question.call_args.kwargs["route"] == "reports"
+    assert client.post("/ask", json={"question": "Oi", "model": "modelo-inexistente"}).status_code == 400
+
+
+def test_ask_streaming(client, monkeypatch):
+    """Com stream=true o texto chega em partes, na rota pedida, e a vaga é liberada ao fim."""
+    monkeypatch.setattr(question_router, "stream_answer", lambda *args, **kwargs: iter(["Vacância ", "de 5%"]))
+
+    for _ in range(api.API_CONCURRENCY["ask"] + 1):
+        response = client.post("/ask", json={"question": "Qual a vacância?", "route": "agent", "stream": True})
+        assert response.status_code == 200
+        assert response.headers["X-Route"] == "agent"
+        assert response.text == "Vacância de 5%"
+
+
+def test_concurrency_limit_rejects_after_queue_timeout():
+    """Sem vaga dentro do prazo a requisição recebe 503; liberada a vaga, a próxima passa."""
+    async def scenario():
+        limiter = api.ConcurrencyLimiter({"ask": 1}, queue_timeout=0.05)
+        await limiter.acquire("ask")
+        with pytest.raises(HTTPException) as error:
+            await limiter.acquire("ask")
+        limiter.release("ask")
+        async with limiter.slot("ask"):
+            pass
+        return error.value.status_code
+
+    assert asyncio.run(scenario()) == 503
+
+
+def test_streaming_releases_slot_when_body_never_runs():
+    """Se o envio falha antes do primeiro trecho (cliente desconectou), a vaga do streaming volta mesmo assim."""
+    started = []
+
+    def deltas():
+        started.append(True)
+        yield "texto"
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise OSError("cliente desconectou")
+
+    async def scenario():
+        limiter = api.ConcurrencyLimiter({"ask": 1}, queue_timeout=0.05)
+        await limiter.acquire("ask")
+        response = api._streaming_text(deltas(), lambda: limiter.release("ask"))
+        with pytest.raises(ClientDisconnect):
+            await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+        async with limiter.slot("ask"):
+            pass
+
+    asyncio.run(scenario())
+    assert started == []
+
+
+def test_ingest_document(client, monkeypatch, temp_dir, isolated_registry):
+    """O PDF recebido é gravado na pasta de novos relatórios e indexado."""
+    monkeypatch.setattr(api, "REPORTS_NEW_DIR", temp_dir)
+    monkeypatch.setattr(api, "_materialize_insights", lambda *args: None)
+    saved = {}
+
+    def ingest_report(manager, report_path, model_name=None):
+        with open(report_path, "rb") as f:
+            saved[os.path.basename(report_path)] = f.read()
+        return 3
+
+    monkeypatch.setattr(ingestion, "ingest_report", ingest_report)
+
+    response = client.post("/documents", params={"file_name": "hglg.pdf"}, content=b"%PDF-1.4 conteudo")
+    assert response.json() == {"file_name": "hglg.pdf", "chunks_added": 3, "duplicate": False}
+    assert saved == {"hglg.pdf": b"%PDF-1.4 conteudo"}
+    assert isolated_registry.value() == 1
+    assert client.post("/documents", params={"file_name": "../hglg.pdf"}, content=b"x").status_code == 400
+    assert not any(name.endswith(".part") for name in os.listdir(temp_dir))
+
+
+def test_summary_of_unknown_report(client, monkeypatch):
+    """Resumos só são gerados para relatórios já processados."""
+    monkeypatch.setattr(api.file_handler, "get_all_processed_reports", lambda: ["hglg.pdf"])
+    monkeypatch.setattr(result_store, "cached_report_summary", lambda *args, **kwargs: "Resumo")
+
+    assert client.post("/summaries", json={"file_name": "outro.pdf"}).status_code == 404
+    assert client.post("/summaries", json={"file_name": "hglg.pdf"}).json()["summary"] == "Resumo"
+
+
+def test_get_document_ranges_and_etag(client, monkeypatch, temp_dir):
+    """O PDF é servido em trechos (Range) e revalidado pelo ETag."""
+    with open(os.path.join(temp_dir, "hglg.pdf"), "wb") as f:
+        f.write(b"%PDF-1.4 " + b"x" * 1000)
+    monkeypatch.setattr(api, "REPORTS_PROCESSED_DIR", temp_dir)
+    monkeypatch.setattr(api.file_handler, "get_all_processed_reports", lambda: ["hglg.pdf"])
+
+    response = client.get("/documents/hglg.pdf")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["content-disposition"].startswith("inline")
+
+    partial = client.get("/documents/hglg.pdf", headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.content == b"%PDF-1.4"
+    assert partial.headers["content-range"] == "bytes 0-7/1009"
+
+    etag = response.headers["etag"]
+    assert client.get("/documents/hglg.pdf", headers={"If-None-Match": etag}).status_code == 304
+    download = client.get("/documents/hglg.pdf", params={"download": "true"})
+    assert download.headers["content-disposition"].startswith("attachment")
+    assert client.get("/documents/outro.pdf").status_code == 404
+
+
+def test_tts(client, monkeypatch):
+    """O áudio é devolvido como MP3, com o número de partes sintetizadas."""
+    monkeypatch.setattr(tts_pipeline, "synthesize_text", lambda text: (b"mp3", 2, []))
+    response = client.post("/tts", json={"text": "Resumo do relatório"})
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.content == b"mp3"
+    assert response.headers["X-TTS-Parts"] == "2"
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Script para testar o cache de áudio em disco (endereçado por conteúdo, com LRU por tamanho)
+"""
+import os
+
+import pytest
+
+import audio_cache
+import llm_services
+import tts_pipeline
+from audio_cache import AudioCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = AudioCache(directory=str(tmp_path / "audio"), max_bytes=1000)
+    monkeypatch.setattr(audio_cache, "_audio_cache", cache)
+    return cache
+
+
+class FakeSpeech:
+    def __init__(self):
+        self.inputs = []
+
+    def create(self, model, voice, input):
+        self.inputs.append(input)
+        return type("Response", (), {"content": f"mp3:{input}".encode()})()
+
+
+@pytest.fixture
+def fake_tts(monkeypatch):
+    speech = FakeSpeech()
+    client = type("Client", (), {"audio": type("Audio", (), {"speech": speech})()})()
+    monkeypatch.setattr(llm_services, "get_openai_client", lambda: client)
+    return speech
+
+
+def test_key_depends_on_text_voice_and_model():
+    """A chave muda com o texto, a voz, o modelo e o tipo de áudio."""
+    base = audio_cache.audio_key("Resumo", voice="onyx", model="tts-1")
+    assert base == audio_cache.audio_key("Resumo", voice="onyx", model="tts-1")
+    assert base != audio_cache.audio_key("Resumo!", voice="onyx", model="tts-1")
+    assert base != audio_cache.audio_key("Resumo", voice="nova", model="tts-1")
+    assert base != audio_cache.audio_key("Resumo", voice="onyx", model="tts-1-hd")
+    assert base != audio_cache.audio_key("Resumo", voice="onyx", model="tts-1", kind="full")
+
+
+def test_round_trip(cache):
+    """O áudio gravado volta igual e conta como acerto."""
+    key = audio_cache.audio_key("texto")
+    assert cache.get(key) is None
+    cache.put(key, b"mp3")
+    assert cache.get(key) == b"mp3"
+    assert cache.stats.as_dict()["hits"] == 1
+    assert cache.size_bytes() == 3
+
+
+def test_size_based_lru_eviction(cache):
+    """Ao passar do limite, os áudios usados há mais tempo são removidos primeiro."""
+    keys = [audio_cache.audio_key(str(i)) for i in range(4)]
+    for i, key in enumerate(keys[:3]):
+        cache.put(key, b"x" * 300)
+        os.utime(cache._path(key), (i, i))
+    cache.get(keys[0])  # o mais antigo volta a ser o mais recente
+
+    cache.put(keys[3], b"x" * 300)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[3]) is not None
+    assert cache.size_bytes() <= 1000
+    assert cache.stats.evictions == 1
+
+
+def test_text_to_speech_reuses_cached_audio(cache, fake_tts):
+    """A segunda síntese do mesmo texto não chama a API."""
+    assert llm_services.text_to_speech("Olá") == "mp3:Olá".encode()
+    assert llm_services.text_to_speech("Olá") == "mp3:Olá".encode()
+    assert fake_tts.inputs == ["Olá"]
+
+
+def test_full_audio_is_cached_after_assembly(cache, fake_tts, monkeypatch):
+    """O áudio completo montado é servido do cache sem sintetizar as partes de novo."""
+    monkeypatch.setattr(llm_services, "concatenate_audio_files", lambda parts: b"|".join(parts))
+    text = "Primeira frase. Segunda frase."
+    monkeypatch.setattr(tts_pipeline, "split_text_for_tts", lambda text: text.split(" ", 1))
+
+    first = tts_pipeline.synthesize_text(text)
+    synthesize_calls = len(fake_tts.inputs)
+    second = tts_pipeline.synthesize_text(text)
+
+    assert first == second == (b"mp3:Primeira|mp3:frase. Segunda frase.", 2, [])
+    assert len(fake_tts.inputs) == synthesize_calls == 2
+
+
+def test_incomplete_audio_is_not_cached(cache, monkeypatch):
+    """Áudios com partes que falharam não entram no cache."""
+    monkeypatch.setattr(tts_pipeline, "synthesize_chunks", lambda chunks, **kwargs: [b"a", None])
+    monkeypatch.setattr(tts_pipeline, "split_text_for_tts", lambda text: ["a", "b"])
+    monkeypatch.setattr(llm_services, "concatenate_audio_files", lambda parts: b"".join(parts))
+
+    assert tts_pipeline.synthesize_text("a b") == (b"a", 2, [2])
+    assert cache.get(audio_cache.audio_key("a b", kind="full")) is None
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script para testar o armazenamento em disco das mídias geradas por sessão
+"""
+import os
+
+from blob_store import BlobStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _store(temp_dir, clock=None, **kwargs):
+    return BlobStore(directory=os.path.join(temp_dir, "blobs"), clock=clock or FakeClock(), **kwargs)
+
+
+def test_put_and_read_back(temp_dir):
+    """A sessão recebe um identificador e o conteúdo é lido do arquivo."""
+    store = _store(temp_dir)
+    handle = store.put("sessao-1", b"mp3-bytes")
+
+    assert handle.endswith(".mp3")
+    with store.open("sessao-1", handle) as f:
+        assert f.read() == b"mp3-bytes"
+    assert store.path("outra-sessao", handle) is None
+    assert store.session_usage("sessao-1") == len(b"mp3-bytes")
+
+
+def test_session_ids_do_not_reach_the_filesystem(temp_dir):
+    """Ids de sessão e identificadores maliciosos não escapam do diretório."""
+    store = _store(temp_dir)
+    handle = store.put("../../etc", b"x")
+    assert os.path.commonpath([store.path("../../etc", handle), store.directory]) == store.directory
+    assert store.path("../../etc", "../../passwd") is None
+
+
+def test_session_quota_evicts_oldest(temp_dir):
+    """Acima da cota, os blobs menos usados da sessão são removidos; outras sessões não."""
+    clock = FakeClock()
+    store = _store(temp_dir, clock=clock, session_quota_bytes=250)
+    other = store.put("sessao-2", b"o" * 100)
+    handles = []
+    for _ in range(3):
+        handles.append(store.put("sessao-1", b"a" * 100))
+        os.utime(store.path("sessao-1", handles[-1]), (clock.now, clock.now))
+        clock.now += 10
+    assert store.session_usage("sessao-1") <= 250
+    assert store.path("sessao-1", handles[0]) is None
+    assert store.path("sessao-1", handles[2]) is not None
+    assert store.path("sessao-2", other) is not None
+
+
+def test_session_quota_ignores_blobs_removed_meanwhile(temp_dir, monkeypatch):
+    """Um blob apagado por outra coleta entre a listagem e a remoção não quebra a gravação."""
+    clock = FakeClock()
+    store = _store(temp_dir, clock=clock, session_quota_bytes=150)
+    old = store.put("sessao-1", b"a" * 100)
+    clock.now += 10
+    list_blobs = store._blobs
+
+    def list_then_collect(session_dir):
+        blobs = list_blobs(session_dir)
+        os.remove(os.path.join(session_dir, old))
+        return blobs
+
+    monkeypatch.setattr(store, "_blobs", list_then_collect)
+    handle = store.put("sessao-1", b"b" * 100)
+    monkeypatch.undo()
+
+    assert store.path("sessao-1", old) is None
+    assert store.path("sessao-1", handle) is not None
+
+
+def test_expired_blobs_are_collected(temp_dir):
+    """A coleta remove blobs sem uso há mais que o TTL; os usados recentemente ficam."""
+    clock = FakeClock()
+    store = _store(temp_dir, clock=clock, ttl_seconds=60, gc_interval_seconds=30)
+    old = store.put("sessao-1", b"antigo")
+    used = store.put("sessao-2", b"usado")
+    clock.now += 50
+    store.path("sessao-2", used)  # acesso renova o blob
+    clock.now += 20
+
+    assert store.collect_garbage() == 1
+    assert store.path("sessao-1", old) is None
+    assert store.path("sessao-2", used) is not None
+    assert os.listdir(store.directory) == [os.path.basename(store._session_dir("sessao-2"))]
+
+
+def test_garbage_collection_runs_periodically_on_put(temp_dir):
+    """A coleta roda a cada gravação, respeitando o intervalo mínimo."""
+    clock = FakeClock()
+    store = _store(temp_dir, clock=clock, ttl_seconds=60, gc_interval_seconds=300)
+    old = store.put("sessao-1", b"antigo")
+    clock.now += 120
+    store.put("sessao-1", b"novo")
+    assert store.path("sessao-1", old) is not None  # intervalo ainda não passou
+
+    clock.now += 300
+    store.put("sessao-1", b"mais novo")
+    assert store.path("sessao-1", old) is None
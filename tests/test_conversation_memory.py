@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Script para testar a memória limitada da conversa com resumo contínuo
+"""
+import threading
+
+import pytest
+from langchain_core.messages import HumanMessage, SystemMessage
+
+import llm_services
+from conversation_memory import ConversationMemory
+
+
+def _fake_summarizer(calls):
+    def summarize(current_summary, turns, max_tokens, model_name=None):
+        calls.append(list(turns))
+        new_parts = [question for question, _ in turns]
+        return " | ".join(filter(None, [current_summary, *new_parts]))
+    return summarize
+
+
+def test_keeps_recent_turns_and_summarizes_older(monkeypatch):
+    """Só os últimos turnos ficam na íntegra; os anteriores vão para o resumo."""
+    calls = []
+    monkeypatch.setattr(llm_services, "summarize_conversation", _fake_summarizer(calls))
+    memory = ConversationMemory(max_turns=2)
+    for i in range(5):
+        memory.add_turn(f"pergunta {i}", f"resposta {i}")
+    assert memory.wait_until_idle(timeout=5)
+
+    messages = memory.messages()
+    assert isinstance(messages[0], SystemMessage)
+    assert "pergunta 0 | pergunta 1 | pergunta 2" in messages[0].content
+    human = [m.content for m in messages if isinstance(m, HumanMessage)]
+    assert human == ["pergunta 3", "pergunta 4"]
+    assert sum(len(batch) for batch in calls) == 3
+
+
+def test_history_size_stays_flat(monkeypatch):
+    """O histórico enviado ao LLM não cresce com o número de turnos."""
+    monkeypatch.setattr(llm_services, "summarize_conversation",
+                        lambda summary, turns, max_tokens, model_name=None: "resumo fixo")
+    memory = ConversationMemory(max_turns=3)
+    sizes = []
+    for i in range(30):
+        memory.add_turn(f"pergunta {i} " * 20, f"resposta {i} " * 20)
+        memory.wait_until_idle(timeout=5)
+        sizes.append(len(memory.messages()))
+    assert max(sizes[5:]) == min(sizes[5:]) == 7  # resumo + 3 turnos
+
+
+def test_token_budget_moves_long_turns_to_summary(monkeypatch):
+    """Turnos longos saem da janela mesmo antes de atingir o número máximo."""
+    monkeypatch.setattr(llm_services, "summarize_conversation",
+                        lambda summary, turns, max_tokens, model_name=None: "resumo")
+    memory = ConversationMemory(max_turns=10, recent_max_tokens=100)
+    memory.add_turn("a" * 300, "b" * 300)
+    memory.add_turn("curta", "curta")
+    memory.wait_until_idle(timeout=5)
+    human = [m.content for m in memory.messages() if isinstance(m, HumanMessage)]
+    assert human == ["curta"]
+
+
+def test_summary_runs_in_background(monkeypatch):
+    """add_turn não espera o LLM; os turnos pendentes seguem visíveis até o resumo ficar pronto."""
+    release = threading.Event()
+
+    def slow_summarizer(summary, turns, max_tokens, model_name=None):
+        release.wait(5)
+        return "resumo"
+
+    monkeypatch.setattr(llm_services, "summarize_conversation", slow_summarizer)
+    memory = ConversationMemory(max_turns=1)
+    memory.add_turn("p1", "r1")
+    memory.add_turn("p2", "r2")
+
+    human = [m.content for m in memory.messages() if isinstance(m, HumanMessage)]
+    assert human == ["p1", "p2"]
+    release.set()
+    assert memory.wait_until_idle(timeout=5)
+    assert [m.content for m in memory.messages() if isinstance(m, HumanMessage)] == ["p2"]
+
+
+def test_failed_summary_keeps_turns(monkeypatch):
+    """Se o resumo falhar, os turnos antigos continuam no histórico."""
+    def failing(summary, turns, max_tokens, model_name=None):
+        raise RuntimeError("sem conexão")
+
+    monkeypatch.setattr(llm_services, "summarize_conversation", failing)
+    memory = ConversationMemory(max_turns=1)
+    memory.add_turn("p1", "r1")
+    memory.add_turn("p2", "r2")
+    memory.wait_until_idle(timeout=5)
+    assert "Usuário: p1" in memory.format_history()
+
+
+def test_pending_turns_are_capped_when_summary_keeps_failing(monkeypatch):
+    """Com o resumo sempre falhando, só os turnos pendentes mais recentes são mantidos."""
+    def failing(summary, turns, max_tokens, model_name=None):
+        raise RuntimeError("sem conexão")
+
+    monkeypatch.setattr(llm_services, "summarize_conversation", failing)
+    memory = ConversationMemory(max_turns=2, max_pending_turns=3)
+    for i in range(50):
+        memory.add_turn(f"p{i}", f"r{i}")
+        assert memory.wait_until_idle(timeout=5)
+
+    human = [m.content for m in memory.messages() if isinstance(m, HumanMessage)]
+    assert human == ["p45", "p46", "p47", "p48", "p49"]
+
+
+def test_turns_dropped_during_summary_are_not_removed_twice(monkeypatch):
+    """Turnos descartados enquanto um resumo está em andamento não fazem o resumo apagar turnos mais novos."""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_summarizer(summary, turns, max_tokens, model_name=None):
+        calls.append([question for question, _ in turns])
+        started.set()
+        release.wait(5)
+        return " | ".join(filter(None, [summary, *calls[-1]]))
+
+    monkeypatch.setattr(llm_services, "summarize_conversation", slow_summarizer)
+    memory = ConversationMemory(max_turns=1, max_pending_turns=2)
+    memory.add_turn("p0", "r0")
+    memory.add_turn("p1", "r1")  # p0 vai para o resumo (em andamento)
+    assert started.wait(5)
+    memory.add_turn("p2", "r2")
+    memory.add_turn("p3", "r3")  # p0 é descartado; p1 e p2 aguardam
+    release.set()
+    assert memory.wait_until_idle(timeout=5)
+
+    assert calls == [["p0"], ["p1", "p2"]]
+    assert [m.content for m in memory.messages() if isinstance(m, HumanMessage)] == ["p3"]
+
+
+@pytest.mark.parametrize("reset", [ConversationMemory.clear, lambda memory: memory.restore([])])
+def test_clear_discards_summary_in_flight(monkeypatch, reset):
+    """Um resumo que termina depois de limpar (ou recarregar) a conversa não volta ao histórico."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_summarizer(summary, turns, max_tokens, model_name=None):
+        started.set()
+        release.wait(5)
+        return "resumo da conversa antiga"
+
+    monkeypatch.setattr(llm_services, "summarize_conversation", slow_summarizer)
+    memory = ConversationMemory(max_turns=1)
+    memory.add_turn("p0", "r0")
+    memory.add_turn("p1", "r1")
+    assert started.wait(5)
+    reset(memory)
+    memory.add_turn("nova", "resposta")
+    release.set()
+    assert memory.wait_until_idle(timeout=5)
+
+    assert memory.summary == ""
+    assert "conversa antiga" not in memory.format_history()
+    assert [m.content for m in memory.messages() if isinstance(m, HumanMessage)] == ["nova"]
+
+
+def test_agent_memory_adapter():
+    """O adaptador expõe o histórico ao agente e registra os novos turnos."""
+    memory = ConversationMemory()
+    adapter = memory.as_agent_memory()
+    adapter.save_context({"input": "Qual o DY?"}, {"output": "0,9%"})
+    history = adapter.load_memory_variables({})["chat_history"]
+    assert [m.content for m in history] == ["Qual o DY?", "0,9%"]
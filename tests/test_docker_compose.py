@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Script para testar os volumes compartilhados do docker-compose
+"""
+import os
+
+import yaml
+
+import config
+
+COMPOSE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "docker-compose.yml")
+
+
+def test_app_and_api_mount_the_same_data_dirs():
+    """App e API montam os diretórios de dados da configuração, para ler e gravar os mesmos bancos."""
+    with open(COMPOSE_PATH, encoding="utf-8") as f:
+        services = yaml.safe_load(f)["services"]
+
+    expected = {
+        f"./{path}:/app/{path}"
+        for path in (config.REPORTS_NEW_DIR, config.REPORTS_PROCESSED_DIR, config.VECTOR_STORE_DIR, config.APP_DATA_DIR)
+    }
+    for name in ("rag-app", "rag-api"):
+        assert expected <= set(services[name]["volumes"]), name
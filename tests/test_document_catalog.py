@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Script para testar o catálogo de documentos do vector store
+"""
+import os
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import vector_store
+from document_catalog import DocumentCatalog
+
+
+class FakeLoader:
+    """Substitui o PyPDFLoader: três páginas de texto por arquivo."""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+
+    def load(self):
+        return [
+            Document(page_content=f"Página {page} do relatório. " * 80, metadata={"page": page})
+            for page in range(3)
+        ]
+
+
+def _catalog(temp_dir):
+    return DocumentCatalog(db_path=os.path.join(temp_dir, "catalog.sqlite3"))
+
+
+@pytest.fixture
+def manager_factory(temp_dir, monkeypatch):
+    monkeypatch.setattr(vector_store, "VECTOR_STORE_DIR", os.path.join(temp_dir, "chroma"))
+    monkeypatch.setattr(vector_store, "REPORTS_PROCESSED_DIR", temp_dir)
+    monkeypatch.setattr(vector_store, "PyPDFLoader", FakeLoader)
+
+    def factory(catalog=None):
+        return vector_store.VectorStoreManager(
+            embedding_function=DeterministicFakeEmbedding(size=8),
+            catalog=catalog or _catalog(temp_dir),
+        )
+
+    return factory
+
+
+def _report(temp_dir, name):
+    path = os.path.join(temp_dir, name)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-fake " + name.encode())
+    return path
+
+
+def test_record_and_replace(temp_dir):
+    """As estatísticas registradas são somadas e substituídas por documento."""
+    catalog = _catalog(temp_dir)
+    catalog.record("b.pdf", chunk_count=5, page_count=2, size_bytes=100, embedding_model="emb")
+    catalog.record("a.pdf", chunk_count=3)
+
+    info = catalog.documents()
+    assert list(info) == ["a.pdf", "b.pdf"]
+    assert info["b.pdf"]["chunk_count"] == info["b.pdf"]["total_chunks"] == 5
+    assert info["b.pdf"]["page_count"] == 2
+    assert catalog.total_chunks() == 8
+
+    catalog.record("b.pdf", chunk_count=1)
+    assert catalog.total_chunks() == 4
+
+
+def test_ingest_keeps_catalog_in_sync(temp_dir, manager_factory):
+    """A ingestão atualiza o catálogo, que responde às contagens sem ler a coleção."""
+    manager = manager_factory()
+    report = _report(temp_dir, "hglg.pdf")
+    chunks_added = manager.add_documents_from_file(report)
+    assert manager.add_documents_from_file(report) == 0  # duplicata
+
+    info = manager.get_processed_documents_info()["hglg.pdf"]
+    assert info["chunk_count"] == chunks_added > 0
+    assert info["page_count"] == 3
+    assert info["size_bytes"] == os.path.getsize(report)
+    assert info["embedding_model"] == vector_store.EMBEDDING_MODEL_NAME
+    assert manager.count_documents() == manager.vector_store._collection.count()
+
+    manager.vector_store.get = lambda *args, **kwargs: pytest.fail("a coleção não deve ser percorrida")
+    assert manager.count_documents() == chunks_added
+
+
+def test_catalog_is_rebuilt_from_collection(temp_dir, manager_factory):
+    """Um catálogo vazio (ou desatualizado) é reconstruído a partir dos metadados da coleção."""
+    manager = manager_factory()
+    chunks_a = manager.add_documents_from_file(_report(temp_dir, "a.pdf"))
+    chunks_b = manager.add_documents_from_file(_report(temp_dir, "b.pdf"))
+
+    rebuilt = manager_factory(catalog=DocumentCatalog(db_path=os.path.join(temp_dir, "novo.sqlite3")))
+    info = rebuilt.get_processed_documents_info()
+    assert {name: entry["chunk_count"] for name, entry in info.items()} == {"a.pdf": chunks_a, "b.pdf": chunks_b}
+    assert info["a.pdf"]["page_count"] == 3
+    assert info["a.pdf"]["size_bytes"] == os.path.getsize(os.path.join(temp_dir, "a.pdf"))
+    assert rebuilt.count_documents() == chunks_a + chunks_b
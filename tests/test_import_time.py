@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Script para testar o orçamento de tempo de importação da interface
+"""
+import importlib
+
+import pytest
+
+import import_benchmark
+
+
+@pytest.mark.parametrize("module", sorted(import_benchmark.IMPORT_BUDGETS_SECONDS))
+def test_import_budget(module):
+    """A inicialização não carrega dependências pesadas e cabe no orçamento de tempo."""
+    timings = import_benchmark.measure_imports(module)
+    assert import_benchmark.heavy_modules_loaded(timings) == []
+    assert timings[module][1] <= import_benchmark.IMPORT_BUDGETS_SECONDS[module]
+
+
+@pytest.mark.parametrize("tab", sorted(import_benchmark.FIRST_RUN_BUDGETS_SECONDS))
+def test_first_run_budget(tab):
+    """A primeira execução de main() só dispara o aquecimento: services e as dependências pesadas ficam fora dela."""
+    run = import_benchmark.measure_first_run(tab)
+    assert run["warm_up_started"]
+    assert not run["job_runner_created"]
+    assert "services" not in run["modules"]
+    assert import_benchmark.heavy_modules_loaded(run["modules"]) == []
+    assert run["seconds"] <= import_benchmark.FIRST_RUN_BUDGETS_SECONDS[tab]
+
+
+@pytest.mark.parametrize("page", ["ui.chat", "ui.viewer", "ui.insights", "ui.audio", "ui.system",
+                                  "ui.documents", "ui.sidebar", "ui.tabs"])
+def test_pages_import(page):
+    """Cada página da interface importa e expõe seu ponto de entrada."""
+    module = importlib.import_module(page)
+    assert callable(getattr(module, "render", None) or getattr(module, "process_pending", None))
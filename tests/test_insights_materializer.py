@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script para testar a materialização incremental dos insights do dashboard
+"""
+import os
+
+import pytest
+
+import file_handler
+import insights_materializer
+import llm_services
+import result_store
+
+
+class FakeVectorManager:
+    def get_retriever(self, k=4, source_file=None):
+        return source_file
+
+
+@pytest.fixture
+def fake_services(monkeypatch, temp_dir):
+    reports_dir = os.path.join(temp_dir, "reports")
+    os.makedirs(reports_dir)
+    monkeypatch.setattr(file_handler, "REPORTS_PROCESSED_DIR", reports_dir)
+    monkeypatch.setattr(result_store, "_store", result_store.ResultStore(os.path.join(temp_dir, "r.sqlite3")))
+
+    calls = {"partials": [], "merges": []}
+
+    def fake_market_summary(retriever, model_name=None):
+        calls["partials"].append(retriever)
+        return f"resumo {retriever}"
+
+    def fake_insights(retriever, model_name=None):
+        return {"Q1": f"insight {retriever}", "Q2": f"outro {retriever}"}
+
+    def fake_merge(current_text, new_texts, topic, model_name=None):
+        calls["merges"].append((topic, current_text, list(new_texts)))
+        return " + ".join(filter(None, [current_text, *new_texts]))
+
+    monkeypatch.setattr(llm_services, "generate_market_summary", fake_market_summary)
+    monkeypatch.setattr(llm_services, "generate_insights_from_documents", fake_insights)
+    monkeypatch.setattr(llm_services, "merge_insight_texts", fake_merge)
+    return reports_dir, calls
+
+
+def _add_report(reports_dir, name, content=b"%PDF"):
+    with open(os.path.join(reports_dir, name), "wb") as f:
+        f.write(content + name.encode())
+
+
+def test_incremental_materialization(fake_services):
+    """Adicionar um relatório calcula só os seus parciais e os incorpora à visão existente."""
+    reports_dir, calls = fake_services
+    manager = FakeVectorManager()
+
+    _add_report(reports_dir, "a.pdf")
+    view = insights_materializer.materialize(manager)
+    assert view["market_summary"] == "resumo a.pdf"
+    assert calls["merges"] == []
+
+    _add_report(reports_dir, "b.pdf")
+    assert insights_materializer.pending_documents() == ["b.pdf"]
+    calls["partials"].clear()
+
+    view = insights_materializer.materialize(manager)
+    assert calls["partials"] == ["b.pdf"]
+    assert view["market_summary"] == "resumo a.pdf + resumo b.pdf"
+    assert view["insights"]["Q1"] == "insight a.pdf + insight b.pdf"
+    assert set(view["documents"]) == {"a.pdf", "b.pdf"}
+    assert insights_materializer.get_materialized_view() == view
+    assert insights_materializer.pending_documents() == []
+
+
+def test_removed_document_rebuilds_from_partials(fake_services):
+    """Quando um documento sai do acervo, a visão é refeita sem recalcular parciais."""
+    reports_dir, calls = fake_services
+    manager = FakeVectorManager()
+    for name in ["a.pdf", "b.pdf", "c.pdf"]:
+        _add_report(reports_dir, name)
+    insights_materializer.materialize(manager)
+
+    os.remove(os.path.join(reports_dir, "b.pdf"))
+    calls["partials"].clear()
+    view = insights_materializer.materialize(manager)
+
+    assert calls["partials"] == []
+    assert set(view["documents"]) == {"a.pdf", "c.pdf"}
+    assert "b.pdf" not in view["market_summary"]
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Script para testar o acompanhamento das tarefas na interface
+"""
+from streamlit.testing.v1 import AppTest
+
+import jobs
+
+
+class FakeRunner:
+    """Devolve os estados programados, um por consulta (o último se repete)."""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+
+    def latest(self, session_id, key):
+        status = self.statuses.pop(0) if len(self.statuses) > 1 else self.statuses[0]
+        return {"id": "1", "status": status, "result": {"summary": "Resumo"}, "message": None,
+                "progress": None, "cancel_requested": False, "error": None}
+
+
+def _page():
+    import streamlit as st
+    from ui import job_status
+
+    st.session_state.session_id = "sessao"
+    job_status.show(
+        "summary_audio:a.pdf",
+        lambda result: st.write("resultado com a página redesenhada"),
+        render_partial=lambda result: st.write("trechos tocando"),
+        render_done=lambda result: st.write("resultado no trecho atualizado"),
+    )
+
+
+def _written(app):
+    return [element.value for element in app.markdown]
+
+
+def test_finished_job_is_rendered_in_place(monkeypatch):
+    """Uma tarefa que termina durante o acompanhamento é exibida no trecho atualizado, sem redesenhar a página."""
+    runner = FakeRunner([jobs.RUNNING, jobs.SUCCEEDED])
+    monkeypatch.setattr(jobs, "get_job_runner", lambda: runner)
+    app = AppTest.from_function(_page)
+    app.run()
+
+    assert not app.exception
+    assert _written(app) == ["resultado no trecho atualizado"]
+
+
+def test_running_and_finished_jobs(monkeypatch):
+    """Em andamento, o parcial é exibido; já concluída ao abrir a página, o resultado final."""
+    monkeypatch.setattr(jobs, "get_job_runner", lambda: FakeRunner([jobs.RUNNING]))
+    app = AppTest.from_function(_page)
+    app.run()
+    assert _written(app) == ["trechos tocando"]
+
+    monkeypatch.setattr(jobs, "get_job_runner", lambda: FakeRunner([jobs.SUCCEEDED]))
+    app = AppTest.from_function(_page)
+    app.run()
+    assert _written(app) == ["resultado com a página redesenhada"]
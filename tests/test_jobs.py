@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Script para testar o executor de tarefas em segundo plano
+"""
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+import blob_store
+import jobs
+import page_store
+import report_jobs
+import tts_pipeline
+from jobs import JobRunner
+
+
+_runners = []
+
+
+@pytest.fixture(autouse=True)
+def shutdown_runners():
+    """Encerra os executores criados no teste (e a renovação da posse) antes de apagar o banco."""
+    yield
+    while _runners:
+        _runners.pop().shutdown(wait=False)
+
+
+def _runner(temp_dir, **kwargs):
+    runner = JobRunner(db_path=os.path.join(temp_dir, "jobs.sqlite3"), **kwargs)
+    _runners.append(runner)
+    return runner
+
+
+def test_job_runs_and_stores_result(temp_dir):
+    """A tarefa roda em segundo plano e o resultado fica consultável na tabela."""
+    runner = _runner(temp_dir, handlers={"soma": lambda job, a, b: {"total": a + b}})
+    job_id = runner.submit("soma", {"a": 2, "b": 3}, session_id="sessao-1", key="soma:2+3")
+
+    job = runner.wait(job_id, timeout=5)
+    assert job["status"] == jobs.SUCCEEDED
+    assert job["result"] == {"total": 5}
+    assert job["progress"] == 1.0
+    assert runner.latest("sessao-1", "soma:2+3")["id"] == job_id
+    assert runner.latest("sessao-2", "soma:2+3") is None
+
+
+def test_repeated_submit_reuses_active_job(temp_dir):
+    """Um clique repetido enquanto a tarefa roda não cria outra tarefa."""
+    release = threading.Event()
+    runner = _runner(temp_dir, handlers={"lenta": lambda job: release.wait(5)})
+    first = runner.submit("lenta", session_id="sessao-1", key="lenta")
+    second = runner.submit("lenta", session_id="sessao-1", key="lenta")
+    other_session = runner.submit("lenta", session_id="sessao-2", key="lenta")
+    release.set()
+
+    assert first == second
+    assert other_session != first
+    assert runner.wait(first, timeout=5)["status"] == jobs.SUCCEEDED
+
+
+def test_cancel_queued_and_running_jobs(temp_dir):
+    """Na fila, a tarefa cancelada não chega a rodar; em execução, para no próximo progresso."""
+    started = threading.Event()
+    ran = []
+
+    def loop(job):
+        started.set()
+        for step in range(500):
+            job.progress(step, 500)
+            threading.Event().wait(0.01)
+
+    runner = _runner(temp_dir, max_workers=1, handlers={"loop": loop, "registro": lambda job: ran.append(1)})
+    running = runner.submit("loop", key="loop")
+    queued = runner.submit("registro", key="registro")
+    started.wait(5)
+
+    assert runner.cancel(queued)
+    assert runner.cancel(running)
+    assert runner.wait(running, timeout=5)["status"] == jobs.CANCELLED
+    assert runner.wait(queued, timeout=5)["status"] == jobs.CANCELLED
+    runner.shutdown()
+    assert ran == []
+
+
+def test_failure_and_partial_results(temp_dir):
+    """Erros ficam registrados na tarefa; resultados parciais são visíveis enquanto ela roda."""
+    published = threading.Event()
+    release = threading.Event()
+
+    def partial(job):
+        job.publish({"texto": "metade"}, force=True)
+        published.set()
+        release.wait(5)
+        return {"texto": "completo"}
+
+    def failing(job):
+        raise RuntimeError("sem conexão")
+
+    runner = _runner(temp_dir, handlers={"parcial": partial, "falha": failing})
+    partial_id = runner.submit("parcial")
+    published.wait(5)
+    assert runner.get(partial_id)["result"] == {"texto": "metade"}
+    release.set()
+    assert runner.wait(partial_id, timeout=5)["result"] == {"texto": "completo"}
+
+    failed = runner.wait(runner.submit("falha"), timeout=5)
+    assert failed["status"] == jobs.FAILED
+    assert failed["error"] == "sem conexão"
+
+
+def test_interrupted_jobs_are_requeued(temp_dir):
+    """Tarefas de um processo que parou de renovar a posse voltam para a fila e rodam em outro."""
+    release = threading.Event()
+    first = _runner(
+        temp_dir, handlers={"resumo": lambda job: release.wait(5) and {"ok": "primeiro"}}, heartbeat_interval=0.05
+    )
+    job_id = first.submit("resumo", session_id="sessao-1")
+    first.wait(job_id, timeout=0.2)
+    first.shutdown(wait=False)  # o processo "morre": a posse deixa de ser renovada
+
+    second = _runner(
+        temp_dir, handlers={"resumo": lambda job: {"ok": "segundo"}}, heartbeat_interval=0.05, lease_seconds=0.2
+    )
+    assert second.recover() == 0  # posse ainda válida
+    job = second.wait(job_id, timeout=5)  # expirada, a tarefa é assumida pelo segundo
+    assert job["result"] == {"ok": "segundo"}
+    assert job["owner"] == second.owner
+
+    # O resultado atrasado do primeiro processo não sobrescreve o do novo dono
+    release.set()
+    threading.Event().wait(0.1)
+    assert second.get(job_id)["result"] == {"ok": "segundo"}
+
+
+def test_recover_requeues_expired_jobs_at_startup(temp_dir):
+    """Ao iniciar, tarefas sem renovação há mais que a posse voltam para a fila."""
+    release = threading.Event()
+    first = _runner(temp_dir, handlers={"resumo": lambda job: release.wait(5)})
+    job_id = first.submit("resumo")
+    first.wait(job_id, timeout=0.2)
+    first.shutdown(wait=False)
+    conn = first._get_connection()
+    with conn:
+        conn.execute("UPDATE jobs SET heartbeat_at = 0 WHERE id = ?", (job_id,))
+
+    second = _runner(temp_dir, handlers={"resumo": lambda job: {"ok": True}})
+    assert second.recover() == 1
+    assert second.wait(job_id, timeout=5)["result"] == {"ok": True}
+    release.set()
+
+
+def test_running_jobs_of_live_runner_are_not_requeued(temp_dir):
+    """Dois processos no mesmo banco: o que inicia depois não assume tarefas que o outro ainda executa."""
+    release = threading.Event()
+    runs = []
+
+    def handler(job):
+        runs.append(job.runner.owner)
+        release.wait(5)
+        return {"ok": True}
+
+    first = _runner(temp_dir, handlers={"ingest": handler}, heartbeat_interval=0.05, lease_seconds=0.3)
+    job_id = first.submit("ingest")
+    first.wait(job_id, timeout=0.2)
+
+    second = _runner(temp_dir, handlers={"ingest": handler}, heartbeat_interval=0.05, lease_seconds=0.3)
+    assert second.recover() == 0
+    threading.Event().wait(0.6)  # mais que a posse: o primeiro continua renovando
+    release.set()
+
+    job = first.wait(job_id, timeout=5)
+    assert job["status"] == jobs.SUCCEEDED
+    assert job["owner"] == first.owner
+    assert runs == [first.owner]
+
+
+def test_full_audio_job_stores_blob(temp_dir, monkeypatch):
+    """O áudio completo vai para o armazenamento de blobs da sessão, com o andamento das partes."""
+    store = blob_store.BlobStore(directory=os.path.join(temp_dir, "blobs"))
+    monkeypatch.setattr(blob_store, "get_blob_store", lambda: store)
+    monkeypatch.setattr(page_store, "get_page_store", lambda: MagicMock(full_text=lambda path: "texto do relatório"))
+
+    def synthesize_text(text, on_progress=None):
+        for done in (1, 2):
+            on_progress(done, 2)
+        return b"mp3", 2, []
+
+    monkeypatch.setattr(tts_pipeline, "synthesize_text", synthesize_text)
+    runner = _runner(temp_dir, handlers=report_jobs.HANDLERS)
+
+    job = runner.wait(runner.submit("full_audio", {"file_path": "hglg.pdf"}, session_id="sessao-1"), timeout=5)
+
+    assert job["status"] == jobs.SUCCEEDED
+    assert job["message"] == "Convertidas 2/2 partes para áudio"
+    with store.open("sessao-1", job["result"]["handle"]) as f:
+        assert f.read() == b"mp3"
+
+
+def test_has_active_jobs_does_not_create_runner(temp_dir, monkeypatch):
+    """A consulta da barra lateral lê o banco sem criar o executor nem recuperar tarefas."""
+    db_path = os.path.join(temp_dir, "jobs.sqlite3")
+    monkeypatch.setattr(jobs, "JOBS_DB_PATH", db_path)
+    monkeypatch.setattr(jobs, "_job_runner", None)
+    monkeypatch.setattr(jobs, "JobRunner", lambda *args, **kwargs: pytest.fail("o executor não deve ser criado"))
+
+    assert not jobs.has_active_jobs("sessao-1")
+    assert not os.path.exists(db_path)
+
+    release = threading.Event()
+    runner = _runner(temp_dir, handlers={"lenta": lambda job: release.wait(5)})
+    job_id = runner.submit("lenta", session_id="sessao-1", key="lenta")
+    assert jobs.has_active_jobs("sessao-1")
+    assert not jobs.has_active_jobs("sessao-2")
+
+    release.set()
+    runner.wait(job_id, timeout=5)
+    assert not jobs.has_active_jobs("sessao-1")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script para testar o cache de respostas determinísticas do LLM
+"""
+import os
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.outputs import ChatGeneration
+from langchain_core.messages import AIMessage
+
+import llm_cache
+from llm_cache import InMemoryLRUCache, SQLiteLRUCache
+
+
+def _generation(text):
+    return [ChatGeneration(message=AIMessage(content=text))]
+
+
+def test_in_memory_lru_eviction():
+    """O cache em memória remove a entrada menos usada ao atingir o limite."""
+    cache = InMemoryLRUCache(max_entries=2)
+    cache.update("p1", "m", _generation("r1"))
+    cache.update("p2", "m", _generation("r2"))
+    assert cache.lookup("p1", "m") is not None  # p1 passa a ser a mais recente
+    cache.update("p3", "m", _generation("r3"))
+
+    assert cache.lookup("p2", "m") is None
+    assert cache.lookup("p1", "m")[0].message.content == "r1"
+    assert cache.size() == 2
+    assert cache.stats.evictions == 1
+    assert cache.stats.hits == 2 and cache.stats.misses == 1
+
+
+def test_sqlite_cache_persists_and_evicts(temp_dir):
+    """O cache SQLite sobrevive a reaberturas e respeita o limite de entradas."""
+    db_path = os.path.join(temp_dir, "llm_cache.sqlite3")
+    cache = SQLiteLRUCache(db_path, max_entries=2)
+    cache.update("p1", "m", _generation("r1"))
+    cache.update("p2", "m", _generation("r2"))
+    cache.update("p3", "m", _generation("r3"))
+    assert cache.size() == 2
+
+    reopened = SQLiteLRUCache(db_path, max_entries=2)
+    assert reopened.lookup("p3", "m")[0].message.content == "r3"
+    assert reopened.lookup("p1", "m") is None
+    assert reopened.lookup("p3", "outro-modelo") is None
+
+
+def test_nonzero_temperature_bypasses_cache(monkeypatch):
+    """Temperaturas diferentes de zero não usam cache, exceto com opt-in."""
+    monkeypatch.setattr(llm_cache, "_cache", InMemoryLRUCache())
+    assert llm_cache.get_llm_cache(0) is llm_cache._cache
+    assert llm_cache.get_llm_cache(0.3) is False
+    assert llm_cache.get_llm_cache(0.3, allow_nonzero_temperature=True) is llm_cache._cache
+
+
+def test_chat_model_hits_cache():
+    """Chamadas idênticas a um modelo com cache não chegam ao provedor."""
+    cache = InMemoryLRUCache()
+    model = FakeListChatModel(responses=["primeira", "segunda"], cache=cache)
+
+    assert model.invoke("Qual o DY do KNRI11?").content == "primeira"
+    assert model.invoke("Qual o DY do KNRI11?").content == "primeira"
+    assert model.invoke("Outra pergunta").content == "segunda"
+    assert cache.stats.hits == 1
+    assert cache.stats.hit_rate == 1 / 3
+
+
+def test_cache_hits_are_marked_as_cached(temp_dir):
+    """Gerações devolvidas pelo cache vêm marcadas, sem alterar as armazenadas nem a resposta original."""
+    for cache in (InMemoryLRUCache(), SQLiteLRUCache(os.path.join(temp_dir, "cache.sqlite3"))):
+        stored = _generation("resposta")
+        cache.update("prompt", "llm", stored)
+        [hit] = cache.lookup("prompt", "llm")
+        assert hit.generation_info["cached"] is True
+        assert hit.message.content == "resposta"
+        assert stored[0].generation_info is None
+
+    model = FakeListChatModel(responses=["primeira"], cache=InMemoryLRUCache())
+    first = model.generate([[AIMessage(content="Qual o DY?")]])
+    second = model.generate([[AIMessage(content="Qual o DY?")]])
+    assert not (first.generations[0][0].generation_info or {}).get("cached")
+    assert second.generations[0][0].generation_info["cached"] is True
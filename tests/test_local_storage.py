@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Script para testar as peças comuns de armazenamento local (SQLite por thread e gravação atômica)
+"""
+import os
+import sqlite3
+import threading
+
+import pytest
+
+from local_storage import SQLiteStore, atomic_write
+
+
+def test_sqlite_store_uses_one_wal_connection_per_thread(temp_dir):
+    """Cada thread recebe a sua conexão, sempre a mesma, com o banco em modo WAL numa pasta criada na hora."""
+    store = SQLiteStore(os.path.join(temp_dir, "sub", "dados.sqlite3"))
+    conn = store._get_connection()
+    assert store._get_connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    other = []
+    thread = threading.Thread(target=lambda: other.append(store._get_connection()))
+    thread.start()
+    thread.join()
+    assert other[0] is not conn
+
+
+def test_sqlite_store_row_factory(temp_dir):
+    """Subclasses podem escolher a fábrica de linhas das conexões."""
+    class RowStore(SQLiteStore):
+        row_factory = sqlite3.Row
+
+    row = RowStore(os.path.join(temp_dir, "dados.sqlite3"))._get_connection().execute("SELECT 1 AS um").fetchone()
+    assert row["um"] == 1
+
+
+def test_atomic_write_replaces_only_on_success(temp_dir):
+    """O arquivo só é substituído se a gravação terminar; em caso de erro o temporário é apagado."""
+    path = os.path.join(temp_dir, "saida", "texto.txt")
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        f.write("versão 1")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(path, "w", encoding="utf-8") as f:
+            f.write("versão 2 incompleta")
+            raise RuntimeError("falha no meio da gravação")
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "versão 1"
+    assert os.listdir(os.path.dirname(path)) == ["texto.txt"]
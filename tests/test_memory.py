@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Script para testar o histórico de sessão em Redis contra um servidor RESP local
+"""
+import socketserver
+import threading
+import time
+
+import pytest
+import redis
+from langchain_core.messages import AIMessage, HumanMessage
+
+import memory
+from memory import RedisSessionHistory
+
+
+class _RESPHandler(socketserver.StreamRequestHandler):
+    """Subconjunto do protocolo do Redis (RESP2): listas, TTL e comandos de conexão."""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line.startswith(b"*"), line
+        args = []
+        for _ in range(int(line[1:])):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _write(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, list):
+            self.wfile.write(b"*%d\r\n" % len(value))
+            for item in value:
+                self.wfile.write(b"$%d\r\n%s\r\n" % (len(item), item))
+        else:
+            self.wfile.write(b"+%s\r\n" % value)
+
+    def handle(self):
+        store = self.server.store
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            self.server.commands.append(command)
+            with self.server.lock:
+                store.expire_keys()
+                if command == b"RPUSH":
+                    items = store.data.setdefault(args[1], [])
+                    items.extend(args[2:])
+                    self._write(len(items))
+                elif command == b"LRANGE":
+                    items = store.data.get(args[1], [])
+                    start, stop = int(args[2]), int(args[3])
+                    stop = len(items) if stop == -1 else stop + 1
+                    self._write(items[start:stop])
+                elif command == b"LTRIM":
+                    items = store.data.get(args[1], [])
+                    start = int(args[2])
+                    store.data[args[1]] = items[start:] if start < 0 else items[start:int(args[3]) + 1]
+                    self._write(b"OK")
+                elif command == b"EXPIRE":
+                    exists = args[1] in store.data
+                    if exists:
+                        store.expires[args[1]] = time.monotonic() + int(args[2])
+                    self._write(int(exists))
+                elif command == b"TTL":
+                    self._write(int(store.expires[args[1]] - time.monotonic()) if args[1] in store.expires else -1)
+                elif command == b"DEL":
+                    self._write(sum(1 for key in args[1:] if store.data.pop(key, None) is not None))
+                elif command == b"PING":
+                    self._write(b"PONG")
+                else:  # CLIENT SETINFO, SELECT etc.
+                    self._write(b"OK")
+            self.wfile.flush()
+
+
+class _Store:
+    def __init__(self):
+        self.data = {}
+        self.expires = {}
+
+    def expire_keys(self):
+        now = time.monotonic()
+        for key, deadline in list(self.expires.items()):
+            if deadline <= now:
+                self.data.pop(key, None)
+                del self.expires[key]
+
+
+@pytest.fixture
+def redis_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _RESPHandler)
+    server.daemon_threads = True
+    server.store = _Store()
+    server.commands = []
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def redis_client(redis_server):
+    host, port = redis_server.server_address
+    return redis.Redis(host=host, port=port, protocol=2)
+
+
+def test_round_trip_with_compression(redis_client, redis_server):
+    """As mensagens voltam iguais e são gravadas comprimidas."""
+    history = RedisSessionHistory("sessao-1", redis_client)
+    history.add_messages([HumanMessage(content="Qual o DY do KNRI11?"), AIMessage(content="0,85% ao mês")])
+
+    assert [m.content for m in history.messages] == ["Qual o DY do KNRI11?", "0,85% ao mês"]
+    stored = redis_server.store.data[b"chat_history:sessao-1"][0]
+    assert stored.startswith(b"\x28\xb5\x2f\xfd")  # cabeçalho de frame zstd
+
+
+def test_append_is_pipelined(redis_client, redis_server):
+    """Um turno inteiro é gravado com RPUSH, LTRIM e EXPIRE em uma única ida ao servidor."""
+    history = RedisSessionHistory("sessao-2", redis_client)
+    redis_server.commands.clear()
+    history.add_messages([HumanMessage(content="p"), AIMessage(content="r")])
+    assert [c for c in redis_server.commands if c not in (b"CLIENT",)] == [b"RPUSH", b"LTRIM", b"EXPIRE"]
+
+
+def test_message_cap(redis_client):
+    """A sessão mantém só as últimas max_messages mensagens."""
+    history = RedisSessionHistory("sessao-3", redis_client, max_messages=4)
+    for i in range(5):
+        history.add_messages([HumanMessage(content=f"p{i}"), AIMessage(content=f"r{i}")])
+    assert [m.content for m in history.messages] == ["p3", "r3", "p4", "r4"]
+
+
+def test_idle_sessions_expire(redis_client):
+    """Sessões sem atividade expiram após o TTL."""
+    history = RedisSessionHistory("sessao-4", redis_client, ttl=1)
+    history.add_messages([HumanMessage(content="p")])
+    assert redis_client.ttl(history.key) >= 0
+    time.sleep(1.1)
+    assert history.messages == []
+
+
+def test_sessions_are_shared_between_clients(redis_server):
+    """Outra réplica (outro cliente) enxerga o mesmo histórico da sessão."""
+    host, port = redis_server.server_address
+    RedisSessionHistory("sessao-5", redis.Redis(host=host, port=port, protocol=2)).add_messages(
+        [HumanMessage(content="Olá"), AIMessage(content="Olá! Como posso ajudar?")]
+    )
+    replica = RedisSessionHistory("sessao-5", redis.Redis(host=host, port=port, protocol=2))
+    messages = replica.messages
+    assert memory.to_chat_messages(messages) == [
+        {"role": "user", "content": "Olá"},
+        {"role": "assistant", "content": "Olá! Como posso ajudar?"},
+    ]
+    assert memory.to_turns(messages) == [("Olá", "Olá! Como posso ajudar?")]
+
+
+def test_disabled_without_redis_url(monkeypatch):
+    """Sem REDIS_URL o histórico fica só na sessão do Streamlit."""
+    monkeypatch.setattr(memory, "REDIS_URL", None)
+    assert memory.get_session_history("qualquer") is None
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Script para testar a tabela de métricas extraídas na ingestão
+"""
+import os
+
+import llm_services
+import metrics_store
+from metrics_store import MetricsStore
+
+
+def _records(source_file):
+    return metrics_store.normalize_records(source_file, [
+        {"ticker": "knri11", "metric": "dividend_yield", "value": "0,85", "unit": "%", "period": "06/2025", "page": 2},
+        {"ticker": "KNRI11", "metric": "p_vp", "value": 0.92, "unit": "x", "period": "06/2025", "page": 3},
+        {"ticker": "PETR4", "metric": "lucro_liquido", "value": "1.234,5", "unit": "R$ milhões", "period": "1T25", "page": 5},
+        {"ticker": "HGLG11", "metric": "dividend_yield", "value": "n/d", "unit": "%", "page": 1},
+    ])
+
+
+def test_normalize_records():
+    """Valores no formato brasileiro são convertidos e registros inválidos descartados."""
+    records = _records("relatorio.pdf")
+    assert len(records) == 3
+    assert records[0]["ticker"] == "KNRI11"
+    assert records[0]["value"] == 0.85
+    assert records[2]["value"] == 1234.5
+
+
+def test_replace_and_query(temp_dir):
+    """Substituir um documento não afeta os demais e as consultas filtram por coluna."""
+    store = MetricsStore(os.path.join(temp_dir, "metrics.parquet"))
+    store.replace_document("a.pdf", _records("a.pdf"))
+    store.replace_document("b.pdf", _records("b.pdf")[:1])
+    assert len(store.load()) == 4
+
+    store.replace_document("a.pdf", _records("a.pdf")[:2])
+    assert len(store.load()) == 3
+    assert store.documents() == {"a.pdf", "b.pdf"}
+
+    knri = store.query(tickers=["knri11"], metrics=["dividend_yield"])
+    assert sorted(knri["source_file"]) == ["a.pdf", "b.pdf"]
+
+    reopened = MetricsStore(os.path.join(temp_dir, "metrics.parquet"))
+    assert reopened.documents() == {"a.pdf", "b.pdf"}
+
+
+def test_answer_numeric_question(temp_dir):
+    """Perguntas com ticker e métrica são respondidas pela tabela."""
+    store = MetricsStore(os.path.join(temp_dir, "metrics.parquet"))
+    store.replace_document("a.pdf", _records("a.pdf"))
+
+    answer = metrics_store.answer_numeric_question("Qual o dividend yield do KNRI11?", store=store)
+    assert "KNRI11" in answer and "0,85 %" in answer and "a.pdf (p. 2)" in answer
+    assert "P/VP" not in answer
+
+    assert metrics_store.answer_numeric_question("Como funcionam os FIIs?", store=store) is None
+    assert metrics_store.answer_numeric_question("Qual o ROE do ITUB4?", store=store) is None
+
+    overview = store.key_metrics_overview()
+    assert set(overview["ticker"]) == {"KNRI11", "PETR4"}
+
+
+def test_period_sort_key():
+    """Períodos em formatos diferentes viram uma chave ano/mês comparável."""
+    key = metrics_store.period_sort_key
+    assert key("06/2025") == key("30/06/2025") == key("jun/25") == key("2T25") == 202506
+    assert key("12/2024") == key("4T24") == key("dezembro de 2024") == key("2024") == 202412
+    assert key("Q1 2025") == key("2025-Q1") == 202503
+    assert key("3º trimestre de 2024") == key("3o tri/24") == key("3T24") == 202409
+    assert key("1º semestre de 2025") == key("1 sem 25") == key("1S25") == 202506
+    assert key("") == key("n/d") == 0
+    assert key("12/2024") < key("06/2025")
+
+
+def test_latest_value_across_year_boundary(temp_dir):
+    """O valor mais recente é escolhido pela data do período, não pela ordem alfabética do texto."""
+    store = MetricsStore(os.path.join(temp_dir, "metrics.parquet"))
+    store.replace_document("knri.pdf", metrics_store.normalize_records("knri.pdf", [
+        {"ticker": "KNRI11", "metric": "dividend_yield", "value": 0.80, "unit": "%", "period": "06/2025", "page": 1},
+        {"ticker": "KNRI11", "metric": "dividend_yield", "value": 0.70, "unit": "%", "period": "12/2024", "page": 2},
+        {"ticker": "KNRI11", "metric": "dividend_yield", "value": 0.75, "unit": "%", "period": "1T25", "page": 3},
+    ]))
+
+    overview = store.key_metrics_overview()
+    assert overview["value"].tolist() == [0.80]
+    assert overview["period"].tolist() == ["06/2025"]
+
+    answer = metrics_store.answer_numeric_question("Qual o dividend yield do KNRI11?", store=store)
+    lines = [line for line in answer.splitlines() if "KNRI11" in line]
+    assert ["12/2024" in lines[0], "1T25" in lines[1], "06/2025" in lines[2]] == [True, True, True]
+
+
+def test_tables_without_period_key_are_upgraded(temp_dir):
+    """Tabelas gravadas antes da chave de ordenação ganham a coluna ao serem lidas."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path = os.path.join(temp_dir, "metrics.parquet")
+    old_schema = pa.schema([field for field in metrics_store.SCHEMA if field.name != "period_key"])
+    rows = [
+        {"source_file": "a.pdf", "ticker": "KNRI11", "metric": "p_vp", "value": 0.9, "unit": "x", "period": "06/2025", "page": 1},
+        {"source_file": "a.pdf", "ticker": "KNRI11", "metric": "p_vp", "value": 1.1, "unit": "x", "period": "12/2024", "page": 2},
+    ]
+    pq.write_table(pa.Table.from_pylist(rows, schema=old_schema), path)
+
+    store = MetricsStore(path)
+    assert store.load()["period_key"].tolist() == [202506, 202412]
+    assert store.key_metrics_overview()["value"].tolist() == [0.9]
+    store.replace_document("b.pdf", [])  # regrava com o esquema novo
+    assert MetricsStore(path).load()["period_key"].tolist() == [202506, 202412]
+
+
+def test_extract_document_metrics_batches_pages(monkeypatch):
+    """A extração percorre todas as páginas em lotes e ignora lotes com falha."""
+    calls = []
+
+    def fake_extract(batch, metric_names, model_name=None):
+        calls.append([page for page, _ in batch])
+        if batch[0][0] == 1:
+            raise ValueError("JSON inválido")
+        return [{"ticker": "XPML11", "metric": "vacancia", "value": 3.1, "unit": "%", "page": batch[0][0]}]
+
+    monkeypatch.setattr(metrics_store, "METRICS_PAGES_PER_BATCH", 2)
+    monkeypatch.setattr(llm_services, "extract_structured_metrics", fake_extract)
+
+    pages = ["p1", "p2", "", "p4", "p5"]
+    records = metrics_store.extract_document_metrics("/tmp/rel.pdf", pages=pages)
+
+    assert sorted(calls) == [[1, 2], [4, 5]]
+    assert records == [{"source_file": "rel.pdf", "ticker": "XPML11", "metric": "vacancia",
+                        "value": 3.1, "unit": "%", "period": "", "period_key": 0, "page": 4}]
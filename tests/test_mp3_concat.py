@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Script para testar a concatenação de MP3 quadro a quadro
+"""
+import pytest
+
+import llm_services
+import mp3_concat
+from openai_stub_server import silent_mp3
+
+# MPEG-1 Layer III, 128 kbps, 44,1 kHz, joint stereo: 417 bytes por quadro
+HEADER_44K = b"\xff\xfb\x90\x44"
+# MPEG-1 Layer III, 128 kbps, 48 kHz, joint stereo: 384 bytes por quadro
+HEADER_48K = b"\xff\xfb\x94\x44"
+
+
+def _frame(header, fill, length):
+    return header + bytes([fill]) * (length - 4)
+
+
+def _xing_frame():
+    # Em MPEG-1 estéreo, a tag Xing fica após 4 bytes de cabeçalho + 32 de side info
+    frame = bytearray(_frame(HEADER_44K, 0, 417))
+    frame[36:40] = b"Xing"
+    return bytes(frame)
+
+
+def _id3v2_tag(payload_size=20):
+    size = bytes([0, 0, 0, payload_size])  # synchsafe
+    return b"ID3\x04\x00\x00" + size + b"\x00" * payload_size
+
+
+def _part(fills, id3=False, xing=False, id3v1=False):
+    data = _id3v2_tag() if id3 else b""
+    data += _xing_frame() if xing else b""
+    data += b"".join(_frame(HEADER_44K, fill, 417) for fill in fills)
+    data += b"TAG" + b"\x00" * 125 if id3v1 else b""
+    return data
+
+
+def test_frame_header_parsing():
+    """O tamanho do quadro é calculado a partir de bitrate, taxa e padding."""
+    header = mp3_concat.parse_frame_header(HEADER_44K)
+    assert (header.version, header.layer, header.bitrate, header.sample_rate) == ("1", 3, 128, 44100)
+    assert header.frame_length == 417
+    assert mp3_concat.parse_frame_header(b"\xff\xfb\x92\x44").frame_length == 418  # padding
+    assert mp3_concat.parse_frame_header(HEADER_48K).frame_length == 384
+    assert mp3_concat.parse_frame_header(b"\x00\x00\x00\x00") is None
+
+
+def test_concatenation_strips_tags_and_vbr_headers():
+    """ID3v2, Xing e ID3v1 das partes são descartados; só os quadros de áudio são copiados."""
+    parts = [
+        _part([1, 2], id3=True, xing=True),
+        _part([3], xing=True, id3v1=True),
+        _part([4, 5], id3=True),
+    ]
+    result = mp3_concat.concatenate_mp3_bytes(parts)
+    assert result == b"".join(_frame(HEADER_44K, fill, 417) for fill in [1, 2, 3, 4, 5])
+
+
+def test_truncated_trailing_frame_is_dropped():
+    """Um quadro incompleto no fim da parte não é copiado."""
+    part = _part([1]) + _frame(HEADER_44K, 2, 417)[:100]
+    assert mp3_concat.concatenate_mp3_bytes([part, _part([3])]) == _part([1, 3])
+
+
+def test_writes_to_file(tmp_path):
+    """A saída pode ser um arquivo, escrito quadro a quadro."""
+    output = tmp_path / "relatorio.mp3"
+    frames = mp3_concat.concatenate_mp3([_part([1]), _part([2, 3])], output)
+    assert frames == 3
+    assert output.read_bytes() == _part([1, 2, 3])
+
+
+def test_mismatched_parts_fall_back_to_pydub(monkeypatch):
+    """Partes com taxas de amostragem diferentes usam o caminho com pydub."""
+    other_rate = _frame(HEADER_48K, 1, 384)
+    with pytest.raises(mp3_concat.Mp3FormatError):
+        mp3_concat.concatenate_mp3_bytes([_part([1]), other_rate])
+
+    calls = []
+    monkeypatch.setattr(llm_services, "_concatenate_audio_with_pydub",
+                        lambda parts: calls.append(parts) or b"pydub")
+    assert llm_services.concatenate_audio_files([_part([1]), other_rate]) == b"pydub"
+    assert len(calls) == 1
+
+
+def test_concatenate_audio_files_uses_frame_copy(monkeypatch):
+    """Partes compatíveis (como as do TTS) são concatenadas sem pydub."""
+    monkeypatch.setattr(llm_services, "_concatenate_audio_with_pydub",
+                        lambda parts: pytest.fail("pydub não deveria ser usado"))
+    parts = [silent_mp3("a" * 40), silent_mp3("b" * 80)]
+    assert llm_services.concatenate_audio_files(parts) == b"".join(parts)
+    assert llm_services.concatenate_audio_files([]) is None
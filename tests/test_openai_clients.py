@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Script para testar a camada compartilhada de clientes da OpenAI
+"""
+import threading
+import time
+
+import httpx
+import openai
+
+from openai_clients import CircuitBreaker, ResilientTransport
+from openai_stub_server import StubOpenAIServer, StubSettings
+
+CHAT_URL = "https://api.openai.com/v1/chat/completions"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _scripted_transport(statuses, calls):
+    """Transporte que responde com os status informados, na ordem."""
+    def handler(request):
+        calls.append(request)
+        status = statuses[min(len(calls), len(statuses)) - 1]
+        return httpx.Response(status, json={"ok": status == 200}, headers={"retry-after": "0"})
+    return httpx.MockTransport(handler)
+
+
+def test_retries_transient_errors():
+    """Erros 429/5xx são repetidos e a resposta final informa as retentativas."""
+    calls, sleeps = [], []
+    transport = ResilientTransport(_scripted_transport([429, 503, 200], calls), sleep=sleeps.append)
+    response = httpx.Client(transport=transport).post(CHAT_URL, json={"model": "gpt-4o-mini"})
+
+    assert response.status_code == 200
+    assert response.extensions["openai_retries"] == 2
+    assert len(calls) == 3
+    assert sleeps == [0.0, 0.0]  # Retry-After: 0
+
+
+def test_gives_up_after_max_retries():
+    """Esgotadas as retentativas, a última resposta de erro é devolvida."""
+    calls = []
+    transport = ResilientTransport(_scripted_transport([500], calls), max_retries=2, sleep=lambda s: None)
+    response = httpx.Client(transport=transport).post(CHAT_URL, json={})
+    assert response.status_code == 500
+    assert len(calls) == 3
+
+
+def test_backoff_has_jitter_and_cap():
+    """Sem Retry-After, o backoff é aleatório e limitado por backoff_max."""
+    transport = ResilientTransport(httpx.MockTransport(lambda r: httpx.Response(200)),
+                                   backoff_base=1, backoff_max=3)
+    delays = [transport._backoff(5) for _ in range(50)]
+    assert all(0 <= d <= 3 for d in delays)
+    assert len(set(delays)) > 1
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """O circuito abre com muitas falhas, rejeita chamadas e fecha após um teste bem-sucedido."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(window_size=4, min_calls=4, failure_ratio=0.5, latency_threshold=10,
+                             cooldown=30, clock=clock)
+    for success in (True, False, True, False):
+        breaker.record(success, 0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    clock.now = 31
+    assert breaker.allow_request()  # chamada de teste
+    assert not breaker.allow_request()  # só uma por vez
+    breaker.record(True, 0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_opens_on_latency():
+    """Latência mediana acima do limite também abre o circuito."""
+    breaker = CircuitBreaker(window_size=4, min_calls=4, latency_threshold=1.0)
+    for _ in range(4):
+        breaker.record(True, 2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_open_circuit_fails_fast():
+    """Com o circuito aberto, o upstream não é chamado e o cliente recebe 503."""
+    calls = []
+    transport = ResilientTransport(
+        _scripted_transport([500], calls),
+        max_retries=0,
+        breaker_factory=lambda: CircuitBreaker(window_size=2, min_calls=2, cooldown=60),
+    )
+    client = httpx.Client(transport=transport)
+    client.post(CHAT_URL, json={})
+    client.post(CHAT_URL, json={})
+    response = client.post(CHAT_URL, json={})
+
+    assert response.status_code == 503
+    assert "Circuito aberto" in response.json()["error"]["message"]
+    assert len(calls) == 2
+
+
+def test_retries_stop_when_circuit_opens():
+    """Quando o circuito abre no meio das retentativas, a chamada para de insistir."""
+    calls = []
+    transport = ResilientTransport(
+        _scripted_transport([500], calls),
+        max_retries=5,
+        sleep=lambda s: None,
+        breaker_factory=lambda: CircuitBreaker(window_size=2, min_calls=2, cooldown=60),
+    )
+    response = httpx.Client(transport=transport).post(CHAT_URL, json={})
+
+    assert response.status_code == 500
+    assert len(calls) == 2
+
+
+def test_open_circuit_rejects_without_waiting_for_queue():
+    """Com o circuito aberto e a fila cheia, a rejeição é imediata (sem esperar a vaga)."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(window_size=2, min_calls=2, cooldown=30, clock=clock)
+    transport = ResilientTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+        concurrency={"chat": 1},
+        queue_timeout=5,
+        breaker_factory=lambda: breaker,
+    )
+    breaker.record(False, 0.1)
+    breaker.record(False, 0.1)
+
+    transport._semaphores["chat"].acquire()  # fila cheia
+    start = time.monotonic()
+    response = httpx.Client(transport=transport).post(CHAT_URL, json={})
+    elapsed = time.monotonic() - start
+    transport._semaphores["chat"].release()
+
+    assert response.status_code == 503
+    assert "Circuito aberto" in response.json()["error"]["message"]
+    assert elapsed < 1
+
+
+def test_probe_is_released_when_queue_is_full():
+    """Sem vaga na fila, a chamada de teste do meio-aberto não fica presa e o circuito volta a fechar."""
+    clock = FakeClock()
+    breaker = CircuitBreaker(window_size=2, min_calls=2, cooldown=30, clock=clock)
+    transport = ResilientTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, json={})),
+        concurrency={"chat": 1},
+        queue_timeout=0.05,
+        breaker_factory=lambda: breaker,
+    )
+    client = httpx.Client(transport=transport)
+    breaker.record(False, 0.1)
+    breaker.record(False, 0.1)
+    clock.now = 31  # período de espera encerrado: a próxima chamada seria a de teste
+
+    transport._semaphores["chat"].acquire()  # fila cheia
+    response = client.post(CHAT_URL, json={})
+    transport._semaphores["chat"].release()
+
+    assert response.status_code == 503
+    assert "fila cheia" in response.json()["error"]["message"]
+    assert client.post(CHAT_URL, json={}).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_probe_is_released_on_unexpected_error():
+    """Uma exceção fora das tratadas também libera a chamada de teste."""
+    clock = FakeClock()
+    outcomes = [httpx.RemoteProtocolError("conexão encerrada"), httpx.Response(200, json={})]
+
+    def handler(request):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    breaker = CircuitBreaker(window_size=2, min_calls=2, cooldown=30, clock=clock)
+    transport = ResilientTransport(httpx.MockTransport(handler), breaker_factory=lambda: breaker)
+    client = httpx.Client(transport=transport)
+    breaker.record(False, 0.1)
+    breaker.record(False, 0.1)
+    clock.now = 31
+
+    try:
+        client.post(CHAT_URL, json={})
+    except httpx.RemoteProtocolError:
+        pass
+    assert client.post(CHAT_URL, json={}).status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_endpoint_concurrency_limit():
+    """O limite por endpoint segura chamadas excedentes e rejeita após a espera máxima."""
+    release = threading.Event()
+
+    def handler(request):
+        release.wait(2)
+        return httpx.Response(200, json={})
+
+    transport = ResilientTransport(httpx.MockTransport(handler), concurrency={"chat": 1}, queue_timeout=0.1)
+    client = httpx.Client(transport=transport)
+    first = threading.Thread(target=client.post, args=(CHAT_URL,), kwargs={"json": {}})
+    first.start()
+    time.sleep(0.05)
+
+    response = client.post(CHAT_URL, json={})
+    release.set()
+    first.join()
+    assert response.status_code == 503
+    assert client.post(CHAT_URL, json={}).status_code == 200
+
+
+def test_sdk_streaming_through_transport():
+    """O SDK da OpenAI funciona sobre o transporte (inclusive streaming) e libera as vagas."""
+    with StubOpenAIServer(StubSettings(completion_tokens=5)) as server:
+        transport = ResilientTransport(concurrency={"chat": 1}, queue_timeout=1)
+        client = openai.OpenAI(base_url=server.base_url, api_key="test-key", max_retries=0,
+                               http_client=httpx.Client(transport=transport))
+        for _ in range(3):
+            stream = client.chat.completions.create(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Olá"}], stream=True
+            )
+            assert "".join(c.choices[0].delta.content or "" for c in stream if c.choices)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script para testar o servidor simulado compatível com a API da OpenAI
+"""
+import time
+
+import openai
+import pytest
+from langchain_openai import OpenAIEmbeddings
+
+import llm_services
+import openai_clients
+from openai_stub_server import StubOpenAIServer, StubSettings, MP3_FRAME
+
+
+@pytest.fixture
+def stub_server():
+    with StubOpenAIServer(StubSettings(completion_tokens=12)) as server:
+        yield server
+
+
+def _client(server, **kwargs):
+    return openai.OpenAI(base_url=server.base_url, api_key="test-key", **kwargs)
+
+
+def test_chat_completion_is_deterministic(stub_server):
+    """Prompts iguais geram a mesma resposta, com contagem de tokens."""
+    client = _client(stub_server)
+    messages = [{"role": "user", "content": "Resuma o relatório do KNRI11"}]
+    first = client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+    second = client.chat.completions.create(model="gpt-4o-mini", messages=messages)
+
+    assert first.choices[0].message.content == second.choices[0].message.content
+    assert first.usage.completion_tokens == 12
+    assert first.usage.prompt_tokens > 0
+
+
+def test_chat_completion_streaming(stub_server):
+    """O streaming entrega os tokens em chunks SSE e o uso ao final."""
+    client = _client(stub_server)
+    stream = client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[{"role": "user", "content": "Olá"}],
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+    chunks = list(stream)
+    text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    assert len(text.split()) == 12
+    assert chunks[-1].usage.completion_tokens == 12
+
+
+def test_embeddings_are_deterministic(stub_server):
+    """Embeddings são unitários, estáveis e distintos para textos diferentes."""
+    client = _client(stub_server)
+    response = client.embeddings.create(model="text-embedding-3-small", input=["a", "b", "a"])
+    vectors = [item.embedding for item in response.data]
+
+    assert len(vectors[0]) == 1536
+    assert vectors[0] == vectors[2]
+    assert vectors[0] != vectors[1]
+    assert abs(sum(v * v for v in vectors[0]) - 1) < 1e-6
+
+
+def test_speech_returns_mp3(stub_server):
+    """O endpoint de TTS devolve frames MP3 proporcionais ao texto."""
+    audio = _client(stub_server).audio.speech.create(model="tts-1", voice="alloy", input="x" * 150).content
+    assert audio.startswith(MP3_FRAME[:4])
+    assert len(audio) % len(MP3_FRAME) == 0
+
+
+def test_rate_limit_injection():
+    """Com rate_limit_rate=1 toda chamada recebe 429 com Retry-After."""
+    with StubOpenAIServer(StubSettings(rate_limit_rate=1.0)) as server:
+        with pytest.raises(openai.RateLimitError) as error:
+            _client(server, max_retries=0).embeddings.create(model="text-embedding-3-small", input="a")
+        assert error.value.response.headers["retry-after"] == "1"
+        assert server.stats.rate_limited == 1
+
+
+def test_stats_are_recorded_before_the_response(stub_server, monkeypatch):
+    """Cada requisição já está nas estatísticas quando o cliente termina de ler a resposta."""
+    record = stub_server.stats.record
+
+    def slow_record(path, status):
+        time.sleep(0.05)
+        record(path, status)
+
+    monkeypatch.setattr(stub_server.stats, "record", slow_record)
+    client = _client(stub_server)
+    client.embeddings.create(model="text-embedding-3-small", input="a")
+    assert stub_server.stats.requests == {"/v1/embeddings": 1}
+    list(client.chat.completions.create(model="gpt-4o-mini", messages=[{"role": "user", "content": "Olá"}],
+                                        stream=True))
+    assert stub_server.stats.requests["/v1/chat/completions"] == 1
+    client.audio.speech.create(model="tts-1", voice="alloy", input="Olá")
+    assert stub_server.stats.requests["/v1/audio/speech"] == 1
+
+
+def test_latency_and_throughput():
+    """Latência fixa e vazão de tokens controlam o tempo de resposta."""
+    settings = StubSettings(latency_mean=0.1, tokens_per_second=100, completion_tokens=10)
+    with StubOpenAIServer(settings) as server:
+        start = time.time()
+        _client(server).chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Olá"}]
+        )
+        assert time.time() - start >= 0.2
+
+
+def test_app_clients_point_to_stub(stub_server, monkeypatch):
+    """Os clientes da aplicação funcionam de ponta a ponta contra o servidor simulado."""
+    monkeypatch.setattr(openai_clients, "OPENAI_BASE_URL", stub_server.base_url)
+    answer = llm_services.build_chat_model("gpt-4o-mini").invoke("Qual o dividend yield?")
+    assert len(answer.content.split()) == 12
+
+    embeddings = OpenAIEmbeddings(
+        model="text-embedding-3-small", base_url=stub_server.base_url, check_embedding_ctx_length=False
+    )
+    assert len(embeddings.embed_query("KNRI11")) == 1536
+    assert stub_server.stats.requests == {"/v1/chat/completions": 1, "/v1/embeddings": 1}
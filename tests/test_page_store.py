@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Script para testar o índice de páginas dos relatórios
+"""
+import os
+
+import file_handler
+from page_store import PageStore
+
+PAGES = [
+    "Receita da Petrobras cresceu no trimestre",
+    "Margem EBITDA estável",
+    "Dívida líquida caiu; receita recorrente subiu",
+]
+
+
+def _store(temp_dir):
+    return PageStore(
+        db_path=os.path.join(temp_dir, "pages.sqlite3"),
+        export_dir=os.path.join(temp_dir, "exports"),
+    )
+
+
+def _report(temp_dir, content=b"%PDF-fake"):
+    path = os.path.join(temp_dir, "relatorio.pdf")
+    with open(path, "wb") as f:
+        f.write(content)
+    return path
+
+
+def _fake_extraction(monkeypatch, pages=PAGES):
+    calls = []
+
+    def fake_get_pdf_pages(path):
+        calls.append(path)
+        return list(pages)
+
+    monkeypatch.setattr(file_handler, "get_pdf_pages", fake_get_pdf_pages)
+    return calls
+
+
+def test_index_computes_stats_once(temp_dir, monkeypatch):
+    """As estatísticas são calculadas na indexação e o PDF não é extraído de novo."""
+    calls = _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    report = _report(temp_dir)
+
+    assert store.document(report) is None
+    info = store.index(report)
+    assert info["page_count"] == 3
+    assert info["word_count"] == sum(len(page.split()) for page in PAGES)
+    assert info["char_count"] == sum(len(page) for page in PAGES)
+    assert info["file_name"] == "relatorio.pdf"
+
+    assert store.index(report) == info
+    assert store.document(report) == info
+    assert len(calls) == 1
+
+
+def test_new_file_version_is_reindexed(temp_dir, monkeypatch):
+    """Um arquivo com outro conteúdo é uma nova versão e é indexado de novo."""
+    calls = _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    store.index(_report(temp_dir, b"versao-1"))
+    store.index(_report(temp_dir, b"versao-2"))
+
+    assert len(calls) == 2
+
+
+def test_pages_returns_only_requested_range(temp_dir, monkeypatch):
+    """Só as páginas pedidas são lidas do índice."""
+    _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    report = _report(temp_dir)
+    store.index(report)
+
+    assert store.pages(report, 2, 1) == [(2, PAGES[1])]
+    assert [number for number, _ in store.pages(report, 2, 5)] == [2, 3]
+
+
+def test_search_ignores_case_and_accents(temp_dir, monkeypatch):
+    """A busca no documento lista as páginas encontradas, sem diferenciar maiúsculas nem acentos."""
+    _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    report = _report(temp_dir)
+    store.index(report)
+
+    total, matches = store.search(report, "RECEITA", limit=1)
+    assert total == 2
+    assert matches == [{"page_number": 1, "snippet": "**Receita** da Petrobras cresceu no trimestre"}]
+
+    total, matches = store.search(report, "divida liquida")
+    assert [match["page_number"] for match in matches] == [3]
+    assert "**Dívida**" in matches[0]["snippet"]
+    assert store.search(report, "inexistente") == (0, [])
+    assert store.search(report, " - ") == (0, [])
+
+
+def test_phrase_query(temp_dir, monkeypatch):
+    """Termos entre aspas são buscados como frase; termos soltos só precisam estar na mesma página."""
+    _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    report = _report(temp_dir)
+    store.index(report)
+
+    assert store.search(report, "receita subiu")[0] == 1
+    assert store.search(report, '"receita subiu"')[0] == 0
+    assert store.search(report, '"receita recorrente"')[0] == 1
+
+
+def test_search_library_across_reports(temp_dir, monkeypatch):
+    """A busca na biblioteca percorre todos os relatórios e identifica arquivo e página."""
+    pages_by_name = {"a.pdf": ["Lucro do Itaú", "Receita"], "b.pdf": ["Receita do Itaú e lucro do Itaú"]}
+    calls = []
+
+    def fake_get_pdf_pages(path):
+        calls.append(path)
+        return pages_by_name[os.path.basename(path)]
+
+    monkeypatch.setattr(file_handler, "get_pdf_pages", fake_get_pdf_pages)
+    store = _store(temp_dir)
+    for name in pages_by_name:
+        path = os.path.join(temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(name.encode())
+        store.index(path)
+
+    total, hits = store.search_library("itau")
+    assert total == 2
+    assert [hit["file_name"] for hit in hits] == ["b.pdf", "a.pdf"]  # mais ocorrências, mais relevante
+    assert hits[1]["page_number"] == 1
+    assert store.search_library("itau", limit=1)[0] == 2
+    assert store.search_library("dividendos") == (0, [])
+    assert store.documents() == {"a.pdf", "b.pdf"}
+    assert len(calls) == 2
+
+
+def test_reindex_replaces_previous_version(temp_dir, monkeypatch):
+    """Uma nova versão do arquivo substitui a anterior no índice e na busca."""
+    pages = ["versão antiga"]
+    monkeypatch.setattr(file_handler, "get_pdf_pages", lambda path: list(pages))
+    store = _store(temp_dir)
+    store.index(_report(temp_dir, b"versao-1"))
+    pages[:] = ["versão nova"]
+    store.index(_report(temp_dir, b"versao-2"))
+
+    assert store.search_library("antiga") == (0, [])
+    assert store.search_library("nova")[0] == 1
+    assert store.documents() == {"relatorio.pdf"}
+
+
+def test_existing_pages_are_added_to_search(temp_dir, monkeypatch):
+    """Páginas guardadas antes do índice de texto completo entram na busca ao abrir o banco."""
+    _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    report = _report(temp_dir)
+    store.index(report)
+    conn = store._get_connection()
+    conn.execute("DROP TABLE pages_fts")
+    conn.commit()
+
+    assert _store(temp_dir).search(report, "margem")[0] == 1
+
+
+def test_full_text_and_export(temp_dir, monkeypatch):
+    """O texto completo e o .txt exportado juntam as páginas com quebras de linha."""
+    _fake_extraction(monkeypatch)
+    store = _store(temp_dir)
+    report = _report(temp_dir)
+
+    assert store.full_text(report) == "\n".join(PAGES)
+    export_path = store.export_text(report)
+    with open(export_path, encoding="utf-8") as f:
+        assert f.read() == "\n".join(PAGES)
+    assert store.export_text(report) == export_path
+    assert [name for name in os.listdir(store.export_dir) if name.endswith(".tmp")] == []
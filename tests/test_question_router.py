@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Script para testar o roteador de perguntas do chat
+"""
+import re
+from unittest.mock import MagicMock
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+import llm_services
+import question_router
+from question_router import QuestionRouter, ROUTE_AGENT, ROUTE_REPORTS
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Embeddings de contagem de palavras: perguntas com palavras em comum ficam próximas."""
+
+    def __init__(self):
+        self.vocabulary = {}
+
+    def _embed(self, text):
+        vector = np.zeros(512)
+        for word in re.findall(r"\w+", text.lower()):
+            index = self.vocabulary.setdefault(word, len(self.vocabulary) % 512)
+            vector[index] += 1
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def test_rules_route_web_and_multi_step_to_agent():
+    """Perguntas que exigem a web ou várias etapas vão para o agente."""
+    router = QuestionRouter()
+    assert router.classify("Qual a cotação do KNRI11 hoje?") == ROUTE_AGENT
+    assert router.classify("Quais as últimas notícias do setor?") == ROUTE_AGENT
+    assert router.classify("Calcule o retorno e depois compare com o CDI") == ROUTE_AGENT
+
+
+def test_rules_route_report_questions_to_fast_path():
+    """Perguntas que citam os relatórios, tickers ou métricas seguem o caminho rápido."""
+    router = QuestionRouter()
+    assert router.classify("O que diz o relatório sobre a gestão?") == ROUTE_REPORTS
+    assert router.classify("Qual o dividend yield do HGLG11?") == ROUTE_REPORTS
+    assert router.classify("Qual a melhor corretora?") == ROUTE_AGENT
+
+
+def test_similarity_classification():
+    """Sem regras decisivas, a rota vem dos exemplos mais próximos."""
+    embeddings = BagOfWordsEmbeddings()
+    router = QuestionRouter(embeddings)
+    assert router.classify("Quais os riscos citados pela gestão do fundo?") == ROUTE_REPORTS
+    assert router.classify("Oi, tudo bem com você?") == ROUTE_AGENT
+
+
+def test_exemplar_embeddings_computed_once():
+    """Os embeddings dos exemplos são calculados uma única vez por roteador."""
+    embeddings = MagicMock(wraps=BagOfWordsEmbeddings())
+    router = QuestionRouter(embeddings)
+    router.classify("Qual a vacância do fundo?")
+    router.classify("Quais imóveis o fundo possui?")
+    assert embeddings.embed_documents.call_count == len(question_router.EXEMPLARS)
+
+
+def test_fast_path_skips_agent(monkeypatch):
+    """No caminho rápido há uma única chamada de resposta e o agente não é criado."""
+    answer_from_reports = MagicMock(return_value="Vacância de 5%")
+    setup_agent = MagicMock()
+    monkeypatch.setattr(llm_services, "answer_from_reports", answer_from_reports)
+    monkeypatch.setattr(llm_services, "setup_agent", setup_agent)
+    monkeypatch.setattr(question_router.metrics_store, "answer_numeric_question", lambda q: None)
+
+    vector_manager = MagicMock()
+    vector_manager.embedding_function = BagOfWordsEmbeddings()
+    answer, route = question_router.answer_question("Qual a vacância física do fundo?", vector_manager)
+
+    assert (answer, route) == ("Vacância de 5%", ROUTE_REPORTS)
+    answer_from_reports.assert_called_once()
+    setup_agent.assert_not_called()
+
+
+def test_agent_path(monkeypatch):
+    """Perguntas que exigem a web continuam passando pelo agente."""
+    agent = MagicMock()
+    agent.invoke.return_value = {"output": "Selic em 10%"}
+    monkeypatch.setattr(llm_services, "setup_agent", MagicMock(return_value=agent))
+
+    vector_manager = MagicMock()
+    vector_manager.embedding_function = BagOfWordsEmbeddings()
+    answer, route = question_router.answer_question("Qual a Selic hoje?", vector_manager)
+
+    assert (answer, route) == ("Selic em 10%", ROUTE_AGENT)
+
+
+def test_stream_answer_records_turn(monkeypatch):
+    """No streaming pela rota de relatórios as partes chegam em ordem e o turno vai para a memória."""
+    monkeypatch.setattr(llm_services, "stream_answer_from_reports", lambda *args, **kwargs: iter(["Vacância ", "de 5%"]))
+    monkeypatch.setattr(question_router.metrics_store, "answer_numeric_question", lambda q: None)
+    memory = MagicMock()
+    memory.format_history.return_value = ""
+
+    deltas = list(question_router.stream_answer("Qual a vacância?", MagicMock(), ROUTE_REPORTS, memory=memory))
+
+    assert deltas == ["Vacância ", "de 5%"]
+    memory.add_turn.assert_called_once_with("Qual a vacância?", "Vacância de 5%")
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Script para testar as tarefas da aplicação executadas em segundo plano
+"""
+import blob_store
+import llm_services
+import report_jobs
+import result_store
+import telemetry
+
+
+class FakeJob:
+    session_id = "sessao"
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, partial, force=False):
+        self.published.append(partial)
+
+
+class FakeBlobStore:
+    def __init__(self):
+        self.blobs = {}
+
+    def put(self, session_id, data):
+        handle = f"blob-{len(self.blobs)}"
+        self.blobs[handle] = data
+        return handle
+
+    def delete(self, session_id, handle):
+        self.blobs.pop(handle, None)
+
+
+def test_summary_audio_attributes_generation_to_summary(monkeypatch):
+    """No áudio do resumo, a geração do texto conta como summary e a síntese como tts."""
+    features = {"summary": [], "tts": []}
+
+    def fake_stream(file_path, model_name=None):
+        for i in range(3):
+            features["summary"].append(telemetry.current_feature())
+            yield f"Frase {i} do resumo.\n"
+
+    def fake_tts(text):
+        features["tts"].append(telemetry.current_feature())
+        return text.encode()
+
+    monkeypatch.setattr(result_store, "stream_cached_report_summary", fake_stream)
+    monkeypatch.setattr(llm_services, "text_to_speech", fake_tts)
+    monkeypatch.setattr(llm_services, "concatenate_audio_files", b"".join)
+    monkeypatch.setattr(report_jobs, "SUMMARY_AUDIO_PIPELINED", True)
+
+    store = FakeBlobStore()
+    monkeypatch.setattr(blob_store, "get_blob_store", lambda: store)
+    result = report_jobs.run_summary_audio(FakeJob(), "relatorio.pdf", "gpt-4o-mini")
+
+    # Os trechos continuam guardados (expiram pelo TTL) para não interromper um trecho tocando
+    assert result["segments"] and all(handle in store.blobs for handle in result["segments"])
+    assert result["handle"] in store.blobs
+    assert result["summary"] == "".join(f"Frase {i} do resumo.\n" for i in range(3))
+    assert set(features["summary"]) == {"summary"}
+    assert features["tts"] and set(features["tts"]) == {"tts"}
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Script para testar o armazenamento persistente de resumos e insights
+"""
+import os
+
+import file_handler
+import result_store
+from result_store import ResultStore
+
+
+def test_put_and_get_roundtrip(temp_dir):
+    """Resultados de texto e dicionário voltam iguais após comprimidos."""
+    store = ResultStore(os.path.join(temp_dir, "results.sqlite3"))
+    store.put("insights", "v1", "gpt-4o-mini", "1", {"pergunta": "resposta ção"})
+    store.put("market_summary", "v1", "gpt-4o-mini", "1", "Resumo do mercado")
+
+    assert store.get("insights", "v1", "gpt-4o-mini", "1") == {"pergunta": "resposta ção"}
+    assert store.get("market_summary", "v1", "gpt-4o-mini", "1") == "Resumo do mercado"
+    assert store.get("market_summary", "v2", "gpt-4o-mini", "1") is None
+    assert store.get("market_summary", "v1", "gpt-4o", "1") is None
+    assert store.get("market_summary", "v1", "gpt-4o-mini", "2") is None
+
+    raw = store._get_connection().execute("SELECT value FROM results LIMIT 1").fetchone()[0]
+    assert raw[:4] == b"\x28\xb5\x2f\xfd"  # magic number do zstd
+
+
+def test_get_or_compute_calls_once(temp_dir):
+    """O cálculo só é executado quando não há resultado armazenado."""
+    store = ResultStore(os.path.join(temp_dir, "results.sqlite3"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "resultado"
+
+    assert store.get_or_compute("summary", "hash", "gpt-4o-mini", "1", compute) == "resultado"
+    assert store.get_or_compute("summary", "hash", "gpt-4o-mini", "1", compute) == "resultado"
+    assert len(calls) == 1
+
+    reopened = ResultStore(os.path.join(temp_dir, "results.sqlite3"))
+    assert reopened.get("summary", "hash", "gpt-4o-mini", "1") == "resultado"
+
+
+def test_errors_are_not_stored(temp_dir):
+    """Resultados rejeitados por should_store são recalculados na próxima chamada."""
+    store = ResultStore(os.path.join(temp_dir, "results.sqlite3"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "Erro ao gerar resumo do mercado: timeout"
+
+    for _ in range(2):
+        store.get_or_compute("market_summary", "v1", "gpt-4o-mini", "1", compute,
+                             should_store=result_store._is_valid_text)
+    assert len(calls) == 2
+
+
+def test_invalidate(temp_dir):
+    """invalidate remove apenas os resultados filtrados."""
+    store = ResultStore(os.path.join(temp_dir, "results.sqlite3"))
+    store.put("summary", "a", "m", "1", "x")
+    store.put("summary", "b", "m", "1", "y")
+    store.put("insights", "a", "m", "1", {})
+
+    assert store.invalidate(version_key="a") == 2
+    assert store.get("summary", "b", "m", "1") == "y"
+
+
+def test_corpus_version_changes_with_files(temp_dir, monkeypatch):
+    """A versão do corpus muda quando um relatório é adicionado."""
+    monkeypatch.setattr(file_handler, "REPORTS_PROCESSED_DIR", temp_dir)
+    with open(os.path.join(temp_dir, "a.pdf"), "wb") as f:
+        f.write(b"%PDF-a")
+    version_a = file_handler.get_corpus_version()
+    assert version_a == file_handler.get_corpus_version()
+
+    with open(os.path.join(temp_dir, "b.pdf"), "wb") as f:
+        f.write(b"%PDF-b")
+    assert file_handler.get_corpus_version() != version_a
+
+
+def test_streamed_summary_is_stored(temp_dir, monkeypatch):
+    """O resumo em streaming é armazenado ao final e depois entregue de uma vez."""
+    monkeypatch.setattr(result_store, "_store", ResultStore(os.path.join(temp_dir, "results.sqlite3")))
+    monkeypatch.setattr(file_handler, "get_file_hash", lambda path: "hash-do-pdf")
+    calls = []
+
+    def fake_stream(file_path, model_name=None, length=None):
+        calls.append(file_path)
+        yield from ["Resumo ", "em ", "partes."]
+
+    monkeypatch.setattr(result_store.summarizer, "stream_report_summary", fake_stream)
+
+    first = list(result_store.stream_cached_report_summary("relatorio.pdf", model_name="gpt-4o-mini"))
+    second = list(result_store.stream_cached_report_summary("relatorio.pdf", model_name="gpt-4o-mini"))
+
+    assert first == ["Resumo ", "em ", "partes."]
+    assert second == ["Resumo em partes."]
+    assert len(calls) == 1
+    assert result_store.cached_report_summary("relatorio.pdf", model_name="gpt-4o-mini") == "Resumo em partes."
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Script para testar o registro de serviços compartilhados (criação única, aquecimento e saúde)
+"""
+import os
+import threading
+
+import services
+from services import ServiceRegistry, SharedGeneration
+
+
+class FakeVectorManager:
+    def __init__(self, count=3):
+        self.count = count
+        self.count_calls = 0
+        self.queries = []
+
+    def count_documents(self):
+        self.count_calls += 1
+        return self.count
+
+    def search_similarity(self, query, k=4):
+        self.queries.append(query)
+        return []
+
+
+def test_services_are_created_once():
+    """Chamadas repetidas (e concorrentes) reaproveitam a mesma instância."""
+    registry = ServiceRegistry()
+    created = []
+    registry.register("vector_store", lambda: created.append(1) or object())
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("vector_store"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_invalidate_recreates_on_next_get():
+    """Após invalidar, a próxima chamada cria uma nova instância; a antiga segue utilizável."""
+    registry = ServiceRegistry()
+    registry.register("vector_store", FakeVectorManager)
+    old = registry.get("vector_store")
+    registry.invalidate("vector_store")
+    new = registry.get("vector_store")
+    assert new is not old
+    assert old.count_documents() == 3
+
+
+def test_derived_values_expire_after_ingestion():
+    """Valores derivados dos documentos são reaproveitados até a próxima ingestão."""
+    registry = ServiceRegistry()
+    manager = FakeVectorManager()
+    compute = lambda: manager.count_documents()
+
+    assert registry.derived("document_count", compute) == 3
+    assert registry.derived("document_count", compute) == 3
+    assert manager.count_calls == 1
+
+    manager.count = 5
+    registry.documents_changed()
+    assert registry.derived("document_count", compute) == 5
+    assert manager.count_calls == 2
+
+
+def test_ingestion_in_another_process_expires_derived_values(temp_dir):
+    """Com a versão em SQLite, a ingestão feita por outro processo (ex.: API) expira os valores deste (app)."""
+    db_path = os.path.join(temp_dir, "services.sqlite3")
+    app_registry = ServiceRegistry(shared_generation=SharedGeneration(db_path))
+    api_registry = ServiceRegistry(shared_generation=SharedGeneration(db_path))
+    manager = FakeVectorManager()
+    compute = lambda: manager.count_documents()
+
+    assert app_registry.derived("document_count", compute) == 3
+    assert app_registry.derived("document_count", compute) == 3
+    assert manager.count_calls == 1
+
+    manager.count = 7
+    api_registry.documents_changed()
+    assert app_registry.generation == api_registry.generation == 1
+    assert app_registry.derived("document_count", compute) == 7
+    assert manager.count_calls == 2
+
+
+def test_health_reports_failures():
+    """A verificação de saúde informa falhas sem levantar exceção."""
+    registry = ServiceRegistry()
+    registry.register("ok", object, check=lambda instance: "pronto")
+
+    def failing_check(instance):
+        raise RuntimeError("indisponível")
+
+    registry.register("quebrado", object, check=failing_check)
+    registry.register("sem_check", object)
+
+    health = registry.health()
+    assert health["ok"]["ok"] and health["ok"]["detail"] == "pronto"
+    assert not health["quebrado"]["ok"] and "indisponível" in health["quebrado"]["detail"]
+    assert "sem_check" not in health
+
+
+def test_warm_up_loads_index_with_test_query(monkeypatch):
+    """O aquecimento cria os serviços e faz uma consulta de teste no vector store."""
+    registry = ServiceRegistry()
+    manager = FakeVectorManager()
+    for name in ("embeddings", "http_client", "result_store", "llm_cache", "audio_cache", "blob_store", "jobs"):
+        registry.register(name, object)
+    registry.register("vector_store", lambda: manager)
+    monkeypatch.setattr(services, "_registry", registry)
+    monkeypatch.setattr(services, "ROUTER_ENABLED", False)
+
+    timings = services.warm_up(query="dividend yield")
+
+    assert set(timings) == {"serviços", "documentos", "consulta de teste"}
+    assert manager.queries == ["dividend yield"]
+    assert services.get_vector_manager() is manager
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Script para testar o identificador da sessão do navegador
+"""
+import os
+
+from streamlit.testing.v1 import AppTest
+
+import jobs
+from ui import session
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def test_resolve_session_id():
+    """O identificador do cookie é reaproveitado; ausente ou malformado, um novo token aleatório é criado."""
+    existing = "a" * 43
+    assert session.resolve_session_id(existing) == existing
+
+    created = session.resolve_session_id(None)
+    assert len(created) >= 43
+    assert created != session.resolve_session_id(None)
+    for invalid in ["", "abc", "../../etc", "x" * 200, "a" * 40 + ";b"]:
+        assert session.resolve_session_id(invalid) != invalid
+
+
+def test_session_id_is_not_taken_from_url(temp_dir, monkeypatch):
+    """Um ?sid= na URL (links antigos ou compartilhados) não é adotado e sai da URL."""
+    monkeypatch.setattr("ui.start_services_warm_up", lambda: None)
+    # O app nunca toca o banco de tarefas real (nem recupera as tarefas dele)
+    monkeypatch.setattr(jobs, "JOBS_DB_PATH", os.path.join(temp_dir, "jobs.sqlite3"))
+    monkeypatch.setattr(jobs, "_job_runner", None)
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.query_params["sid"] = "sessao-de-outra-pessoa"
+    app.session_state["active_tab"] = "viewer"
+    app.run()
+
+    assert not app.exception
+    session_id = app.session_state["session_id"]
+    assert session_id != "sessao-de-outra-pessoa"
+    assert "sid" not in app.query_params
+
+    app.run()
+    assert app.session_state["session_id"] == session_id
+    assert jobs._job_runner is None
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Script para testar o resumo map-reduce de relatórios longos
+"""
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import llm_services
+import summarizer
+
+
+class FakeChain:
+    """Cadeia falsa que registra as chamadas e devolve um resumo curto."""
+
+    def __init__(self, label, calls):
+        self.label = label
+        self.calls = calls
+        self.lock = threading.Lock()
+
+    def invoke(self, inputs):
+        with self.lock:
+            self.calls.append((self.label, inputs["text_to_summarize"]))
+        return SimpleNamespace(content=f"[{self.label}] resumo de {len(inputs['text_to_summarize'])} chars")
+
+    def stream(self, inputs):
+        content = self.invoke(inputs).content
+        for start in range(0, len(content), 5):
+            yield SimpleNamespace(content=content[start:start + 5])
+
+
+@pytest.fixture
+def fake_chains(monkeypatch, temp_dir):
+    calls = []
+    monkeypatch.setattr(summarizer, "SUMMARY_CACHE_DIR", temp_dir)
+    monkeypatch.setattr(summarizer, "SUMMARY_DIRECT_MAX_TOKENS", 200)
+    monkeypatch.setattr(summarizer, "SUMMARY_SECTION_TOKENS", 300)
+    monkeypatch.setattr(summarizer, "SUMMARY_SECTION_OVERLAP_TOKENS", 0)
+    monkeypatch.setattr(summarizer, "SUMMARY_REDUCE_MAX_TOKENS", 40)
+    monkeypatch.setattr(summarizer, "count_tokens", lambda text: len(text) // 4 + 1)
+    monkeypatch.setattr(llm_services, "get_summarizer_chain",
+                        lambda model_name=None, length=None: FakeChain(f"direto:{model_name}", calls))
+    monkeypatch.setattr(llm_services, "get_section_summarizer_chain",
+                        lambda model_name=None: FakeChain("secao", calls))
+    monkeypatch.setattr(llm_services, "get_reduce_summarizer_chain",
+                        lambda model_name=None, length=None: FakeChain(f"reduce:{model_name}:{length}", calls))
+    return calls
+
+
+def _long_text(paragraphs=12):
+    return "\n\n".join(f"Parágrafo {i}: " + "KNRI11 rendeu 0,8% no mês. " * 20 for i in range(paragraphs))
+
+
+def test_short_text_uses_single_call(fake_chains):
+    """Textos curtos são resumidos em uma única chamada."""
+    result = summarizer.summarize_text("Texto curto do relatório.", model_name="gpt-4o")
+    assert result.startswith("[direto:gpt-4o]")
+    assert len(fake_chains) == 1
+
+
+def test_long_text_map_reduce(fake_chains):
+    """Textos longos passam por map em seções e reduce final com o modelo escolhido."""
+    sections = summarizer.split_into_sections(_long_text())
+    assert len(sections) > 1
+
+    result = summarizer.summarize_text(_long_text(), model_name="gpt-4o", length="curto")
+
+    labels = [label for label, _ in fake_chains]
+    assert labels.count("secao") >= len(sections)
+    assert labels[-1] == "reduce:gpt-4o:curto"
+    assert result.startswith("[reduce:gpt-4o:curto]")
+
+
+def test_section_summaries_are_cached(fake_chains):
+    """Trocar modelo ou tamanho reexecuta apenas o reduce."""
+    summarizer.summarize_text(_long_text(), model_name="gpt-4o-mini")
+    map_calls = sum(1 for label, _ in fake_chains if label == "secao")
+    assert map_calls > 0
+
+    fake_chains.clear()
+    summarizer.summarize_text(_long_text(), model_name="gpt-4o", length="longo")
+    assert all(label != "secao" for label, _ in fake_chains)
+    assert fake_chains[-1][0] == "reduce:gpt-4o:longo"
+
+
+def test_group_for_reduce_respects_budget(monkeypatch):
+    """Os lotes de reduce não ultrapassam o orçamento de tokens."""
+    monkeypatch.setattr(summarizer, "count_tokens", len)
+    groups = summarizer._group_for_reduce(["a" * 4, "b" * 4, "c" * 4, "d" * 4], max_tokens=8)
+    assert groups == [["a" * 4, "b" * 4], ["c" * 4, "d" * 4]]
+
+
+def test_stream_matches_invoke(fake_chains):
+    """O resumo em streaming chega em partes e é igual ao resumo completo."""
+    for text in ("Texto curto do relatório.", _long_text()):
+        expected = summarizer.summarize_text(text, model_name="gpt-4o")
+        parts = list(summarizer.stream_summary_text(text, model_name="gpt-4o"))
+        assert len(parts) > 1
+        assert "".join(parts) == expected
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Script para testar a telemetria de uso da OpenAI (tokens, custo e latência)
+"""
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+
+import telemetry
+from telemetry import LLMUsageCallbackHandler, RollingAggregate
+
+
+def test_estimate_cost_uses_base_model_price():
+    """Modelos versionados usam o preço do nome base; desconhecidos custam zero."""
+    input_price, output_price = telemetry.MODEL_PRICES_PER_MILLION["gpt-4o-mini"]
+    expected = (1000 * input_price + 500 * output_price) / 1_000_000
+    assert telemetry.estimate_cost("gpt-4o-mini", 1000, 500) == expected
+    assert telemetry.estimate_cost("gpt-4o-mini-2024-07-18", 1000, 500) == expected
+    assert telemetry.estimate_cost("modelo-inexistente", 1000, 500) == 0.0
+
+
+def test_bind_feature_propagates_to_threads():
+    """A funcionalidade atual acompanha as tarefas enviadas a um executor."""
+    with telemetry.feature("summary"):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            plain = executor.submit(telemetry.current_feature).result()
+            bound = executor.submit(telemetry.bind_feature(telemetry.current_feature)).result()
+    assert plain == telemetry.UNKNOWN_FEATURE
+    assert bound == "summary"
+
+
+def test_callback_records_tokens_and_ttft(monkeypatch):
+    """O callback do LangChain registra tokens, TTFT e a funcionalidade da chamada."""
+    aggregate = RollingAggregate()
+    monkeypatch.setattr(telemetry, "_aggregate", aggregate)
+    handler = LLMUsageCallbackHandler()
+    run_id = uuid.uuid4()
+
+    with telemetry.feature("chat"):
+        handler.on_chat_model_start({}, [[]], run_id=run_id, invocation_params={"model_name": "gpt-4o-mini"})
+    handler.on_llm_new_token("Olá", run_id=run_id)
+    message = AIMessage(
+        content="Olá",
+        usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150},
+    )
+    handler.on_llm_end(LLMResult(generations=[[ChatGeneration(message=message)]]), run_id=run_id)
+
+    [record] = aggregate.records()
+    assert record["feature"] == "chat"
+    assert record["model"] == "gpt-4o-mini"
+    assert (record["input_tokens"], record["output_tokens"]) == (120, 30)
+    assert record["ttft"] is not None and record["cost"] > 0
+
+    summary = telemetry.get_usage_summary()["chat"]
+    assert summary["calls"] == 1 and summary["errors"] == 0
+
+
+def test_cached_generation_has_no_cost(monkeypatch):
+    """Respostas do cache do LLM contam como chamada, mas sem tokens nem custo."""
+    aggregate = RollingAggregate()
+    monkeypatch.setattr(telemetry, "_aggregate", aggregate)
+    handler = LLMUsageCallbackHandler()
+    run_id = uuid.uuid4()
+
+    with telemetry.feature("chat"):
+        handler.on_chat_model_start({}, [[]], run_id=run_id, invocation_params={"model_name": "gpt-4o-mini"})
+    message = AIMessage(
+        content="Olá",
+        usage_metadata={"input_tokens": 120, "output_tokens": 30, "total_tokens": 150},
+    )
+    generation = ChatGeneration(message=message, generation_info={"cached": True})
+    handler.on_llm_end(LLMResult(generations=[[generation]]), run_id=run_id)
+
+    [record] = aggregate.records()
+    assert record["cached"]
+    assert (record["input_tokens"], record["output_tokens"], record["cost"]) == (0, 0, 0.0)
+    summary = aggregate.summary()["chat"]
+    assert summary["calls"] == 1 and summary["cache_hits"] == 1
+
+
+def test_iter_with_feature_attributes_each_item():
+    """Cada item do iterável é produzido dentro da funcionalidade, sem vazar para quem consome."""
+    def generation():
+        for _ in range(3):
+            yield telemetry.current_feature()
+
+    with telemetry.feature("tts"):
+        seen = []
+        for item in telemetry.iter_with_feature("summary", generation()):
+            seen.append((item, telemetry.current_feature()))
+    assert seen == [("summary", "tts")] * 3
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        items = executor.submit(list, telemetry.iter_with_feature("summary", generation())).result()
+    assert items == ["summary"] * 3
+
+
+def test_http_hooks_record_embeddings_and_errors(monkeypatch):
+    """Os hooks do cliente HTTP medem embeddings, erros e retentativas do SDK."""
+    aggregate = RollingAggregate()
+    monkeypatch.setattr(telemetry, "_aggregate", aggregate)
+
+    def handler(request):
+        if request.headers.get("x-stainless-retry-count") == "1":
+            return httpx.Response(200, json={"data": [], "usage": {"prompt_tokens": 42, "total_tokens": 42}})
+        return httpx.Response(429, json={"error": {"message": "rate limit"}})
+
+    client = telemetry.instrument_http_client(httpx.Client(transport=httpx.MockTransport(handler)))
+    payload = {"model": "text-embedding-3-small", "input": ["texto"]}
+    with telemetry.feature("ingest"):
+        client.post("https://api.openai.com/v1/embeddings", json=payload,
+                    headers={"x-stainless-retry-count": "0"})
+        client.post("https://api.openai.com/v1/embeddings", json=payload,
+                    headers={"x-stainless-retry-count": "1"})
+
+    summary = aggregate.summary()["ingest"]
+    assert summary["calls"] == 2
+    assert summary["errors"] == 1
+    assert summary["retries"] == 1
+    assert summary["input_tokens"] == 42
+
+
+def test_rolling_aggregate_expires_old_records():
+    """Registros fora da janela deixam de compor o agregado."""
+    aggregate = RollingAggregate(window_seconds=10)
+    base = {"kind": "chat", "model": "m", "feature": "chat", "input_tokens": 1, "output_tokens": 1,
+            "latency": 1.0, "ttft": None, "retries": 0, "cost": 0.0, "error": False}
+    aggregate.add({**base, "timestamp": 0})
+    aggregate.add({**base, "timestamp": 100, "latency": 2.0})
+    assert len(aggregate._records) == 1
+    assert aggregate._records[0]["latency"] == 2.0
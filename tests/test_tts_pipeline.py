@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Script para testar a síntese de áudio em paralelo com remontagem ordenada
+"""
+import random
+import threading
+import time
+
+import pytest
+
+import tts_pipeline
+
+
+class FakeTTS:
+    """TTS local com atraso aleatório e falhas programadas por trecho."""
+
+    def __init__(self, delay=0.05, failures=None):
+        self.delay = delay
+        self.failures = dict(failures or {})
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, text):
+        with self._lock:
+            self.calls.append(text)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            should_fail = self.failures.get(text, 0) > 0
+            if should_fail:
+                self.failures[text] -= 1
+        try:
+            time.sleep(random.uniform(0, self.delay))
+            return None if should_fail else f"<{text}>".encode()
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def test_parts_are_reassembled_in_order():
+    """Os áudios voltam na ordem dos trechos, mesmo concluindo fora de ordem."""
+    chunks = [f"parte {i}" for i in range(20)]
+    tts = FakeTTS()
+    parts = tts_pipeline.synthesize_chunks(chunks, max_workers=4, tts_fn=tts)
+    assert parts == [f"<parte {i}>".encode() for i in range(20)]
+    assert 1 < tts.max_active <= 4
+
+
+def test_runs_concurrently():
+    """O tempo total fica próximo de (trechos / concorrência) x tempo de um trecho."""
+    def slow_tts(text):
+        time.sleep(0.1)
+        return b"mp3"
+
+    start = time.time()
+    tts_pipeline.synthesize_chunks([str(i) for i in range(8)], max_workers=8, tts_fn=slow_tts)
+    assert time.time() - start < 0.4
+
+
+def test_failed_chunks_are_retried_individually(monkeypatch):
+    """Só o trecho que falhou é repetido; quem esgota as tentativas fica como None."""
+    monkeypatch.setattr(tts_pipeline.time, "sleep", lambda seconds: None)
+    tts = FakeTTS(delay=0, failures={"b": 1, "c": 5})
+    parts = tts_pipeline.synthesize_chunks(["a", "b", "c"], max_retries=2, tts_fn=tts)
+
+    assert parts == [b"<a>", b"<b>", None]
+    assert tts.calls.count("a") == 1
+    assert tts.calls.count("b") == 2
+    assert tts.calls.count("c") == 3
+
+
+def test_progress_callback():
+    """O progresso é informado a cada trecho concluído."""
+    progress = []
+    tts_pipeline.synthesize_chunks(["a", "b", "c"], tts_fn=FakeTTS(delay=0),
+                                   on_progress=lambda done, total: progress.append((done, total)))
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_split_has_no_overlap():
+    """Os trechos de TTS não se sobrepõem (nenhum trecho é lido duas vezes)."""
+    text = " ".join(f"Frase número {i}." for i in range(2000))
+    chunks = tts_pipeline.split_text_for_tts(text, chunk_size=500)
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    assert "".join(chunks).replace(" ", "") == text.replace(" ", "")
+    assert all(chunk.endswith(".") for chunk in chunks)
+
+
+def test_segments_cut_at_sentence_boundaries():
+    """Segmentos terminam em fim de frase, o primeiro é curto e nenhum passa do limite."""
+    text = "".join(f"Frase {i} do resumo do relatório. " for i in range(100))
+    deltas = [text[i:i + 7] for i in range(0, len(text), 7)]
+    segments = list(tts_pipeline.segment_for_tts(deltas, first_chars=50, segment_chars=300, max_chars=400))
+
+    assert all(segment.endswith(".") for segment in segments)
+    assert 50 <= len(segments[0]) < 100
+    assert all(len(segment) <= 400 for segment in segments)
+    assert " ".join(segments) == text.strip()
+    # O corte não depende do tamanho das partes recebidas (mantém o cache de áudio útil)
+    assert list(tts_pipeline.segment_for_tts([text], 50, 300, 400)) == segments
+
+
+def test_long_text_without_punctuation_is_cut_at_limit():
+    """Sem fronteira de frase, o texto é cortado em um espaço antes do limite da API."""
+    segments = list(tts_pipeline.segment_for_tts(["palavra " * 200], 50, 300, 400))
+    assert all(len(segment) <= 400 for segment in segments)
+    assert " ".join(segments).split() == ["palavra"] * 200
+
+
+def test_first_audio_before_generation_ends():
+    """O primeiro áudio é entregue enquanto o segundo segmento ainda está sendo gerado."""
+    first_audio_delivered = threading.Event()
+    delivered_during_generation = []
+
+    def slow_generation():
+        for i in range(8):
+            yield f"Frase número {i} do resumo, que já forma o primeiro segmento. "
+        yield "Começo do segundo segmento"
+        delivered_during_generation.append(first_audio_delivered.wait(timeout=2))
+        for i in range(5):
+            yield f", frase {i}. "
+            time.sleep(0.02)
+
+    def tts(text):
+        time.sleep(0.05)
+        return text.encode()
+
+    received_text = []
+    stream = tts_pipeline.speak_stream(slow_generation(), on_text=received_text.append, tts_fn=tts)
+    first_segment, first_audio = next(stream)
+    first_audio_delivered.set()
+    assert first_audio == first_segment.encode()
+    assert "segundo segmento" not in first_segment
+
+    rest = list(stream)
+    assert delivered_during_generation == [True]
+    assert " ".join([first_segment] + [segment for segment, _ in rest]) == "".join(received_text).strip()
+
+
+def test_stream_generation_error_is_raised():
+    """Um erro na geração do texto chega a quem consome o áudio."""
+    def failing_generation():
+        yield "Primeira frase. "
+        raise RuntimeError("falha na geração")
+
+    with pytest.raises(RuntimeError, match="falha na geração"):
+        list(tts_pipeline.speak_stream(failing_generation(), tts_fn=lambda text: text.encode()))
+
+
+def test_progress_exception_discards_pending_chunks():
+    """Se o callback de progresso interromper a síntese, as partes na fila não são sintetizadas."""
+    calls = []
+
+    def tts(chunk):
+        calls.append(chunk)
+        time.sleep(0.01)
+        return chunk.encode()
+
+    class Stop(Exception):
+        pass
+
+    def stop(done, total):
+        raise Stop()
+
+    with pytest.raises(Stop):
+        tts_pipeline.synthesize_chunks([f"parte {i}" for i in range(20)], max_workers=2, on_progress=stop, tts_fn=tts)
+    assert len(calls) < 20
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Script para testar o cache e o limite de concorrência da busca na web
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from web_search import CachedWebSearch, normalize_query
+
+
+class FakeSearchBackend:
+    """Backend de busca local: conta chamadas e mede a concorrência máxima."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query):
+        with self._lock:
+            self.calls.append(query)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("backend indisponível")
+            return f"resultados para {query}"
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_normalize_query():
+    """Consultas equivalentes geram a mesma chave."""
+    assert normalize_query("  Selic   HOJE? ") == normalize_query("selic hoje")
+
+
+def test_cache_hit_and_ttl_expiry():
+    """Consultas repetidas usam o cache até o TTL expirar."""
+    backend = FakeSearchBackend()
+    clock = FakeClock()
+    search = CachedWebSearch(backend=backend, ttl_seconds=60, timer=clock)
+
+    assert search.search("Selic hoje") == "resultados para Selic hoje"
+    assert search.search("selic  hoje?") == "resultados para Selic hoje"
+    assert len(backend.calls) == 1
+
+    clock.now = 61
+    search.search("selic hoje")
+    assert len(backend.calls) == 2
+    assert search.stats.hits == 1 and search.stats.misses == 2
+
+
+def test_single_flight_deduplicates_concurrent_searches():
+    """Buscas idênticas simultâneas resultam em uma única chamada ao backend."""
+    backend = FakeSearchBackend(delay=0.2)
+    search = CachedWebSearch(backend=backend)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: search.search("ifix"), range(8)))
+
+    assert set(results) == {"resultados para ifix"}
+    assert len(backend.calls) == 1
+    assert search.stats.deduplicated == 7
+
+
+def test_timeout_returns_quickly_and_late_result_is_cached():
+    """Uma busca lenta não trava o turno; o resultado tardio alimenta o cache."""
+    backend = FakeSearchBackend(delay=0.3)
+    search = CachedWebSearch(backend=backend, timeout=0.05)
+
+    start = time.time()
+    assert "tempo limite" in search.search("lenta")
+    assert time.time() - start < 0.25
+    assert search.stats.timeouts == 1
+
+    time.sleep(0.4)
+    assert search.search("lenta") == "resultados para lenta"
+    assert len(backend.calls) == 1
+
+
+def test_concurrency_cap():
+    """Buscas distintas respeitam o limite global de concorrência."""
+    backend = FakeSearchBackend(delay=0.05)
+    search = CachedWebSearch(backend=backend, max_concurrency=2)
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        list(executor.map(search.search, [f"consulta {i}" for i in range(6)]))
+
+    assert len(backend.calls) == 6
+    assert backend.max_active <= 2
+
+
+def test_errors_are_not_cached():
+    """Falhas do backend viram mensagem para o agente e não ficam no cache."""
+    backend = FakeSearchBackend(fail=True)
+    search = CachedWebSearch(backend=backend)
+    assert search.search("falha").startswith("Erro na busca na web")
+    search.search("falha")
+    assert len(backend.calls) == 2
@@ -0,0 +1,221 @@
+"""Módulo do Pipeline de TTS
+
+Converte textos longos (relatório completo) em áudio sintetizando os trechos
+em paralelo, com um pool limitado, e remontando-os na ordem original. Trechos
+que falham são repetidos individualmente, sem refazer os demais.
+
+Também converte textos gerados em streaming (resumo): o texto é cortado em
+fronteiras de frase e cada segmento vai para o TTS enquanto o restante ainda
+está sendo gerado.
+"""
+import queue
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+import audio_cache
+import llm_services
+import telemetry
+from config import (
+    TTS_MAX_WORKERS,
+    TTS_CHUNK_RETRIES,
+    TTS_CHUNK_CHARS,
+    TTS_STREAM_FIRST_SEGMENT_CHARS,
+    TTS_STREAM_SEGMENT_CHARS,
+)
+
+# Fim de frase (pontuação seguida de espaço) ou de linha (itens de lista do resumo)
+_SENTENCE_BOUNDARY = re.compile(r"[.!?…](?=\s)|\n")
+
+_END_OF_STREAM = object()
+
+
+def split_text_for_tts(text, chunk_size=None):
+    """Divide o texto em trechos dentro do limite de entrada da API de TTS.
+
+    Sem sobreposição: trechos sobrepostos seriam lidos em voz alta duas vezes.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size or TTS_CHUNK_CHARS,
+        chunk_overlap=0,
+        separators=["\n\n", "\n", ". ", " "],
+        keep_separator="end",
+    )
+    return splitter.split_text(text)
+
+
+def _synthesize_with_retries(chunk, tts_fn, max_retries):
+    for attempt in range(max_retries + 1):
+        audio = tts_fn(chunk)
+        if audio:
+            return audio
+        if attempt < max_retries:
+            time.sleep(min(2 ** attempt, 8))
+    return None
+
+
+def synthesize_chunks(chunks, max_workers=None, max_retries=None, on_progress=None, tts_fn=None):
+    """Sintetiza os trechos em paralelo e retorna os áudios na ordem dos trechos.
+
+    Trechos que falharem em todas as tentativas ficam como None. on_progress(concluídos,
+    total) é chamado na thread de quem chamou, o que permite atualizar a interface;
+    se ele levantar uma exceção, as partes ainda não iniciadas são descartadas.
+    """
+    tts_fn = tts_fn or llm_services.text_to_speech
+    max_workers = max_workers or TTS_MAX_WORKERS
+    max_retries = TTS_CHUNK_RETRIES if max_retries is None else max_retries
+    results = [None] * len(chunks)
+    if not chunks:
+        return results
+
+    synthesize = telemetry.bind_feature(_synthesize_with_retries)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = {
+            executor.submit(synthesize, chunk, tts_fn, max_retries): index
+            for index, chunk in enumerate(chunks)
+        }
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"⚠️ Falha no TTS da parte {futures[future] + 1}: {e}")
+                if on_progress is not None:
+                    on_progress(done, len(chunks))
+        except BaseException:
+            # on_progress pode interromper a síntese (tarefa cancelada): as partes na fila são descartadas
+            for future in futures:
+                future.cancel()
+            raise
+    return results
+
+
+def synthesize_text(text, max_workers=None, on_progress=None):
+    """Gera o áudio completo de um texto longo.
+
+    O áudio montado fica no cache de áudio; repetições são servidas direto do
+    disco, sem sintetizar nem concatenar. Retorna (áudio concatenado ou None,
+    número de partes, lista de partes que falharam).
+    """
+    cache = audio_cache.get_audio_cache()
+    key = audio_cache.audio_key(text, kind="full")
+    chunks = split_text_for_tts(text)
+    if cache is not None:
+        cached_audio = cache.get(key)
+        if cached_audio:
+            if on_progress is not None:
+                on_progress(len(chunks), len(chunks))
+            return cached_audio, len(chunks), []
+
+    parts = synthesize_chunks(chunks, max_workers=max_workers, on_progress=on_progress)
+    failed = [index + 1 for index, audio in enumerate(parts) if audio is None]
+    if failed:
+        print(f"⚠️ Partes sem áudio após as retentativas: {failed}")
+    audio_parts = [audio for audio in parts if audio]
+    if not audio_parts:
+        return None, len(chunks), failed
+    audio = llm_services.concatenate_audio_files(audio_parts)
+    if cache is not None and audio and not failed:
+        # Áudios incompletos não são guardados, para que uma nova tentativa refaça as partes
+        try:
+            cache.put(key, audio)
+        except OSError as e:
+            print(f"⚠️ Erro ao gravar áudio no cache: {e}")
+    return audio, len(chunks), failed
+
+
+def _cut_position(buffer, target_chars, max_chars, final=False):
+    """Posição de corte do próximo segmento, ou None se ainda for preciso esperar mais texto."""
+    boundaries = [m.end() for m in _SENTENCE_BOUNDARY.finditer(buffer, 0, max_chars + 1)]
+    for position in boundaries:
+        if position >= target_chars:
+            return position
+    if len(buffer) <= max_chars:
+        return len(buffer) if final else None
+    # Sem fronteira de frase dentro do limite da API: corta na última possível
+    if boundaries:
+        return boundaries[-1]
+    space = buffer.rfind(" ", 0, max_chars)
+    return space if space > 0 else max_chars
+
+
+def segment_for_tts(deltas, first_chars=None, segment_chars=None, max_chars=None):
+    """Agrupa partes de texto em segmentos para o TTS, cortando em fronteiras de frase.
+
+    O primeiro segmento é curto, para o primeiro áudio ficar pronto logo; os
+    seguintes são maiores. Nenhum segmento passa de max_chars (limite da API).
+    """
+    first_chars = first_chars or TTS_STREAM_FIRST_SEGMENT_CHARS
+    segment_chars = segment_chars or TTS_STREAM_SEGMENT_CHARS
+    max_chars = max_chars or TTS_CHUNK_CHARS
+    buffer = ""
+    emitted = 0
+    for delta in deltas:
+        buffer += delta
+        while True:
+            target = first_chars if emitted == 0 else segment_chars
+            position = _cut_position(buffer, target, max_chars)
+            if position is None:
+                break
+            segment, buffer = buffer[:position].strip(), buffer[position:]
+            if segment:
+                emitted += 1
+                yield segment
+    while buffer.strip():
+        position = _cut_position(buffer, first_chars if emitted == 0 else segment_chars, max_chars, final=True)
+        segment, buffer = buffer[:position].strip(), buffer[position:]
+        if segment:
+            emitted += 1
+            yield segment
+
+
+def speak_stream(deltas, on_text=None, max_workers=None, max_retries=None, tts_fn=None):
+    """Sintetiza um texto gerado em streaming, em paralelo à geração.
+
+    O texto é consumido numa thread própria: cada segmento (ver segment_for_tts)
+    é enviado ao TTS assim que fica completo. Gera pares (segmento, áudio ou
+    None) na ordem do texto, cada um assim que o seu áudio e os anteriores ficam
+    prontos, sem esperar pelo segmento seguinte. on_text(parte) recebe o texto à
+    medida que chega, para exibição (chamado na thread que consome o texto).
+    """
+    tts_fn = tts_fn or llm_services.text_to_speech
+    max_retries = TTS_CHUNK_RETRIES if max_retries is None else max_retries
+    synthesize = telemetry.bind_feature(_synthesize_with_retries)
+    executor = ThreadPoolExecutor(max_workers=max_workers or TTS_MAX_WORKERS, thread_name_prefix="tts-stream")
+    pending = queue.Queue()
+    stop = threading.Event()
+
+    def text_with_callback():
+        for delta in deltas:
+            if stop.is_set():
+                return
+            if on_text is not None:
+                on_text(delta)
+            yield delta
+
+    def produce():
+        try:
+            for segment in segment_for_tts(text_with_callback()):
+                pending.put((segment, executor.submit(synthesize, segment, tts_fn, max_retries)))
+            pending.put(_END_OF_STREAM)
+        except BaseException as e:
+            # O erro da geração (ou do corte) é levantado para quem consome o áudio
+            pending.put(e)
+
+    threading.Thread(target=telemetry.bind_feature(produce), name="tts-stream-text", daemon=True).start()
+    try:
+        while True:
+            item = pending.get()
+            if item is _END_OF_STREAM:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            segment_text, future = item
+            yield segment_text, future.result()
+    finally:
+        # Consumo interrompido: a geração para no próximo trecho e os segmentos na fila são descartados
+        stop.set()
+        executor.shutdown(wait=False, cancel_futures=True)
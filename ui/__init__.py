@@ -0,0 +1,56 @@
+"""Pacote de Páginas da Interface
+
+Cada aba da área principal é um módulo próprio, importado só quando é aberta
+pela primeira vez: as dependências pesadas (LangChain, agentes, ChromaDB,
+pyarrow) ficam fora da inicialização e da renderização das outras páginas.
+"""
+import importlib
+import threading
+
+PAGES = {
+    "chat": "ui.chat",
+    "viewer": "ui.viewer",
+    "insights": "ui.insights",
+    "audio": "ui.audio",
+}
+
+_warm_up_lock = threading.Lock()
+_warm_up_thread = None
+
+
+def render_page(name):
+    """Importa (na primeira vez) e renderiza a página da aba informada."""
+    importlib.import_module(PAGES.get(name, PAGES["chat"])).render()
+
+
+def render_system_panel():
+    """Painel Sistema da barra lateral (importado só quando o menu é aberto)."""
+    importlib.import_module("ui.system").render()
+
+
+def process_pending_documents():
+    """Envia a ingestão dos relatórios pendentes (ui.documents)."""
+    importlib.import_module("ui.documents").process_pending()
+
+
+def render_ingest_status():
+    """Andamento da ingestão no menu Documentos (ui.documents)."""
+    importlib.import_module("ui.documents").render_status()
+
+
+def _warm_up_services():
+    importlib.import_module("services").start_warm_up()
+
+
+def start_services_warm_up():
+    """Aquece os serviços em segundo plano uma única vez por processo.
+
+    O próprio import de services (ChromaDB, LangChain) acontece na thread de
+    aquecimento, e não no primeiro desenho da página.
+    """
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=_warm_up_services, name="services-import", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
@@ -0,0 +1,113 @@
+"""Módulo da Página do Centro de Áudio
+
+Gera o áudio do resumo ou do relatório completo em tarefas de segundo plano;
+o MP3 fica no armazenamento de blobs da sessão e a página acompanha o andamento.
+"""
+import os
+
+import streamlit as st
+
+import config
+import file_handler
+from ui import job_status
+from ui.common import show_audio_segments, show_stored_audio
+
+
+def _show_summary_partial(result):
+    show_audio_segments(result.get("segments", []))
+
+
+def render():
+    st.subheader("Centro de Áudio com IA")
+
+
+    processed_reports = file_handler.get_all_processed_reports()
+
+    if not processed_reports:
+        st.warning("Nenhum documento processado encontrado.")
+        st.info(
+            "Vá para **Documentos** no menu para carregar e processar arquivos primeiro."
+        )
+    else:
+
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            selected_report = st.selectbox(
+                "Selecionar documento:",
+                options=processed_reports,
+                index=None,
+                placeholder="Selecione um arquivo para gerar áudio...",
+                label_visibility="collapsed"
+            )
+
+        with col2:
+            st.metric("Docs Disponíveis", len(processed_reports))
+
+        if selected_report:
+            st.success(f"**Documento selecionado:** {selected_report}")
+            report_path = os.path.join(
+                config.REPORTS_PROCESSED_DIR, selected_report
+            )
+
+
+            st.markdown("### Opções de Áudio")
+
+            audio_col1, audio_col2 = st.columns(2)
+
+            selected_model = st.session_state.get("selected_model", config.LLM_MODEL_NAME)
+            summary_key = f"summary_audio:{selected_report}:{selected_model}"
+            full_key = f"full_audio:{selected_report}"
+
+            with audio_col1:
+                if st.button(
+                    " Gerar Áudio do Resumo",
+                    use_container_width=True,
+                    type="primary",
+                    key="audio_summary",
+                ):
+                    job_status.submit(
+                        "summary_audio", summary_key, file_path=report_path, model_name=selected_model
+                    )
+
+                def show_summary_audio(result):
+                    show_stored_audio(
+                        result["handle"],
+                        clear_key="clear_summary",
+                        file_name=f"resumo_{selected_report.replace('.pdf', '')}.mp3",
+                        on_clear=lambda: job_status.forget(summary_key),
+                    )
+
+                def show_summary_done(result):
+                    # Terminou com a página aberta: os trechos seguem no lugar e o áudio completo aparece abaixo
+                    _show_summary_partial(result)
+                    show_summary_audio(result)
+
+                job_status.show(
+                    summary_key,
+                    show_summary_audio,
+                    # No modo em pipeline os trechos do resumo tocam enquanto o restante é gerado
+                    render_partial=_show_summary_partial,
+                    render_done=show_summary_done,
+                )
+
+            with audio_col2:
+                if st.button(
+                    " Gerar Áudio Completo",
+                    use_container_width=True,
+                    type="secondary",
+                    key="audio_full",
+                ):
+                    job_status.submit("full_audio", full_key, file_path=report_path)
+
+                def show_full_audio(result):
+                    if result["failed_parts"]:
+                        st.warning(f" {len(result['failed_parts'])} parte(s) sem áudio")
+                    show_stored_audio(
+                        result["handle"],
+                        clear_key="clear_full",
+                        file_name=f"audio_completo_{selected_report.replace('.pdf', '')}.mp3",
+                        on_clear=lambda: job_status.forget(full_key),
+                    )
+
+                job_status.show(full_key, show_full_audio)
@@ -0,0 +1,95 @@
+"""Módulo da Página de Chat
+
+Conversa com o agente, com histórico paginado e persistido no Redis quando
+configurado.
+"""
+import streamlit as st
+from langchain_core.messages import AIMessage, HumanMessage
+
+import config
+import conversation_memory
+import memory
+import question_router
+import services
+import telemetry
+
+
+def _load_session():
+    """Inicializa o histórico da sessão (recuperado do Redis, se houver) e retorna o histórico persistente."""
+    session_history = memory.get_session_history(st.session_state.session_id)
+
+    if "messages" not in st.session_state or "conversation_memory" not in st.session_state:
+        st.session_state.messages = []
+        st.session_state.conversation_memory = conversation_memory.ConversationMemory()
+        if session_history is not None:
+            try:
+                stored_messages = session_history.messages
+                st.session_state.messages = memory.to_chat_messages(stored_messages)
+                st.session_state.conversation_memory.restore(memory.to_turns(stored_messages))
+            except Exception as e:
+                print(f"⚠️ Erro ao carregar o histórico da sessão: {e}")
+    if "chat_pages" not in st.session_state:
+        st.session_state.chat_pages = 1
+    return session_history
+
+
+def render():
+    session_history = _load_session()
+    vector_manager = services.get_vector_manager()
+
+    selected_model = st.session_state.get("selected_model", config.LLM_MODEL_NAME)
+    st.subheader("Conversar com o Agente")
+    st.info(
+        f"**Modelo ativo:** {config.AVAILABLE_LLM_MODELS.get(selected_model, selected_model)}"
+    )
+
+
+    # Renderiza só as páginas mais recentes do histórico
+    visible_count = st.session_state.chat_pages * config.CHAT_PAGE_SIZE
+    hidden_count = max(0, len(st.session_state.messages) - visible_count)
+    if hidden_count:
+        if st.button(f"Carregar mensagens anteriores ({hidden_count})"):
+            st.session_state.chat_pages += 1
+            st.rerun()
+
+    for message in st.session_state.messages[hidden_count:]:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+
+    user_question = st.chat_input("Faça sua pergunta...")
+    if user_question:
+        st.session_state.messages.append({"role": "user", "content": user_question})
+        with st.chat_message("user"):
+            st.markdown(user_question)
+
+        with st.spinner("O Agente está pensando..."), telemetry.feature("chat"):
+
+            selected_model = st.session_state.get(
+                "selected_model", config.LLM_MODEL_NAME
+            )
+            try:
+
+                response, _ = question_router.answer_question(
+                    user_question,
+                    vector_manager,
+                    model_name=selected_model,
+                    memory=st.session_state.conversation_memory,
+                )
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": response}
+                )
+                if session_history is not None:
+                    try:
+                        session_history.add_messages(
+                            [HumanMessage(content=user_question), AIMessage(content=response)]
+                        )
+                    except Exception as e:
+                        print(f"⚠️ Erro ao salvar o histórico da sessão: {e}")
+                with st.chat_message("assistant"):
+                    st.markdown(response)
+            except Exception as e:
+                error_message = f"Erro: {e}"
+                st.error(error_message)
+                st.session_state.messages.append(
+                    {"role": "assistant", "content": error_message}
+                )
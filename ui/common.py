@@ -0,0 +1,123 @@
+"""Módulo de Componentes Compartilhados da Interface
+
+Exibição de PDFs e de áudios usada por mais de uma página. Com a API
+configurada (PDF_PUBLIC_URL), os PDFs são abertos e baixados pela rota de
+arquivos dela, sem passar o conteúdo pela sessão do Streamlit.
+"""
+import os
+
+import streamlit as st
+
+import config
+
+
+def _display_pdf_from_api(file_name):
+    """Abre o PDF pela rota de arquivos da API: o navegador pede só os trechos que exibe."""
+    from urllib.parse import quote
+
+    import streamlit.components.v1 as components
+
+    url = f"{config.PDF_PUBLIC_URL}/documents/{quote(file_name)}"
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.link_button(" BAIXAR PDF", f"{url}?download=true", use_container_width=True, type="primary")
+    components.iframe(url, height=900)
+
+
+def _display_pdf_download(file_path, file_name):
+    """Sem a API, o arquivo é enviado pelo Streamlit para download."""
+    st.markdown(
+        """
+    <div style="text-align: center; margin: 30px 0;">
+        <h3 style="color: #4CAF50;">Visualizar PDF</h3>
+        <p style="color: #666;">Use o botão abaixo para baixar e abrir o PDF</p>
+    </div>
+    """,
+        unsafe_allow_html=True,
+    )
+
+    with open(file_path, "rb") as f:
+        pdf_bytes = f.read()
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.download_button(
+            label=" BAIXAR E ABRIR PDF",
+            data=pdf_bytes,
+            file_name=file_name,
+            mime="application/pdf",
+            use_container_width=True,
+            type="primary",
+        )
+
+    st.markdown("""
+    ### Como visualizar o PDF:
+    
+    **Método Recomendado (mais confiável):**
+    1. **Clique em "BAIXAR E ABRIR PDF"** acima
+    2. O arquivo será baixado automaticamente 
+    3. Abra o arquivo baixado com seu visualizador de PDF preferido
+    """)
+    st.caption("Configure PDF_PUBLIC_URL com o endereço da API para ver o PDF direto na página.")
+
+
+def display_pdf(file_path):
+    if not os.path.exists(file_path):
+        st.error(f"Erro: Arquivo PDF não encontrado em: {file_path}")
+        return
+
+    try:
+        file_size = os.path.getsize(file_path)
+        file_name = os.path.basename(file_path)
+
+        st.success(f"**Arquivo encontrado:** {file_name}")
+        st.info(f"**Tamanho:** {file_size / (1024 * 1024):.1f} MB")
+
+        if config.PDF_PUBLIC_URL:
+            _display_pdf_from_api(file_name)
+        else:
+            _display_pdf_download(file_path, file_name)
+
+    except Exception as e:
+        st.error(f"Erro ao processar o PDF: {e}")
+        st.info(" Tente usar a opção 'Ler PDF (Texto Formatado)' como alternativa.")
+
+
+def show_audio_segments(handles):
+    """Exibe os trechos de áudio já sintetizados de uma tarefa em andamento."""
+    import blob_store
+
+    store = blob_store.get_blob_store()
+    for index, handle in enumerate(handles):
+        path = store.path(st.session_state.session_id, handle)
+        if path is not None:
+            st.audio(path, format="audio/mp3", autoplay=index == 0)
+
+
+def show_stored_audio(handle, clear_key, file_name, on_clear):
+    """Exibe um áudio guardado no armazenamento de blobs, lendo-o do arquivo.
+
+    on_clear() é chamado quando o usuário limpa o áudio ou quando ele já expirou.
+    """
+    import blob_store
+
+    store = blob_store.get_blob_store()
+    path = store.path(st.session_state.session_id, handle)
+    if path is None:
+        st.info("O áudio gerado expirou. Gere novamente.")
+        on_clear()
+        return
+
+    st.audio(path, format="audio/mp3")
+    with open(path, "rb") as audio_file:
+        st.download_button(
+            label=" Baixar Áudio",
+            data=audio_file,
+            file_name=file_name,
+            mime="audio/mp3",
+            key=f"download_{clear_key}",
+        )
+    if st.button(" Limpar", key=clear_key):
+        store.delete(st.session_state.session_id, handle)
+        on_clear()
+        st.rerun()
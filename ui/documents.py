@@ -0,0 +1,35 @@
+"""Módulo de Processamento de Documentos
+
+Ingestão dos relatórios pendentes, disparada pelo menu Documentos e executada
+em uma tarefa de segundo plano compartilhada por todas as sessões (uma por vez).
+"""
+import streamlit as st
+
+import config
+from ui import job_status
+
+INGEST_KEY = "ingest"
+
+
+def process_pending():
+    """Envia a ingestão dos relatórios de reports_new; o dashboard é atualizado ao final."""
+    job_status.submit(
+        "ingest",
+        INGEST_KEY,
+        shared=True,
+        model_name=st.session_state.get("selected_model", config.LLM_MODEL_NAME),
+    )
+
+
+def _show_result(result):
+    for entry in result["processed"]:
+        st.success(f"{entry['file_name']} - {entry['chunks_added']} chunks processados")
+    for entry in result["skipped"]:
+        st.info(f"{entry['file_name']} - Duplicado, ignorado")
+    if result["insights_error"]:
+        st.warning(f"Insights do dashboard não foram atualizados: {result['insights_error']}")
+
+
+def render_status():
+    """Andamento e resultado da última ingestão."""
+    job_status.show(INGEST_KEY, _show_result, shared=True)
@@ -0,0 +1,194 @@
+"""Módulo da Página de Insights
+
+Resumo executivo, métricas chave e análise detalhada dos relatórios. Quando a
+visão pré-calculada na ingestão não tem o insight, ele é gerado em uma tarefa
+de segundo plano e a página acompanha o andamento.
+"""
+import streamlit as st
+
+import config
+import insights_materializer
+import jobs
+import metrics_store
+import services
+from ui import job_status
+
+
+def _insight_key(action, model_name):
+    return f"insights:{action}:{model_name}"
+
+
+def _select_insight(action, model_name):
+    """Seleciona o insight exibido; uma tarefa anterior que falhou é descartada para ser refeita."""
+    st.session_state.insight_action = action
+    job = job_status.latest(_insight_key(action, model_name))
+    if job is not None and job["status"] in (jobs.FAILED, jobs.CANCELLED):
+        job_status.forget(_insight_key(action, model_name))
+
+
+def _show_insight_job(action, model_name, render_result):
+    key = _insight_key(action, model_name)
+    if job_status.latest(key) is None:
+        job_status.submit("insights", key, action=action, model_name=model_name)
+    job_status.show(key, render_result)
+
+
+def _show_market_summary(summary):
+    st.markdown(summary)
+    st.download_button(
+        label=" Baixar Resumo Executivo",
+        data=summary,
+        file_name="resumo_executivo_fii.txt",
+        mime="text/plain",
+    )
+
+
+def _show_key_metrics(metrics):
+    if "error" in metrics:
+        st.error(metrics["error"])
+        return
+    st.markdown(metrics.get("metrics", "Nenhuma métrica encontrada"))
+    if metrics.get("metrics"):
+        st.download_button(
+            label=" Baixar Métricas",
+            data=metrics["metrics"],
+            file_name="metricas_chave_fii.txt",
+            mime="text/plain",
+        )
+
+
+def _show_detailed_insights(insights):
+    insight_tabs = st.tabs(
+        [
+            " Ativos Principais",
+            " Performance",
+            " Setores & Segmentos",
+            " Recomendações",
+            " Riscos & Oportunidades",
+            " Indicadores",
+        ]
+    )
+
+    queries = list(insights.keys())
+
+    for i, tab in enumerate(insight_tabs):
+        with tab:
+            if i < len(queries):
+                query = queries[i]
+                insight = insights[query]
+                st.markdown(f"**Pergunta:** {query}")
+                st.markdown("---")
+                st.markdown(insight)
+
+
+    all_insights_text = "\n\n".join(
+        [
+            f"PERGUNTA: {q}\n\nRESPOSTA: {a}\n{'=' * 50}"
+            for q, a in insights.items()
+        ]
+    )
+    st.download_button(
+        label=" Baixar Todos os Insights",
+        data=all_insights_text,
+        file_name="insights_completos_fii.txt",
+        mime="text/plain",
+    )
+
+
+def render():
+    selected_model = st.session_state.get("selected_model", config.LLM_MODEL_NAME)
+    st.subheader("Insights Automáticos dos Investimentos")
+    st.info(
+        f"**Modelo ativo:** {config.AVAILABLE_LLM_MODELS.get(selected_model, selected_model)}"
+    )
+
+
+    doc_count = services.document_count()
+    if doc_count == 0:
+        st.warning(
+            "Nenhum documento financeiro foi processado ainda. Faça upload e processe documentos primeiro."
+        )
+        st.info("Vá para a barra lateral e:")
+        st.write("1. Carregar novos documentos (FIIs, Ações, etc.)")
+        st.write("2. Processar documentos")
+        st.write("3. Volte aqui para ver os insights!")
+        return
+
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        if st.button("Resumo Executivo", use_container_width=True):
+            _select_insight("market_summary", selected_model)
+
+    with col2:
+        if st.button("Métricas Chave", use_container_width=True):
+            _select_insight("key_metrics", selected_model)
+
+    with col3:
+        if st.button("Análise Detalhada", use_container_width=True):
+            _select_insight("detailed_insights", selected_model)
+
+
+    if "insight_action" in st.session_state and st.session_state.insight_action:
+        action = st.session_state.insight_action
+        materialized_view = insights_materializer.get_materialized_view(selected_model)
+
+        if action == "market_summary":
+            st.subheader(" Resumo Executivo do Mercado")
+            if materialized_view and materialized_view["market_summary"]:
+                st.caption(
+                    f"Pré-calculado a partir de {len(materialized_view['documents'])} documento(s)"
+                )
+                _show_market_summary(materialized_view["market_summary"])
+            else:
+                _show_insight_job(
+                    action, selected_model, lambda result: _show_market_summary(result["market_summary"])
+                )
+
+        elif action == "key_metrics":
+            st.subheader(" Métricas Chave Extraídas")
+            overview = metrics_store.get_metrics_store().key_metrics_overview()
+            if not overview.empty:
+                st.caption(
+                    f"{len(overview)} métricas de {overview['source_file'].nunique()} "
+                    "documento(s), extraídas na ingestão"
+                )
+                st.dataframe(overview, use_container_width=True, hide_index=True)
+                st.download_button(
+                    label=" Baixar Métricas",
+                    data=overview.to_csv(index=False),
+                    file_name="metricas_chave.csv",
+                    mime="text/csv",
+                )
+            else:
+                _show_insight_job(action, selected_model, _show_key_metrics)
+
+        elif action == "detailed_insights":
+            st.subheader(" Análise Detalhada dos Relatórios")
+            if materialized_view and materialized_view["insights"]:
+                st.caption(
+                    f"Pré-calculado a partir de {len(materialized_view['documents'])} documento(s)"
+                )
+                _show_detailed_insights(materialized_view["insights"])
+            else:
+                _show_insight_job(
+                    action, selected_model, lambda result: _show_detailed_insights(result["insights"])
+                )
+
+
+    with st.expander(" Como funcionam os Insights"):
+        st.write("""
+        **Os insights são gerados automaticamente usando:**
+
+        1. **RAG (Retrieval-Augmented Generation)**: Busca informações relevantes nos documentos
+        2. **IA Generativa**: Analisa e sintetiza as informações encontradas  
+        3. **Prompts Especializados**: Perguntas específicas para extrair insights valiosos
+
+        **Tipos de Insights Disponíveis:**
+        -  **Resumo Executivo**: Visão geral do mercado e recomendações
+        -  **Métricas Chave**: Valores, rendimentos e dados numéricos
+        -  **Análise Detalhada**: Insights segmentados por categoria
+
+        **Dica**: Quanto mais documentos processados, mais ricos serão os insights!
+        """)
@@ -0,0 +1,127 @@
+"""Módulo de Acompanhamento de Tarefas
+
+Envio das ações demoradas ao executor de tarefas e exibição do andamento.
+Enquanto a tarefa está ativa, só o trecho da página que a acompanha é
+atualizado (a cada JOBS_POLL_INTERVAL_SECONDS), com progresso, resultado
+parcial e botão de cancelar; ao terminar, a página inteira é redesenhada com
+o resultado. As tarefas são da sessão (identificador no cookie, ver
+ui.session) e continuam visíveis ao trocar de aba ou recarregar a página.
+"""
+import os
+
+import streamlit as st
+
+import jobs
+from config import JOBS_POLL_INTERVAL_SECONDS
+
+STATUS_LABELS = {
+    jobs.QUEUED: "Na fila",
+    jobs.RUNNING: "Em andamento",
+    jobs.SUCCEEDED: "Concluída",
+    jobs.FAILED: "Falhou",
+    jobs.CANCELLED: "Cancelada",
+}
+
+KIND_LABELS = {
+    "summary": "Resumo",
+    "summary_audio": "Áudio do resumo",
+    "full_audio": "Áudio completo",
+    "insights": "Insights",
+    "ingest": "Processamento de documentos",
+}
+
+
+def _session_id(shared):
+    # Tarefas compartilhadas (como a ingestão) não pertencem a uma sessão
+    return None if shared else st.session_state.session_id
+
+
+def submit(kind, key, shared=False, **params):
+    """Envia a tarefa (ou reaproveita a ativa com a mesma chave) e retorna o seu id."""
+    return jobs.get_job_runner().submit(kind, params, session_id=_session_id(shared), key=key)
+
+
+def latest(key, shared=False):
+    """Tarefa mais recente da chave, ou None."""
+    return jobs.get_job_runner().latest(_session_id(shared), key)
+
+
+def forget(key, shared=False):
+    """Descarta a tarefa mais recente da chave (se já tiver terminado)."""
+    job = latest(key, shared)
+    if job is not None:
+        jobs.get_job_runner().delete(job["id"])
+
+
+def _show_progress(job):
+    label = job["message"] or STATUS_LABELS[job["status"]]
+    if job["progress"] is not None:
+        st.progress(job["progress"], text=label)
+    else:
+        st.caption(f"⏳ {label}...")
+    if job["cancel_requested"]:
+        st.caption("Cancelando...")
+    elif st.button("Cancelar", key=f"cancel_{job['id']}"):
+        jobs.get_job_runner().cancel(job["id"])
+        st.rerun(scope="fragment")
+
+
+def show(key, render_result, render_partial=None, render_done=None, shared=False):
+    """Acompanha a tarefa mais recente da chave e retorna o seu estado (ou None).
+
+    render_result(resultado) exibe o resultado de uma tarefa concluída;
+    render_partial(resultado parcial), se informado, exibe o que já foi
+    produzido enquanto a tarefa roda. render_done(resultado), se informado,
+    exibe o resultado de uma tarefa que termina com a página aberta: ele é
+    desenhado no próprio trecho atualizado, sem redesenhar a página, e pode
+    manter no lugar o que render_partial exibia (um áudio tocando não é
+    interrompido). Sem ele, a página inteira é redesenhada com render_result.
+    """
+    job = latest(key, shared)
+    if job is None:
+        return None
+
+    if job["status"] in jobs.ACTIVE_STATUSES:
+        @st.fragment(run_every=JOBS_POLL_INTERVAL_SECONDS)
+        def poll():
+            current = latest(key, shared)
+            if current is not None and current["status"] == jobs.SUCCEEDED and render_done is not None:
+                render_done(current["result"])
+                return
+            if current is None or current["status"] not in jobs.ACTIVE_STATUSES:
+                st.rerun()  # redesenha a página com o resultado e encerra o polling
+            _show_progress(current)
+            if render_partial is not None and current["result"]:
+                render_partial(current["result"])
+
+        poll()
+    elif job["status"] == jobs.SUCCEEDED:
+        render_result(job["result"])
+    elif job["status"] == jobs.FAILED:
+        st.error(f"Erro: {job['error']}")
+    else:
+        st.info("Tarefa cancelada.")
+    return job
+
+
+def render_session_jobs():
+    """Lista as tarefas ativas da sessão (exibida na barra lateral)."""
+    if not jobs.has_active_jobs(st.session_state.session_id):
+        return
+
+    @st.fragment(run_every=JOBS_POLL_INTERVAL_SECONDS)
+    def poll():
+        active = jobs.get_job_runner().list(st.session_state.session_id, active_only=True)
+        if not active:
+            st.rerun()
+        st.divider()
+        st.markdown("### Tarefas em andamento")
+        for job in active:
+            label = KIND_LABELS.get(job["kind"], job["kind"])
+            if "file_path" in job["params"]:
+                label += f" · {os.path.basename(job['params']['file_path'])}"
+            st.caption(f"**{label}** · {job['message'] or STATUS_LABELS[job['status']]}")
+            if job["progress"] is not None:
+                st.progress(job["progress"])
+
+    poll()
@@ -0,0 +1,51 @@
+"""Módulo da Sessão do Navegador
+
+Identificador da sessão usado pelo histórico do chat (Redis), pelas tarefas
+e pelos áudios guardados. Ele é um token aleatório mantido num cookie do
+navegador (SameSite=Strict), e não na URL: um link copiado ou compartilhado
+não dá acesso ao histórico de outra pessoa, e qualquer réplica do app
+reconhece a sessão ao recarregar a página.
+"""
+import json
+import re
+import secrets
+
+import streamlit as st
+
+from config import SESSION_COOKIE_NAME, SESSION_COOKIE_MAX_AGE_SECONDS
+
+_SESSION_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{32,128}")
+
+
+def resolve_session_id(cookie_value):
+    """Reaproveita o identificador do cookie, se válido; senão cria um novo, impossível de adivinhar."""
+    if cookie_value and _SESSION_ID_PATTERN.fullmatch(cookie_value):
+        return cookie_value
+    return secrets.token_urlsafe(32)
+
+
+def _store_cookie(session_id):
+    # O componente roda num iframe da mesma origem: o cookie vale para a página do app
+    import streamlit.components.v1 as components
+
+    cookie = f"{SESSION_COOKIE_NAME}={session_id}; Max-Age={SESSION_COOKIE_MAX_AGE_SECONDS}; Path=/; SameSite=Strict"
+    components.html(
+        "<script>"
+        f"var cookie = {json.dumps(cookie)};"
+        "if (window.parent.location.protocol === 'https:') { cookie += '; Secure'; }"
+        "window.parent.document.cookie = cookie;"
+        "</script>",
+        height=0,
+    )
+
+
+def ensure_session_id():
+    """Define st.session_state.session_id na primeira execução da sessão e renova o cookie."""
+    if "session_id" in st.session_state:
+        return st.session_state.session_id
+    # Links antigos traziam o identificador na URL (?sid=): ele é descartado, nunca adotado
+    if "sid" in st.query_params:
+        del st.query_params["sid"]
+    st.session_state.session_id = resolve_session_id(st.context.cookies.get(SESSION_COOKIE_NAME))
+    _store_cookie(st.session_state.session_id)
+    return st.session_state.session_id
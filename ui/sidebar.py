@@ -0,0 +1,160 @@
+"""Módulo da Barra Lateral
+
+Menu principal com ações rápidas, upload de documentos e escolha do modelo.
+O painel Sistema fica em ui.system, carregado só quando é aberto.
+"""
+import streamlit as st
+
+import config
+import file_handler
+import ui
+from ui import job_status
+
+
+def render():
+    with st.sidebar:
+        st.markdown("# Menu Principal")
+
+        
+        if "selected_menu" not in st.session_state:
+            st.session_state.selected_menu = "Dashboard"
+
+        
+        st.markdown(
+            """
+        <style>
+        .menu-item {
+            padding: 12px 16px;
+            margin: 4px 0;
+            border-radius: 8px;
+            cursor: pointer;
+            transition: all 0.3s ease;
+            background-color: transparent;
+            border: none;
+            width: 100%;
+            text-align: left;
+            font-size: 16px;
+            color: #ffffff;
+        }
+        .menu-item:hover {
+            background-color: rgba(255, 255, 255, 0.1);
+            box-shadow: 0 2px 8px rgba(0, 0, 0, 0.2);
+            transform: translateY(-1px);
+        }
+        .menu-item.active {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
+            font-weight: 600;
+        }
+        .menu-item.active:hover {
+            background: linear-gradient(135deg, #5a6fd8 0%, #6a4190 100%);
+        }
+        </style>
+        """,
+            unsafe_allow_html=True,
+        )
+
+        
+        menu_options = ["Dashboard", "Documentos", "Configurações", "Sistema"]
+
+        for option in menu_options:
+            active_class = "active" if st.session_state.selected_menu == option else ""
+
+            if st.button(
+                option,
+                key=f"menu_{option}",
+                use_container_width=True,
+                type="primary"
+                if st.session_state.selected_menu == option
+                else "secondary",
+            ):
+                st.session_state.selected_menu = option
+                st.rerun()
+
+        menu_option = st.session_state.selected_menu
+
+        st.divider()
+
+        
+        if menu_option == "Dashboard":
+            st.markdown("### Ações Rápidas")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("Chat", use_container_width=True):
+                    st.session_state.active_tab = "chat"
+                if st.button("Insights", use_container_width=True):
+                    st.session_state.active_tab = "insights"
+
+            with col2:
+                if st.button("Visualizar", use_container_width=True):
+                    st.session_state.active_tab = "viewer"
+                if st.button("Áudios", use_container_width=True):
+                    st.session_state.active_tab = "audio"
+
+        
+        elif menu_option == "Documentos":
+            st.markdown("### Upload de Documentos")
+            st.write("**Tipos aceitos:** PDF de FIIs, Ações, DREs, Balanços")
+
+            uploaded_files = st.file_uploader(
+                "Arrastar arquivos ou clicar para selecionar:",
+                accept_multiple_files=True,
+                type="pdf",
+                key="doc_uploader",
+            )
+
+            if uploaded_files:
+                count = file_handler.save_uploaded_files(uploaded_files)
+                st.success(f"{count} arquivo(s) carregado(s)")
+
+            st.markdown("### Processamento")
+            new_reports = file_handler.get_new_reports_to_process()
+
+            if new_reports:
+                st.info(f"{len(new_reports)} arquivo(s) aguardando processamento")
+
+                if st.button(
+                    "Processar Todos", use_container_width=True, type="primary"
+                ):
+                    ui.process_pending_documents()
+            else:
+                st.success("Todos os documentos estão processados")
+
+            ui.render_ingest_status()
+
+        
+        elif menu_option == "Configurações":
+            st.markdown("### Modelo de IA")
+
+            selected_model = st.selectbox(
+                "Escolha o modelo LLM:",
+                options=list(config.AVAILABLE_LLM_MODELS.keys()),
+                format_func=lambda x: config.AVAILABLE_LLM_MODELS[x],
+                index=0,
+                help="Modelos mais avançados são mais inteligentes, mas custam mais.",
+            )
+
+            
+            model_info = {
+                "gpt-5": ("Máxima Qualidade", "blue"),
+                "gpt-4o": ("Premium", "blue"),
+                "gpt-4-turbo": ("Avançado", "blue"),
+                "gpt-4": ("Clássico", "blue"),
+                "gpt-3.5-turbo": ("Econômico", "green"),
+                "gpt-4o-mini": ("Balanceado", "blue"),
+            }
+
+            if selected_model in model_info:
+                desc, color = model_info[selected_model]
+                if color == "blue":
+                    st.info(f"**{desc}**")
+                elif color == "green":
+                    st.success(f"**{desc}**")
+
+            st.session_state.selected_model = selected_model
+
+        elif menu_option == "Sistema":
+            ui.render_system_panel()
+
+        job_status.render_session_jobs()
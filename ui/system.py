@@ -0,0 +1,174 @@
+"""Módulo do Painel Sistema
+
+Status do RAG, métricas e insights pendentes, caches, uso da OpenAI e saúde
+dos serviços.
+"""
+import time
+
+import streamlit as st
+
+import audio_cache
+import config
+import ingestion
+import insights_materializer
+import llm_cache
+import metrics_store
+import openai_clients
+import page_store
+import services
+import telemetry
+
+
+def render():
+    vector_manager = services.get_vector_manager()
+    st.markdown("### Status do Sistema")
+
+    try:
+        doc_count = services.document_count()
+        processed_docs_info = services.processed_documents_info()
+
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Chunks Totais", doc_count)
+        with col2:
+            st.metric("Documentos", len(processed_docs_info))
+
+        if doc_count > 0:
+            st.success("Sistema RAG Ativo")
+
+
+            with st.expander("Ver documentos processados"):
+                for doc_name, info in processed_docs_info.items():
+                    details = [f"{info['chunk_count']} chunks"]
+                    if info["page_count"]:
+                        details.append(f"{info['page_count']} páginas")
+                    if info["size_bytes"]:
+                        details.append(f"{info['size_bytes'] / (1024 * 1024):.1f} MB")
+                    if info["embedding_model"]:
+                        details.append(info["embedding_model"])
+                    details.append(time.strftime("%d/%m/%Y %H:%M", time.localtime(info["ingested_at"])))
+                    st.write(f"• **{doc_name}**: {' · '.join(details)}")
+
+
+            if st.button("Testar RAG", use_container_width=True):
+                test_results = vector_manager.search_similarity(
+                    "investimento", k=2
+                )
+                if test_results:
+                    st.success("RAG funcionando!")
+                    with st.expander("Ver resultados do teste"):
+                        for i, (doc, score) in enumerate(test_results):
+                            st.write(
+                                f"**Resultado {i + 1}** (Score: {score:.3f})"
+                            )
+                            st.write(
+                                f"Fonte: {doc.metadata.get('source_file', 'N/A')}"
+                            )
+                            st.write(doc.page_content[:150] + "...")
+                else:
+                    st.error("RAG não respondeu")
+        else:
+            st.warning("Nenhum documento processado")
+
+        metrics_docs = metrics_store.get_metrics_store().documents()
+        missing_metrics = len(processed_docs_info) - len(metrics_docs)
+        if missing_metrics > 0:
+            st.info(f"{missing_metrics} documento(s) sem tabela de métricas")
+            if st.button("Extrair Métricas", use_container_width=True):
+                with st.spinner("Extraindo métricas dos documentos..."), telemetry.feature("ingest"):
+                    ingestion.backfill_metrics(
+                        model_name=st.session_state.get(
+                            "selected_model", config.LLM_MODEL_NAME
+                        )
+                    )
+                st.rerun()
+
+        missing_pages = len(processed_docs_info) - len(page_store.get_page_store().documents())
+        if missing_pages > 0:
+            st.info(f"{missing_pages} documento(s) fora da busca textual")
+            if st.button("Indexar Textos", use_container_width=True):
+                with st.spinner("Indexando o texto dos documentos..."), telemetry.feature("ingest"):
+                    ingestion.backfill_pages()
+                st.rerun()
+
+        selected_model = st.session_state.get("selected_model", config.LLM_MODEL_NAME)
+        pending_insights = insights_materializer.pending_documents(selected_model)
+        if doc_count > 0 and pending_insights:
+            st.info(f"{len(pending_insights)} documento(s) fora dos insights do dashboard")
+            if st.button("Atualizar Insights", use_container_width=True):
+                with st.spinner("Atualizando insights do dashboard..."), telemetry.feature("insights"):
+                    insights_materializer.materialize(
+                        vector_manager, model_name=selected_model
+                    )
+                st.rerun()
+
+        cache_stats = llm_cache.get_cache_stats()
+        if cache_stats:
+            st.markdown("### Cache do LLM")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Taxa de Acerto", f"{cache_stats['hit_rate']:.0%}")
+            with col2:
+                st.metric("Entradas", cache_stats["entries"])
+            st.caption(
+                f"{cache_stats['hits']} acertos • {cache_stats['misses']} falhas • "
+                f"{cache_stats['evictions']} remoções ({cache_stats['backend']})"
+            )
+
+        audio_stats = audio_cache.get_cache_stats()
+        if audio_stats:
+            st.markdown("### Cache de Áudio")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Taxa de Acerto", f"{audio_stats['hit_rate']:.0%}")
+            with col2:
+                st.metric("Tamanho", f"{audio_stats['size_bytes'] / 1024 ** 2:.1f} MB")
+            st.caption(
+                f"{audio_stats['hits']} acertos • {audio_stats['misses']} falhas • "
+                f"{audio_stats['evictions']} remoções "
+                f"(limite de {audio_stats['max_bytes'] / 1024 ** 2:.0f} MB)"
+            )
+
+        usage = telemetry.get_usage_summary()
+        if usage:
+            st.markdown("### Uso da OpenAI (última hora)")
+            st.dataframe(
+                [
+                    {
+                        "Funcionalidade": feature_name,
+                        "Chamadas": data["calls"],
+                        "Erros": data["errors"],
+                        "Retentativas": data["retries"],
+                        "Acertos do cache": data["cache_hits"],
+                        "Tokens (entrada)": data["input_tokens"],
+                        "Tokens (saída)": data["output_tokens"],
+                        "Custo (US$)": round(data["cost"], 4),
+                        "Latência p50 (s)": round(data["latency_p50"], 2),
+                        "Latência p95 (s)": round(data["latency_p95"], 2),
+                    }
+                    for feature_name, data in sorted(usage.items())
+                ],
+                use_container_width=True,
+                hide_index=True,
+            )
+
+        open_circuits = [
+            endpoint for endpoint, state in openai_clients.get_circuit_states().items()
+            if state != "closed"
+        ]
+        if open_circuits:
+            st.warning(
+                f"OpenAI instável: chamadas de {', '.join(open_circuits)} "
+                "suspensas temporariamente (circuit breaker)."
+            )
+
+        with st.expander("Saúde dos serviços"):
+            for name, result in services.get_registry().health().items():
+                status = "OK" if result["ok"] else "Falha"
+                st.write(
+                    f"**{name}**: {status} ({result['latency_ms']:.0f} ms) {result['detail']}"
+                )
+
+    except Exception as e:
+        st.error(f"Erro no sistema: {e}")
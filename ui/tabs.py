@@ -0,0 +1,61 @@
+"""Módulo da Barra de Abas
+
+Botões das abas da área principal; a aba ativa fica em st.session_state.active_tab.
+"""
+import streamlit as st
+
+
+def render():
+    """Exibe a barra de abas e retorna a aba ativa."""
+    if "active_tab" not in st.session_state:
+        st.session_state.active_tab = "chat"
+
+    
+    active_tab = st.session_state.get("active_tab", "chat")
+
+    
+    main_container = st.container()
+
+    
+    with main_container:
+        tab_col1, tab_col2, tab_col3, tab_col4 = st.columns(4)
+
+        with tab_col1:
+            if st.button(
+                "Chat com IA",
+                use_container_width=True,
+                type="primary" if active_tab == "chat" else "secondary",
+            ):
+                st.session_state.active_tab = "chat"
+                st.rerun()
+
+        with tab_col2:
+            if st.button(
+                "Visualizar Docs",
+                use_container_width=True,
+                type="primary" if active_tab == "viewer" else "secondary",
+            ):
+                st.session_state.active_tab = "viewer"
+                st.rerun()
+
+        with tab_col3:
+            if st.button(
+                "Insights",
+                use_container_width=True,
+                type="primary" if active_tab == "insights" else "secondary",
+            ):
+                st.session_state.active_tab = "insights"
+                st.rerun()
+
+        with tab_col4:
+            if st.button(
+                "Centro de Áudio",
+                use_container_width=True,
+                type="primary" if active_tab == "audio" else "secondary",
+            ):
+                st.session_state.active_tab = "audio"
+                st.rerun()
+
+        st.divider()
+
+    return active_tab
@@ -0,0 +1,164 @@
+"""Módulo do Visualizador de Texto
+
+Texto extraído de um relatório, página a página, lido do índice de páginas:
+só as páginas exibidas são carregadas, e as estatísticas do documento vêm
+pré-calculadas. A primeira abertura de um relatório ainda não indexado extrai
+o PDF uma única vez. A busca, no relatório aberto ou em toda a biblioteca,
+usa o índice de texto completo e não lê nenhum PDF.
+"""
+import os
+
+import streamlit as st
+
+import page_store
+from config import REPORTS_PROCESSED_DIR, VIEWER_PAGES_PER_SCREEN, VIEWER_SEARCH_MAX_MATCHES
+
+SEARCH_HELP = "Sem diferenciar maiúsculas nem acentos; use aspas para buscar uma frase exata."
+
+
+def _page_state_key(info):
+    return f"text_viewer_page_{info['file_hash']}"
+
+
+def _go_to_page(info, page_number):
+    st.session_state[_page_state_key(info)] = page_number
+    st.session_state.text_view_option = " Páginas"
+
+
+def _open_hit(hit):
+    # Abre o texto do relatório encontrado na busca da biblioteca, já na página do resultado
+    st.session_state.action = ("read_pdf_text", os.path.join(REPORTS_PROCESSED_DIR, hit["file_name"]))
+    _go_to_page(hit, hit["page_number"])
+
+
+def _show_pages(store, file_path, info):
+    page_key = _page_state_key(info)
+    start = st.session_state.setdefault(page_key, 1)
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        st.button(
+            "◀ Anteriores",
+            use_container_width=True,
+            disabled=start <= 1,
+            on_click=_go_to_page,
+            args=(info, max(1, start - VIEWER_PAGES_PER_SCREEN)),
+        )
+    with col2:
+        start = st.number_input(
+            f"Página inicial (de {info['page_count']})",
+            min_value=1,
+            max_value=info["page_count"],
+            key=page_key,
+        )
+    with col3:
+        st.button(
+            "Próximas ▶",
+            use_container_width=True,
+            disabled=start + VIEWER_PAGES_PER_SCREEN > info["page_count"],
+            on_click=_go_to_page,
+            args=(info, start + VIEWER_PAGES_PER_SCREEN),
+        )
+
+    for page_number, text in store.pages(file_path, start, VIEWER_PAGES_PER_SCREEN):
+        st.text_area(
+            f"Página {page_number}", text, height=400, key=f"text_page_{info['file_hash'][:16]}_{page_number}"
+        )
+
+
+def _show_search(store, file_path, info):
+    search_term = st.text_input("Digite o termo para buscar:", help=SEARCH_HELP)
+    if not search_term:
+        return
+
+    total, matches = store.search(file_path, search_term, limit=VIEWER_SEARCH_MAX_MATCHES)
+    if not total:
+        st.warning(f"Termo '{search_term}' não encontrado no texto.")
+        return
+
+    st.success(f"'{search_term}' encontrado em {total} página(s)")
+    for match in matches:
+        st.write(f"**Página {match['page_number']}**")
+        st.write(match["snippet"])
+        st.button(
+            "Abrir página",
+            key=f"open_match_{match['page_number']}",
+            on_click=_go_to_page,
+            args=(info, match["page_number"]),
+        )
+        st.write("---")
+    if total > len(matches):
+        st.caption(f"Exibindo as primeiras {len(matches)} páginas.")
+
+
+def render_library_search():
+    """Busca textual em todos os relatórios indexados, com link para a página de cada resultado."""
+    with st.expander("Buscar em todos os relatórios"):
+        query = st.text_input("Termo ou frase:", key="library_search_query", help=SEARCH_HELP)
+        if not query:
+            return
+
+        total, hits = page_store.get_page_store().search_library(query, limit=VIEWER_SEARCH_MAX_MATCHES)
+        if not total:
+            st.warning(f"'{query}' não encontrado nos relatórios indexados.")
+            return
+
+        st.success(f"'{query}' encontrado em {total} página(s)")
+        for hit in hits:
+            st.write(f"**{hit['file_name']}** · página {hit['page_number']}")
+            st.write(hit["snippet"])
+            st.button(
+                "Abrir página",
+                key=f"open_hit_{hit['file_hash'][:16]}_{hit['page_number']}",
+                on_click=_open_hit,
+                args=(hit,),
+            )
+        if total > len(hits):
+            st.caption(f"Exibindo as {len(hits)} páginas mais relevantes.")
+
+
+def render(file_path):
+    file_name = os.path.basename(file_path)
+    st.subheader(f" Texto Extraído: {file_name}")
+
+    store = page_store.get_page_store()
+    info = store.document(file_path)
+    if info is None:
+        with st.spinner("Extraindo texto do PDF..."):
+            try:
+                info = store.index(file_path)
+            except Exception as e:
+                st.error(f"Erro ao extrair texto do PDF: {e}")
+                st.info(" Tente a opção 'Ler PDF (Visualizador)' como alternativa.")
+                return
+
+    if info["page_count"] == 0:
+        st.warning("O PDF não tem texto extraível.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric(" Palavras", f"{info['word_count']:,}")
+    with col2:
+        st.metric(" Caracteres", f"{info['char_count']:,}")
+    with col3:
+        st.metric(" Páginas", info["page_count"])
+
+    with open(store.export_text(file_path), "rb") as text_file:
+        st.download_button(
+            label=" Baixar Texto (.txt)",
+            data=text_file,
+            file_name=f"texto_{file_name.replace('.pdf', '')}.txt",
+            mime="text/plain",
+        )
+
+    view_option = st.radio(
+        "Opções de visualização:",
+        [" Páginas", " Buscar no texto"],
+        key="text_view_option",
+        horizontal=True,
+    )
+    if view_option == " Páginas":
+        _show_pages(store, file_path, info)
+    else:
+        _show_search(store, file_path, info)
@@ -0,0 +1,226 @@
+"""Módulo da Página do Visualizador
+
+Lista os relatórios processados e executa as ações sobre o selecionado:
+PDF, texto extraído, resumo e áudio. Resumo e áudios rodam em tarefas de
+segundo plano (compartilhadas com o Centro de Áudio) e a página acompanha o
+andamento.
+"""
+import os
+
+import streamlit as st
+
+import config
+import file_handler
+from ui import job_status, text_viewer
+from ui.common import display_pdf, show_audio_segments, show_stored_audio
+
+# Ações de IA do visualizador e o tipo de tarefa que cada uma envia
+ACTION_JOBS = {"summarize": "summary", "listen_summary": "summary_audio", "listen_full": "full_audio"}
+
+
+def _job_key(action_type, file_path, model_name):
+    file_name = os.path.basename(file_path)
+    if action_type == "listen_full":
+        return f"full_audio:{file_name}"
+    return f"{ACTION_JOBS[action_type]}:{file_name}:{model_name}"
+
+
+def _submit_action_job(action_type, file_path, model_name):
+    params = {"file_path": file_path}
+    if action_type != "listen_full":
+        params["model_name"] = model_name
+    job_status.submit(ACTION_JOBS[action_type], _job_key(action_type, file_path, model_name), **params)
+
+
+def _clear_action(key):
+    job_status.forget(key)
+    st.session_state.action = None
+
+
+def render():
+    st.subheader("Visualizador de Documentos Financeiros")
+    st.info(
+        "**Dica**: Agora as ações não se interrompem! Use outras tabs enquanto processa."
+    )
+
+
+    processed_reports = file_handler.get_all_processed_reports()
+
+    if not processed_reports:
+        st.warning("Nenhum documento processado encontrado.")
+        st.info(
+            "Vá para o menu **Documentos** para carregar e processar arquivos primeiro."
+        )
+    else:
+        text_viewer.render_library_search()
+
+        col1, col2 = st.columns([3, 1])
+
+        with col1:
+            selected_report = st.selectbox(
+                "Escolha um documento para visualizar:",
+                options=processed_reports,
+                index=None,
+                placeholder="Selecione um arquivo...",
+            )
+
+        with col2:
+            st.metric("Total", len(processed_reports))
+
+        if selected_report:
+            st.success(f"**Selecionado:** {selected_report}")
+            report_path = os.path.join(
+                config.REPORTS_PROCESSED_DIR, selected_report
+            )
+
+
+            st.markdown("### Ações Disponíveis")
+
+            action_col1, action_col2 = st.columns(2)
+
+            with action_col1:
+                st.markdown("**Leitura e Visualização**")
+
+                current_action = st.session_state.get('action', None)
+                current_action_type = current_action[0] if current_action else None
+
+                if st.button(
+                    "Ver PDF Original", 
+                    use_container_width=True, 
+                    key="view_pdf",
+                    type="primary" if current_action_type == "read_pdf_viewer" else "secondary"
+                ):
+                    st.session_state.action = ("read_pdf_viewer", report_path)
+                    st.rerun()
+
+                if st.button(
+                    "Extrair Texto Completo",
+                    use_container_width=True,
+                    key="extract_text",
+                    type="primary" if current_action_type == "read_pdf_text" else "secondary"
+                ):
+                    st.session_state.action = ("read_pdf_text", report_path)
+                    st.rerun()
+
+                if st.button(
+                    "Gerar Resumo com IA",
+                    use_container_width=True,
+                    key="generate_summary",
+                    type="primary" if current_action_type == "summarize" else "secondary"
+                ):
+                    st.session_state.action = ("summarize", report_path)
+                    _submit_action_job(
+                        "summarize",
+                        report_path,
+                        st.session_state.get("selected_model", config.LLM_MODEL_NAME),
+                    )
+                    st.rerun()
+
+            with action_col2:
+                st.markdown("**Áudio com IA**")
+
+                if st.button(
+                    "Ouvir Resumo (IA)",
+                    use_container_width=True,
+                    key="listen_summary",
+                    type="primary" if current_action_type == "listen_summary" else "secondary"
+                ):
+                    st.session_state.action = ("listen_summary", report_path)
+                    _submit_action_job(
+                        "listen_summary",
+                        report_path,
+                        st.session_state.get("selected_model", config.LLM_MODEL_NAME),
+                    )
+                    st.rerun()
+
+                if st.button(
+                    "Ouvir Relatório Completo (IA)",
+                    use_container_width=True,
+                    key="listen_full",
+                    type="primary" if current_action_type == "listen_full" else "secondary"
+                ):
+                    st.session_state.action = ("listen_full", report_path)
+                    _submit_action_job(
+                        "listen_full",
+                        report_path,
+                        st.session_state.get("selected_model", config.LLM_MODEL_NAME),
+                    )
+                    st.rerun()
+
+                st.caption(
+                    "Nota: Áudio completo pode levar vários minutos para textos longos"
+                )
+
+    if "action" in st.session_state and st.session_state.action:
+        action_type, file_path = st.session_state.action
+        selected_model = st.session_state.get("selected_model", config.LLM_MODEL_NAME)
+        if action_type in ACTION_JOBS:
+            job_key = _job_key(action_type, file_path, selected_model)
+            if job_status.latest(job_key) is None:
+                _submit_action_job(action_type, file_path, selected_model)
+
+        if action_type == "read_pdf_viewer":
+            st.write("Exibindo PDF:")
+            display_pdf(file_path)
+
+        elif action_type == "read_pdf_text":
+            text_viewer.render(file_path)
+
+        elif action_type == "summarize":
+            job_status.show(
+                job_key,
+                lambda result: st.text_area("Resumo", result["summary"], height=600),
+                render_partial=lambda result: st.markdown(result["summary"]),
+            )
+
+        elif action_type == "listen_summary":
+            file_name = os.path.basename(file_path)
+
+            def show_full_summary_audio(result):
+                st.subheader(" Áudio do Resumo")
+                show_stored_audio(
+                    result["handle"],
+                    clear_key="clear_viewer_summary",
+                    file_name=f"resumo_{file_name.replace('.pdf', '')}.mp3",
+                    on_clear=lambda: _clear_action(job_key),
+                )
+
+            def show_summary_audio(result):
+                st.subheader(" Resumo do Relatório")
+                st.text_area("Resumo", result["summary"], height=300)
+                show_full_summary_audio(result)
+
+            def show_summary_partial(result):
+                st.markdown(result["summary"])
+                # No modo em pipeline os trechos do resumo tocam enquanto o restante é gerado
+                show_audio_segments(result.get("segments", []))
+
+            def show_summary_done(result):
+                # Terminou com a página aberta: os trechos seguem no lugar e o áudio completo aparece abaixo
+                show_summary_partial(result)
+                show_full_summary_audio(result)
+
+            job_status.show(
+                job_key, show_summary_audio, render_partial=show_summary_partial, render_done=show_summary_done
+            )
+
+        elif action_type == "listen_full":
+            file_name = os.path.basename(file_path)
+
+            def show_full_audio(result):
+                if result["failed_parts"]:
+                    st.error(
+                        f"Falha ao gerar áudio para as partes {', '.join(map(str, result['failed_parts']))}."
+                    )
+                st.subheader(" Áudio do Relatório Completo")
+                st.success(
+                    f"Áudio completo gerado com {result['parts'] - len(result['failed_parts'])} partes!"
+                )
+                show_stored_audio(
+                    result["handle"],
+                    clear_key="clear_viewer_full",
+                    file_name=f"audio_completo_{file_name.replace('.pdf', '')}.mp3",
+                    on_clear=lambda: _clear_action(job_key),
+                )
+
+            job_status.show(job_key, show_full_audio)
@@ -4,14 +4,35 @@ from langchain_openai import OpenAIEmbeddings
 from langchain_community.document_loaders import PyPDFLoader
 import os
 
-from config import VECTOR_STORE_DIR, CHROMA_COLLECTION_NAME, EMBEDDING_MODEL_NAME
+import openai_clients
+from document_catalog import DocumentCatalog
+
+from config import (
+    VECTOR_STORE_DIR,
+    CHROMA_COLLECTION_NAME,
+    EMBEDDING_MODEL_NAME,
+    OPENAI_BASE_URL,
+    REPORTS_PROCESSED_DIR,
+    CATALOG_REBUILD_BATCH_SIZE,
+)
+
+def build_embedding_function():
+    """Cria o cliente de embeddings da OpenAI usado pelo vector store e pelo roteador."""
+    return OpenAIEmbeddings(
+        model=EMBEDDING_MODEL_NAME,
+        **openai_clients.client_kwargs(),
+        # Fora da OpenAI o texto é enviado como string (sem tokenizar com tiktoken)
+        check_embedding_ctx_length=OPENAI_BASE_URL is None,
+    )
 
 class VectorStoreManager:
-    def __init__(self):
-        """Inicializa o gerenciador do vector store."""
-        self.embedding_function = OpenAIEmbeddings(model=EMBEDDING_MODEL_NAME)
+    def __init__(self, embedding_function=None, catalog=None):
+        """Inicializa o gerenciador do vector store e o catálogo de documentos."""
+        self.embedding_function = embedding_function or build_embedding_function()
         self.vector_store = None
         self._ensure_vector_store_exists()
+        self.catalog = catalog or DocumentCatalog()
+        self._sync_catalog()
     
     def _ensure_vector_store_exists(self):
         """Garante que o vector store existe e está inicializado."""
@@ -35,6 +56,45 @@ class VectorStoreManager:
             print(f"❌ Erro ao inicializar ChromaDB: {e}")
             self.vector_store = None
 
+    def _sync_catalog(self):
+        """Reconstrói o catálogo se ele não bate com a coleção (catálogo novo ou ingestão interrompida)."""
+        if self.vector_store is None:
+            return
+        try:
+            collection_count = self.vector_store._collection.count()
+            if collection_count == self.catalog.total_chunks():
+                return
+            print("🗂️ Catálogo de documentos desatualizado, reconstruindo a partir da coleção...")
+            self.catalog.replace_all(self._scan_collection(collection_count))
+        except Exception as e:
+            print(f"⚠️ Erro ao sincronizar o catálogo de documentos: {e}")
+
+    def _scan_collection(self, collection_count):
+        """Estatísticas por documento lidas dos metadados da coleção, em lotes (sem o texto dos chunks)."""
+        stats = {}
+        for offset in range(0, collection_count, CATALOG_REBUILD_BATCH_SIZE):
+            batch = self.vector_store.get(limit=CATALOG_REBUILD_BATCH_SIZE, offset=offset, include=["metadatas"])
+            for metadata in batch['metadatas']:
+                source_file = metadata.get('source_file', 'unknown')
+                entry = stats.setdefault(source_file, {'chunk_count': 0, 'pages': set()})
+                entry['chunk_count'] += 1
+                if 'page' in metadata:
+                    entry['pages'].add(metadata['page'])
+
+        entries = []
+        for source_file, entry in stats.items():
+            file_path = os.path.join(REPORTS_PROCESSED_DIR, source_file)
+            exists = os.path.exists(file_path)
+            entries.append({
+                'source_file': source_file,
+                'chunk_count': entry['chunk_count'],
+                'page_count': len(entry['pages']) or None,
+                'size_bytes': os.path.getsize(file_path) if exists else None,
+                'embedding_model': EMBEDDING_MODEL_NAME,
+                'ingested_at': os.path.getmtime(file_path) if exists else None,
+            })
+        return entries
+
     def is_document_already_processed(self, file_path):
         """Verifica se um documento já foi processado baseado no nome do arquivo."""
         if self.vector_store is None:
@@ -42,14 +102,14 @@ class VectorStoreManager:
             
         file_name = os.path.basename(file_path)
         try:
-            # Buscar por documentos com este source_file
+            # Basta um chunk com este source_file (só os ids, sem texto nem metadados)
             results = self.vector_store.get(
-                where={"source_file": file_name}
+                where={"source_file": file_name}, limit=1, include=[]
             )
             is_processed = len(results['ids']) > 0
             
             if is_processed:
-                print(f"⚠️ Documento já processado: {file_name} ({len(results['ids'])} chunks encontrados)")
+                print(f"⚠️ Documento já processado: {file_name}")
             
             return is_processed
             
@@ -58,27 +118,9 @@ class VectorStoreManager:
             return False
     
     def get_processed_documents_info(self):
-        """Retorna informações sobre documentos já processados."""
-        if self.vector_store is None:
-            return {}
-            
+        """Retorna informações sobre documentos já processados (lidas do catálogo)."""
         try:
-            # Obter todos os documentos
-            all_docs = self.vector_store.get()
-            
-            # Agrupar por source_file
-            doc_info = {}
-            for i, metadata in enumerate(all_docs['metadatas']):
-                source_file = metadata.get('source_file', 'unknown')
-                if source_file not in doc_info:
-                    doc_info[source_file] = {
-                        'chunk_count': 0,
-                        'total_chunks': metadata.get('total_chunks', 0)
-                    }
-                doc_info[source_file]['chunk_count'] += 1
-            
-            return doc_info
-            
+            return self.catalog.documents()
         except Exception as e:
             print(f"⚠️ Erro ao obter informações dos documentos: {e}")
             return {}
@@ -131,6 +173,14 @@ class VectorStoreManager:
             # Adicionar documentos ao vector store existente
             self.vector_store.add_documents(docs_split)
             print("➕ Documentos adicionados ao vector store")
+
+            self.catalog.record(
+                file_name,
+                chunk_count=len(docs_split),
+                page_count=len(documents),
+                size_bytes=os.path.getsize(file_path),
+                embedding_model=EMBEDDING_MODEL_NAME,
+            )
             
             print(f"✅ Vector store atualizado com sucesso!")
             return len(docs_split)
@@ -140,29 +190,32 @@ class VectorStoreManager:
             raise
 
     def count_documents(self):
-        """Retorna o número de documentos na coleção ChromaDB."""
+        """Retorna o número de chunks no vector store (soma do catálogo)."""
         if self.vector_store is None:
             return 0
         try:
-            collection = self.vector_store._collection
-            count = collection.count()
+            count = self.catalog.total_chunks()
             print(f"📊 Total de chunks no vector store: {count}")
             return count
         except Exception as e:
             print(f"⚠️ Erro ao contar documentos: {e}")
             return 0
 
-    def get_retriever(self, k=4):
-        """Retorna um retriever para busca por similaridade."""
+    def get_retriever(self, k=4, source_file=None):
+        """Retorna um retriever para busca por similaridade, opcionalmente restrito a um documento."""
         if self.vector_store is None:
             self._ensure_vector_store_exists()
             
         if self.vector_store is None:
             raise ValueError("Vector store não foi inicializado corretamente")
             
+        search_kwargs = {"k": k}
+        if source_file is not None:
+            search_kwargs["filter"] = {"source_file": source_file}
+
         return self.vector_store.as_retriever(
             search_type="similarity",
-            search_kwargs={"k": k}
+            search_kwargs=search_kwargs
         )
     
     def search_similarity(self, query, k=4):
@@ -0,0 +1,139 @@
+"""Módulo de Busca na Web
+
+Envolve a busca do agente (DuckDuckGo) com cache TTL por consulta normalizada,
+deduplicação de buscas idênticas simultâneas (single-flight), tempo limite
+rígido por busca e limite global de buscas em paralelo no processo.
+"""
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+
+from cachetools import TTLCache
+from langchain.agents import Tool
+
+from config import (
+    WEB_SEARCH_CACHE_TTL_SECONDS,
+    WEB_SEARCH_CACHE_MAX_ENTRIES,
+    WEB_SEARCH_TIMEOUT_SECONDS,
+    WEB_SEARCH_MAX_CONCURRENCY,
+)
+
+TOOL_NAME = "duckduckgo_search"
+TOOL_DESCRIPTION = (
+    "A wrapper around DuckDuckGo Search. Useful for when you need to answer questions "
+    "about current events. Input should be a search query."
+)
+
+
+def normalize_query(query):
+    """Normaliza a consulta para a chave do cache (caixa, espaços e pontuação final)."""
+    return re.sub(r"\s+", " ", str(query)).strip().strip("?!.").strip().lower()
+
+
+def _duckduckgo_backend():
+    from langchain_community.tools import DuckDuckGoSearchRun
+    return DuckDuckGoSearchRun().run
+
+
+class WebSearchStats:
+    def __init__(self):
+        """Contadores de uso da busca na web."""
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def increment(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def as_dict(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
+
+
+class CachedWebSearch:
+    def __init__(self, backend=None, ttl_seconds=WEB_SEARCH_CACHE_TTL_SECONDS,
+                 max_entries=WEB_SEARCH_CACHE_MAX_ENTRIES, timeout=WEB_SEARCH_TIMEOUT_SECONDS,
+                 max_concurrency=WEB_SEARCH_MAX_CONCURRENCY, timer=time.monotonic):
+        """Cria o wrapper. backend recebe a consulta e retorna o texto dos resultados."""
+        self._backend = backend
+        self.timeout = timeout
+        self.stats = WebSearchStats()
+        self._cache = TTLCache(maxsize=max_entries, ttl=ttl_seconds, timer=timer)
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        # O executor limita as buscas em paralelo; buscas excedentes aguardam na fila
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="web-search")
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = _duckduckgo_backend()
+        return self._backend
+
+    def _run_backend(self, key, query, future):
+        try:
+            result = self.backend(query)
+        except Exception as e:
+            self.stats.increment("errors")
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            return
+        with self._lock:
+            self._cache[key] = result
+            self._in_flight.pop(key, None)
+        future.set_result(result)
+
+    def search(self, query):
+        """Executa a busca, reaproveitando o cache e buscas idênticas em andamento."""
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._cache:
+                self.stats.increment("hits")
+                return self._cache[key]
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats.increment("deduplicated")
+            else:
+                self.stats.increment("misses")
+                future = Future()
+                self._in_flight[key] = future
+                self._executor.submit(self._run_backend, key, query, future)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # A busca continua em segundo plano e, se concluir, alimenta o cache
+            self.stats.increment("timeouts")
+            print(f"⏱️ Busca na web excedeu {self.timeout}s: {query}")
+            return "A busca na web excedeu o tempo limite. Responda com as informações disponíveis."
+        except Exception as e:
+            print(f"⚠️ Erro na busca na web: {e}")
+            return f"Erro na busca na web: {e}"
+
+    def as_tool(self):
+        """Ferramenta do LangChain equivalente ao DuckDuckGoSearchRun."""
+        return Tool(name=TOOL_NAME, func=self.search, description=TOOL_DESCRIPTION)
+
+
+_web_search = None
+_web_search_lock = threading.Lock()
+
+
+def get_web_search():
+    """Retorna o wrapper compartilhado pelo processo (cache e limite globais)."""
+    global _web_search
+    with _web_search_lock:
+        if _web_search is None:
+            _web_search = CachedWebSearch()
+    return _web_search